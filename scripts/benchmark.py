@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+Benchmark Suite
+Generates deterministic synthetic corpora and times every BrainHelper action
+against them. Results are JSON (stdout or --output, progress on stderr) so
+throughput and scaling can be compared across releases. Every corpus gets
+its own catalog and header cache, so the first run of the first action is
+cold and every other run is warm, regardless of what this checkout cached.
+
+With --pipeline it instead builds a synthetic copy of this repository (real
+directory layout, scripts and context files) and runs the integrated
+updater's full and quick cycles cold and warm, reporting wall time, files
+read and bytes written per stage, plus peak traced memory per stage from one
+more run under --memprofile. --baseline compares either kind of result with
+a stored run and fails when anything regressed past --threshold.
+"""
+
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).parent.parent
+UTILS = ROOT / 'utils'
+sys.path.insert(0, str(UTILS))
+
+from brain_corpus import REPOSITORY_LAYOUT, generate_corpus
+
+# Actions in the order they run; writes come after the reads they would disturb
+ACTIONS = {
+    'stats': ['stats'],
+    'high-priority': ['high-priority'],
+    'by-category': ['by-category', '--category', 'knowledge'],
+    'sync-index': ['sync-index'],
+    'update-frontmatter': ['update-frontmatter'],
+    'validate': ['validate'],
+    'format': ['format'],
+    'lint': ['lint'],
+}
+
+SCHEMA_VERSION = 1
+
+# Repository files a synthetic pipeline repository is built around
+SCAFFOLDING = (
+    'scripts', 'utils', 'Makefile', 'git.mk', '.brainignore',
+    'SYSTEM.md', 'INDEX.md', 'CHANGELOG.md', 'README.md',
+    'ai/context', 'infrastructure/INFRASTRUCTURE-OVERVIEW.md',
+)
+
+CYCLES = {'full': '--full', 'quick': '--quick'}
+
+# Every file of a synthetic repository gets this mtime, so the updater's
+# "changed in the last five minutes" checks see an old tree on a cold run
+EPOCH = datetime(2024, 1, 1).timestamp()
+
+
+def git_commit() -> str:
+    """Commit the benchmarked code was built from, if known"""
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                capture_output=True, text=True, check=True)
+        return result.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def run_env(directory: Path) -> Dict[str, str]:
+    """Environment for a timed run: no daemon, and a header cache inside `directory`
+
+    The cache starts empty with each generated corpus or repository, so runs
+    never read or fill this checkout's `.brain/header-cache.sqlite` (or one
+    named by an inherited BRAIN_HEADER_CACHE).
+    """
+    return dict(os.environ, BRAIN_DAEMON='off', PYTHONDONTWRITEBYTECODE='1',
+                BRAIN_HEADER_CACHE=str(directory / '.brain' / 'header-cache.sqlite'))
+
+
+def run_action(corpus: Path, arguments: List[str], jobs: int) -> Dict:
+    """Run one helper action as a fresh process and time it"""
+    env = run_env(corpus)
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, str(UTILS / 'brain_cli.py')] + arguments + ['--jobs', str(jobs)],
+        cwd=corpus, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+    )
+    elapsed = time.perf_counter() - start
+    # validate and lint exit 1 when they find problems; anything else is a failure
+    if result.returncode not in (0, 1):
+        raise RuntimeError(f"{' '.join(arguments)} failed:\n{result.stderr}")
+    return {'seconds': elapsed, 'returncode': result.returncode}
+
+
+def summarize(samples: List[float], documents: int) -> Dict:
+    """Timing summary for one action
+
+    `first` is the action's first run. For the first action on a corpus that
+    is fully cold (empty catalog and header cache); later actions start from
+    the catalog and cache the earlier ones left. min/median/mean cover the
+    remaining, warm runs.
+    """
+    warm = samples[1:] or samples
+    median = statistics.median(warm)
+    return {
+        'first': round(samples[0], 6),
+        'min': round(min(warm), 6),
+        'median': round(median, 6),
+        'mean': round(statistics.mean(warm), 6),
+        'samples': [round(sample, 6) for sample in samples],
+        'documents_per_second': round(documents / median, 1) if median else None,
+    }
+
+
+def benchmark_size(documents: int, args, workdir: Path) -> Dict:
+    """Generate one corpus and time every selected action on it"""
+    corpus = workdir / f"corpus-{documents}"
+    shutil.rmtree(corpus, ignore_errors=True)
+
+    start = time.perf_counter()
+    summary = generate_corpus(
+        corpus,
+        documents=documents,
+        seed=args.seed,
+        tags=args.tags,
+        tags_per_document=args.tags_per_document,
+        depth=args.depth,
+        fanout=args.fanout,
+        body_words=args.body_words,
+        deprecated_ratio=args.deprecated_ratio
+    )
+    generate_seconds = time.perf_counter() - start
+    print(f"📚 {documents} documents generated in {generate_seconds:.1f}s "
+          f"({summary['bytes'] / 1024 / 1024:.1f} MiB in {summary['directories']} directories)", file=sys.stderr)
+
+    actions = {}
+    for name in args.actions:
+        samples = [run_action(corpus, ACTIONS[name], args.jobs)['seconds'] for _ in range(args.repeat)]
+        actions[name] = summarize(samples, documents)
+        print(f"  ⏱️  {name:<20} first {samples[0]:8.3f}s  median {actions[name]['median']:8.3f}s", file=sys.stderr)
+
+    if not args.keep:
+        shutil.rmtree(corpus, ignore_errors=True)
+
+    return {
+        'documents': documents,
+        'bytes': summary['bytes'],
+        'directories': summary['directories'],
+        'generate_seconds': round(generate_seconds, 6),
+        'actions': actions,
+    }
+
+
+def corpus_settings(args) -> Dict:
+    return {
+        'seed': args.seed,
+        'tags': args.tags,
+        'tags_per_document': args.tags_per_document,
+        'depth': args.depth,
+        'fanout': args.fanout,
+        'body_words': args.body_words,
+        'deprecated_ratio': args.deprecated_ratio
+    }
+
+
+def build_repository(repository: Path, documents: int, args) -> Dict[str, int]:
+    """A synthetic copy of this repository: real scaffolding plus generated documents"""
+    shutil.rmtree(repository, ignore_errors=True)
+    repository.mkdir(parents=True)
+    for name in SCAFFOLDING:
+        source = ROOT / name
+        if source.is_dir():
+            shutil.copytree(source, repository / name, ignore=shutil.ignore_patterns('__pycache__'))
+        elif source.exists():
+            (repository / name).parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(source, repository / name)
+
+    summary = generate_corpus(repository, documents=documents, categories=REPOSITORY_LAYOUT, **corpus_settings(args))
+    for directory, _, files in os.walk(repository):
+        for name in files:
+            os.utime(os.path.join(directory, name), (EPOCH, EPOCH))
+    return summary
+
+
+def run_cycle(repository: Path, cycle: str) -> Dict:
+    """Run one integrated update cycle as a fresh process, with its stage report"""
+    report = repository / '.stage-report.json'
+    env = run_env(repository)
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, 'scripts/integrated-updater.py', CYCLES[cycle], '--stage-report', str(report)],
+        cwd=repository, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+    )
+    elapsed = time.perf_counter() - start
+    if not report.exists():
+        raise RuntimeError(f"{cycle} update failed:\n{result.stderr}")
+
+    with open(report, 'r', encoding='utf-8') as f:
+        stages = json.load(f)['stages']
+    report.unlink()
+    return {'seconds': round(elapsed, 6), 'returncode': result.returncode, 'stages': stages}
+
+
+def run_memory_cycle(repository: Path, cycle: str) -> Dict:
+    """Run one update cycle under --memprofile and keep its peak memory per top-level stage"""
+    report = repository / '.memory-report.json'
+    env = run_env(repository)
+    result = subprocess.run(
+        [sys.executable, 'scripts/integrated-updater.py', CYCLES[cycle], '--memprofile', str(report)],
+        cwd=repository, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+    )
+    if not report.exists():
+        raise RuntimeError(f"{cycle} memory run failed:\n{result.stderr}")
+
+    with open(report, 'r', encoding='utf-8') as f:
+        profile = json.load(f)
+    report.unlink()
+    rows = profile['stages']
+    return {
+        'max_rss_bytes': profile['max_rss_bytes'],
+        'peak_bytes': rows[0]['peak_bytes'],
+        'stages': {row['stage'].split('/', 1)[1]: row['peak_bytes'] for row in rows if row['stage'].count('/') == 1},
+    }
+
+
+def benchmark_pipeline(documents: int, args, workdir: Path) -> Dict:
+    """Run the full and quick update cycles cold and warm on a synthetic repository"""
+    cycles = {}
+    summary = {}
+    for cycle in CYCLES:
+        repository = workdir / f"repository-{documents}-{cycle}"
+        summary = build_repository(repository, documents, args)
+        cycles[cycle] = {}
+        for phase in ('cold', 'warm'):
+            run = cycles[cycle][phase] = run_cycle(repository, cycle)
+            print(f"  ⏱️  {cycle} {phase:<5} {run['seconds']:8.3f}s", file=sys.stderr)
+            for stage in run['stages']:
+                print(f"        {stage['stage']:<16} {stage['seconds']:8.3f}s  "
+                      f"{stage['files_read']:>7} read  {stage['bytes_written'] / 1024:>10.1f} KiB written", file=sys.stderr)
+        if not args.no_memory:
+            # A separate (warm) run, since tracing allocations slows every stage down
+            memory = cycles[cycle]['warm']['memory'] = run_memory_cycle(repository, cycle)
+            print(f"  🧠 {cycle} peak {memory['peak_bytes'] / 1024 / 1024:8.2f} MiB traced, "
+                  f"{memory['max_rss_bytes'] / 1024 / 1024:.1f} MiB RSS", file=sys.stderr)
+        if not args.keep:
+            shutil.rmtree(repository, ignore_errors=True)
+
+    return {'documents': documents, 'bytes': summary['bytes'], 'cycles': cycles}
+
+
+def metrics(results: Dict) -> Dict[str, Tuple[float, bool]]:
+    """Flatten results into comparable numbers: name -> (value, is_seconds)"""
+    values = {}
+    for size in results['sizes']:
+        label = f"{size['documents']} docs"
+        for action, timing in size.get('actions', {}).items():
+            values[f"{label} / {action} median"] = (timing['median'], True)
+        for cycle, phases in size.get('cycles', {}).items():
+            for phase, run in phases.items():
+                prefix = f"{label} / {cycle} {phase}"
+                values[f"{prefix} total"] = (run['seconds'], True)
+                for stage in run['stages']:
+                    values[f"{prefix} / {stage['stage']} seconds"] = (stage['seconds'], True)
+                    for counter in ('files_read', 'bytes_written'):
+                        if counter in stage:
+                            values[f"{prefix} / {stage['stage']} {counter}"] = (stage[counter], False)
+                memory = run.get('memory')
+                if memory:
+                    values[f"{prefix} peak_bytes"] = (memory['peak_bytes'], False)
+                    values[f"{prefix} max_rss_bytes"] = (memory['max_rss_bytes'], False)
+                    for stage, peak in memory['stages'].items():
+                        values[f"{prefix} / {stage} peak_bytes"] = (peak, False)
+    return values
+
+
+def find_regressions(results: Dict, baseline: Dict, threshold: float, min_seconds: float) -> List[str]:
+    """Metrics that grew by more than `threshold` (and, for times, by at least `min_seconds`)"""
+    current = metrics(results)
+    regressions = []
+    for name, (before, is_seconds) in metrics(baseline).items():
+        if name not in current:
+            continue
+        after = current[name][0]
+        allowed = before * (1 + threshold)
+        if is_seconds:
+            allowed = max(allowed, before + min_seconds)
+        if after > allowed:
+            change = f"+{(after - before) / before:.0%}" if before else "new"
+            regressions.append(f"{name}: {before:g} -> {after:g} ({change})")
+    return regressions
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark BrainHelper actions on synthetic corpora")
+    parser.add_argument('--documents', type=int, nargs='+', default=[1000, 10000],
+                        help='Corpus sizes to benchmark (default: 1000 10000)')
+    parser.add_argument('--actions', nargs='+', choices=list(ACTIONS), default=list(ACTIONS),
+                        help='Actions to time (default: all)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per action; the first is reported separately (default: 3)')
+    parser.add_argument('--jobs', type=int, default=1, help='Worker processes passed to each action (default: 1)')
+    parser.add_argument('--seed', type=int, default=42, help='Corpus generator seed (default: 42)')
+    parser.add_argument('--tags', type=int, default=200, help='Distinct tags (Zipf-distributed, default: 200)')
+    parser.add_argument('--tags-per-document', type=int, default=3, help='Tags drawn per document (default: 3)')
+    parser.add_argument('--depth', type=int, default=2, help='Directory levels below each category (default: 2)')
+    parser.add_argument('--fanout', type=int, default=8, help='Subdirectories per level (default: 8)')
+    parser.add_argument('--body-words', type=int, default=300, help='Median body length in words (default: 300)')
+    parser.add_argument('--deprecated-ratio', type=float, default=0.05, help='Share of deprecated documents (default: 0.05)')
+    parser.add_argument('--workdir', help='Directory for generated corpora (default: a temporary directory)')
+    parser.add_argument('--keep', action='store_true', help='Keep generated corpora')
+    parser.add_argument('--output', '-o', help='Write JSON results to this file (default: stdout)')
+    parser.add_argument('--pipeline', action='store_true',
+                        help='Benchmark the integrated update cycles on a synthetic repository instead of single actions')
+    parser.add_argument('--no-memory', action='store_true',
+                        help='Skip the extra --memprofile run of each pipeline cycle')
+    parser.add_argument('--baseline', help='Compare with the results stored in this file and fail on regressions')
+    parser.add_argument('--update-baseline', action='store_true', help='Store these results as the --baseline instead')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='Allowed growth over the baseline as a fraction (default: 0.25)')
+    parser.add_argument('--min-seconds', type=float, default=0.05,
+                        help='Ignore time regressions smaller than this many seconds (default: 0.05)')
+    args = parser.parse_args()
+    
+    if args.update_baseline and not args.baseline:
+        parser.error("--update-baseline requires --baseline")
+
+    workdir = Path(args.workdir) if args.workdir else Path(tempfile.mkdtemp(prefix='brain-bench-'))
+    workdir.mkdir(parents=True, exist_ok=True)
+
+    results = {
+        'schema_version': SCHEMA_VERSION,
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'mode': 'pipeline' if args.pipeline else 'actions',
+        'settings': dict(corpus_settings(args), repeat=args.repeat, jobs=args.jobs),
+        'sizes': [],
+    }
+
+    try:
+        for documents in args.documents:
+            if args.pipeline:
+                print(f"📚 Pipeline on {documents} documents", file=sys.stderr)
+                results['sizes'].append(benchmark_pipeline(documents, args, workdir))
+            else:
+                results['sizes'].append(benchmark_size(documents, args, workdir))
+    finally:
+        if not args.workdir and not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+        print(f"✅ Results written to {args.output}")
+    else:
+        print(output)
+    
+    if args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+        print(f"📌 Baseline stored in {args.baseline}", file=sys.stderr)
+    elif args.baseline:
+        if not os.path.exists(args.baseline):
+            print(f"❌ No baseline at {args.baseline} (store one with --update-baseline)", file=sys.stderr)
+            sys.exit(1)
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('mode', 'actions') != results['mode'] or baseline.get('settings') != results['settings']:
+            print("⚠️  Baseline was recorded with different settings; only matching metrics are compared", file=sys.stderr)
+        
+        regressions = find_regressions(results, baseline, args.threshold, args.min_seconds)
+        if regressions:
+            print(f"❌ {len(regressions)} regressions against {args.baseline} (threshold {args.threshold:.0%}):", file=sys.stderr)
+            for regression in regressions:
+                print(f"  - {regression}", file=sys.stderr)
+            sys.exit(1)
+        print(f"✅ No regressions against {args.baseline} (threshold {args.threshold:.0%})", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
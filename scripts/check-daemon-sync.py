@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Daemon Sync Check
+Starts a brain daemon without watchdog on a generated knowledge base, writes
+documents from separate processes, and fails unless the daemon's answers
+catch up within a few poll intervals. Writers update the shared catalog
+themselves, so only the catalog generation tells the daemon about them.
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+BRAIN = ROOT / "brain"
+sys.path.insert(0, str(ROOT / 'utils'))
+
+from brain_client import BrainClient
+from brain_corpus import generate_corpus
+
+POLL_INTERVAL = 0.2
+TAG = 'daemon-sync-check'
+
+
+def wait_for(condition, timeout: float) -> bool:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(POLL_INTERVAL / 2)
+    return False
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Check that the daemon sees writes from other processes")
+    parser.add_argument('--documents', type=int, default=40, help='Documents in the generated knowledge base (default: 40)')
+    parser.add_argument('--timeout', type=float, default=10.0, help='Seconds to wait for the daemon to catch up (default: 10)')
+    args = parser.parse_args()
+
+    failures = []
+    with tempfile.TemporaryDirectory(prefix='brain-sync-') as workdir:
+        root = Path(workdir) / 'kb'
+        generate_corpus(root, documents=args.documents)
+
+        # An empty `watchdog` package hides the real one, as on hosts without it
+        stub = Path(workdir) / 'stub'
+        (stub / 'watchdog').mkdir(parents=True)
+        (stub / 'watchdog' / '__init__.py').write_text('')
+        env = dict(os.environ, PYTHONPATH=str(stub), BRAIN_HEADER_CACHE='off', BRAIN_DAEMON='off')
+
+        def brain(*arguments: str):
+            subprocess.run([sys.executable, str(BRAIN), *arguments], cwd=root, env=env,
+                           stdout=subprocess.DEVNULL, check=True)
+
+        daemon = subprocess.Popen([sys.executable, str(BRAIN), 'serve', '--interval', str(POLL_INTERVAL)],
+                                  cwd=root, env=env, stdout=subprocess.PIPE, text=True)
+        try:
+            banner = daemon.stdout.readline()
+            if 'watchdog not installed' not in banner:
+                raise RuntimeError(f"Daemon did not start in polling mode: {banner.strip()}")
+            client = None
+            if wait_for(lambda: BrainClient.connect(root) is not None, args.timeout):
+                client = BrainClient.connect(root)
+            if client is None:
+                raise RuntimeError("Brain daemon did not start in time")
+
+            total = client.get_statistics()['total']
+            print(f"🧠 Daemon serving {total} documents (polling every {POLL_INTERVAL}s, no watchdog)")
+
+            # A document created by another process
+            brain('create', '--title', 'Daemon Sync Check', '--type', 'knowledge', '--subtype', 'decisions',
+                  '--content', 'Written by a separate process.', '--tags', TAG, '--ship-factor', '9')
+            if wait_for(lambda: client.get_statistics()['total'] == total + 1, args.timeout):
+                print("✅ Create in another process seen by the daemon")
+            else:
+                failures.append(f"total stayed {client.get_statistics()['total']} after a create (expected {total + 1})")
+
+            # A metadata update by another process, to a row the daemon already holds
+            tagged = client.find_by_tags([TAG])
+            if tagged:
+                path = tagged[0]['path']
+                subprocess.run([
+                    sys.executable, '-c',
+                    "import sys; sys.path.insert(0, sys.argv[1]); from brain_helper import BrainHelper; "
+                    "BrainHelper().update_document(sys.argv[2], metadata_updates={'ship_factor': 10})",
+                    str(ROOT / 'utils'), path
+                ], cwd=root, env=env, stdout=subprocess.DEVNULL, check=True)
+                if wait_for(lambda: client.find_by_tags([TAG])[0]['ship_factor'] == 10, args.timeout):
+                    print("✅ Update in another process seen by the daemon")
+                else:
+                    failures.append("ship factor stayed 9 after an update in another process")
+            client.close()
+        finally:
+            daemon.terminate()
+            daemon.wait()
+
+    if failures:
+        print("\n❌ Daemon sync check failed:")
+        for failure in failures:
+            print(f"  - {failure}")
+        sys.exit(1)
+    print("\n✅ Daemon picked up every write")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Startup Check
+Times cold starts of the `brain` command and fails when a daemon-backed
+query exceeds its budget or pulls in modules that belong to the slow path.
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+BRAIN = ROOT / "brain"
+sys.path.insert(0, str(ROOT / 'utils'))
+
+from brain_client import BrainClient
+
+# Modules a daemon-backed query must not import (parsing, catalog, snapshot;
+# the daemon parses the command line, and the client uses _socket directly)
+HEAVY_MODULES = ['yaml', 'frontmatter', 'sqlite3', 'brain_helper', 'brain_catalog', 'pathlib', 'typing',
+                 'argparse', 'socket']
+
+
+def time_command(args, runs: int, env=None) -> float:
+    """Median wall time of a command in milliseconds"""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(args, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def imported_modules(command) -> set:
+    """Modules loaded while running a brain command (from -X importtime)"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', str(BRAIN)] + command,
+                            cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True)
+    return {line.rsplit('|', 1)[1].strip() for line in result.stderr.splitlines() if line.startswith('import time:')}
+
+
+def wait_for_daemon(process: subprocess.Popen, timeout: float = 60.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("Brain daemon exited during startup")
+        client = BrainClient.connect(ROOT)
+        if client is not None:
+            client.close()
+            return
+        time.sleep(0.1)
+    raise RuntimeError("Brain daemon did not start in time")
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Check brain CLI cold start time")
+    parser.add_argument('--budget', type=float, default=float(os.environ.get('BRAIN_STARTUP_BUDGET', 50)),
+                        help='Maximum median milliseconds for a daemon-backed query (default: 50)')
+    parser.add_argument('--runs', type=int, default=15, help='Runs per command (default: 15)')
+    parser.add_argument('--path', help='Document to read (default: first listed document)')
+    args = parser.parse_args()
+
+    # Use the running daemon, or start one for the duration of the check
+    daemon = None
+    client = BrainClient.connect(ROOT)
+    if client is None:
+        print("🚀 Starting a temporary brain daemon...")
+        daemon = subprocess.Popen([sys.executable, str(BRAIN), 'serve'], cwd=ROOT, stdout=subprocess.DEVNULL)
+        wait_for_daemon(daemon)
+        client = BrainClient.connect(ROOT)
+
+    try:
+        path = args.path or next(iter(client.iter_documents()), {}).get('path')
+        client.close()
+        commands = [['stats']]
+        if path:
+            commands.append(['read', '--path', path])
+
+        failures = []
+        baseline = time_command([sys.executable, '-c', 'pass'], args.runs)
+        local_env = dict(os.environ, BRAIN_DAEMON='off')
+        print(f"⏱️  Interpreter baseline: {baseline:.1f} ms")
+
+        for command in commands:
+            label = ' '.join(command)
+            warm = time_command([sys.executable, str(BRAIN)] + command, args.runs)
+            cold = time_command([sys.executable, str(BRAIN)] + command, max(3, args.runs // 5), env=local_env)
+            status = "✅" if warm <= args.budget else "❌"
+            print(f"{status} brain {label}: {warm:.1f} ms with daemon, {cold:.1f} ms without")
+            if warm > args.budget:
+                failures.append(f"brain {label} took {warm:.1f} ms (budget {args.budget:.0f} ms)")
+
+            heavy = sorted(set(HEAVY_MODULES) & imported_modules(command))
+            if heavy:
+                failures.append(f"brain {label} imported {', '.join(heavy)}")
+    finally:
+        if daemon is not None:
+            daemon.terminate()
+            daemon.wait()
+
+    if failures:
+        print("\n❌ Startup check failed:")
+        for failure in failures:
+            print(f"  - {failure}")
+        sys.exit(1)
+    print("\n✅ Startup within budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -22,11 +22,15 @@ except ImportError:
     print("Warning: context_notifier module not found. Notifications will be disabled.")
     ContextNotifier = None
 
-try:
-    import frontmatter
-except ImportError:
-    print("Please install python-frontmatter: pip install python-frontmatter")
-    sys.exit(1)
+# Header-only frontmatter reader lives in utils
+sys.path.append(str(Path(__file__).parent.parent / 'utils'))
+from frontmatter_reader import load_header
+from header_cache import get_cache
+from brain_metrics import Registry, add_metrics_arguments, exporter
+from brain_profile import add_profile_argument, profiled, start as start_profile
+
+# Seconds between checks in watch mode
+WATCH_INTERVAL = 5.0
 
 
 class ContextMonitor:
@@ -42,6 +46,7 @@ class ContextMonitor:
         self.changelog_file = self.root / 'CHANGELOG.md'
         self.notifier = ContextNotifier(str(self.root)) if ContextNotifier else None
         self.load_state()
+        self.create_metrics()
     
     def load_state(self):
         """Load previous file states"""
@@ -70,16 +75,18 @@ class ContextMonitor:
             return {}
         
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                post = frontmatter.load(f)
+            with open(file_path, 'rb') as f:
+                metadata = load_header(f)
+                # Only the line count needs the body, and it needs no parsing
+                body = f.read()
             
             return {
-                'title': post.metadata.get('title', ''),
-                'modified': post.metadata.get('modified', ''),
-                'version': post.metadata.get('version', 1),
-                'ship_factor': post.metadata.get('ship_factor', 5),
+                'title': metadata.get('title', ''),
+                'modified': metadata.get('modified', ''),
+                'version': metadata.get('version', 1),
+                'ship_factor': metadata.get('ship_factor', 5),
                 'size': file_path.stat().st_size,
-                'lines': len(post.content.split('\n'))
+                'lines': body.strip().count(b'\n') + 1
             }
         except Exception as e:
             print(f"Warning: Could not read metadata from {file_path}: {e}")
@@ -92,6 +99,7 @@ class ContextMonitor:
                 'lines': 0
             }
     
+    @profiled('check-changes')
     def check_changes(self) -> Dict[str, Dict]:
         """Check for changes in context files"""
         changes = {}
@@ -157,6 +165,7 @@ class ContextMonitor:
         
         return '\n'.join(entry_lines)
     
+    @profiled('changelog')
     def update_changelog(self, changelog_entry: str):
         """Update CHANGELOG.md with new entry"""
         if not changelog_entry:
@@ -213,54 +222,107 @@ class ContextMonitor:
         
         return '\n'.join(summary_lines)
     
+    def create_metrics(self):
+        """Counters and histograms for watch mode (exported only when asked)"""
+        self.metrics = Registry()
+        self.cycles = self.metrics.counter('brain_monitor_cycles_total', 'Context file checks run')
+        self.scan_seconds = self.metrics.histogram('brain_monitor_scan_seconds', 'Time to check the context files for changes')
+        self.changed_files = self.metrics.histogram('brain_monitor_changed_files', 'Context files changed per check',
+                                                    buckets=(0, 1, 2, 5, 10))
+        self.changes_total = self.metrics.counter('brain_monitor_changed_files_total', 'Context file changes detected')
+        self.notification_seconds = self.metrics.histogram(
+            'brain_monitor_notification_latency_seconds',
+            'Time from a context file being modified to its changelog entry and notifications being written',
+            buckets=(0.5, 1, 2.5, 5, 10, 30, 60, 300, 900))
+        self.last_cycle = self.metrics.gauge('brain_monitor_last_cycle_timestamp_seconds', 'Unix time the last check finished')
+        self.errors = self.metrics.counter('brain_monitor_errors_total', 'Checks that failed with an exception')
+        cache = get_cache()
+        if cache is not None:
+            self.metrics.counter('brain_header_cache_hits_total', 'Frontmatter headers served from the header cache',
+                                 function=lambda: cache.hits)
+            self.metrics.counter('brain_header_cache_misses_total', 'Frontmatter headers parsed and added to the header cache',
+                                 function=lambda: cache.misses)
+
+    def check_cycle(self) -> Dict[str, Dict]:
+        """One timed check for changes"""
+        start = time.perf_counter()
+        changes = self.check_changes()
+        self.scan_seconds.observe(time.perf_counter() - start)
+        self.cycles.inc()
+        self.changed_files.observe(len(changes))
+        self.changes_total.inc(len(changes))
+        self.last_cycle.set(time.time())
+        return changes
+
+    def handle_changes(self, changes: Dict[str, Dict]):
+        """Write the changelog entry and summary, notify, and save state"""
+        print(f"📝 Found changes in {len(changes)} context file(s):")
+        for name in changes.keys():
+            print(f"  - {name}")
+        
+        # Generate changelog entry
+        changelog_entry = self.generate_changelog_entry(changes)
+        
+        # Update changelog
+        self.update_changelog(changelog_entry)
+        
+        # Create summary
+        summary = self.create_context_summary(changes)
+        summary_file = self.root / 'CONTEXT-UPDATE-SUMMARY.md'
+        with open(summary_file, 'w', encoding='utf-8') as f:
+            f.write(summary)
+        print(f"📋 Created summary: {summary_file}")
+        
+        # Send notifications
+        if self.notifier:
+            self.notifier.send_notifications(changes)
+        
+        # Save state
+        self.save_state()
+        
+        # Measured from the file's mtime, so slow polling shows up too
+        now = time.time()
+        for change in changes.values():
+            try:
+                self.notification_seconds.observe(max(0.0, now - os.stat(change['file_path']).st_mtime))
+            except OSError:
+                continue
+    
+    @profiled('monitor')
     def run_monitor(self, watch_mode: bool = False):
         """Run the context monitor"""
         print("🔍 Checking for context file changes...")
         
-        changes = self.check_changes()
+        changes = self.check_cycle()
         
         if changes:
-            print(f"📝 Found changes in {len(changes)} context file(s):")
-            for name in changes.keys():
-                print(f"  - {name}")
-            
-            # Generate changelog entry
-            changelog_entry = self.generate_changelog_entry(changes)
-            
-            # Update changelog
-            self.update_changelog(changelog_entry)
-            
-            # Create summary
-            summary = self.create_context_summary(changes)
-            summary_file = self.root / 'CONTEXT-UPDATE-SUMMARY.md'
-            with open(summary_file, 'w', encoding='utf-8') as f:
-                f.write(summary)
-            print(f"📋 Created summary: {summary_file}")
-            
-            # Send notifications
-            if self.notifier:
-                self.notifier.send_notifications(changes)
-            
-            # Save state
-            self.save_state()
-            
+            self.handle_changes(changes)
             print("✅ Context monitoring complete")
-            
-            # If in watch mode, continue monitoring
-            if watch_mode:
-                print("👀 Watching for changes... (Press Ctrl+C to stop)")
-                try:
-                    while True:
-                        time.sleep(5)  # Check every 5 seconds
-                        new_changes = self.check_changes()
-                        if new_changes:
-                            print(f"\n🔄 New changes detected at {datetime.now().strftime('%H:%M:%S')}")
-                            self.run_monitor(watch_mode=False)
-                except KeyboardInterrupt:
-                    print("\n👋 Stopping context monitor")
         else:
             print("✅ No changes detected in context files")
             self.save_state()
+        
+        # If in watch mode, continue monitoring
+        if watch_mode:
+            self.watch()
+    
+    def watch(self, interval: float = WATCH_INTERVAL):
+        """Check for changes every `interval` seconds until interrupted"""
+        print("👀 Watching for changes... (Press Ctrl+C to stop)")
+        try:
+            while True:
+                time.sleep(interval)
+                try:
+                    new_changes = self.check_cycle()
+                    if new_changes:
+                        print(f"\n🔄 New changes detected at {datetime.now().strftime('%H:%M:%S')}")
+                        self.handle_changes(new_changes)
+                except Exception as e:
+                    # Keep watching; the error counter makes repeated failures visible
+                    self.errors.inc()
+                    print(f"❌ Context check failed: {e}")
+        except KeyboardInterrupt:
+            print("\n👋 Stopping context monitor")
     
     def force_update(self):
         """Force update of all context files (useful for initial setup)"""
@@ -292,15 +354,23 @@ def main():
     parser.add_argument('--watch', action='store_true', help='Watch mode - continuously monitor files')
     parser.add_argument('--force-update', action='store_true', help='Force update file states')
     parser.add_argument('--root', default='.', help='Root directory path')
+    parser.add_argument('--interval', type=float, default=WATCH_INTERVAL, help='Seconds between checks in watch mode')
+    add_metrics_arguments(parser)
+    add_profile_argument(parser)
     
     args = parser.parse_args()
+    start_profile(args.profile, memory=args.memprofile, slow_files=args.slow_files, trace=args.trace)
     
     monitor = ContextMonitor(args.root)
     
     if args.force_update:
         monitor.force_update()
+    elif args.watch:
+        with exporter(monitor.metrics, args):
+            monitor.run_monitor()
+            monitor.watch(args.interval)
     else:
-        monitor.run_monitor(watch_mode=args.watch)
+        monitor.run_monitor()
 
 
 if __name__ == "__main__":
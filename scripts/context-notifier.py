@@ -8,14 +8,13 @@ Supports multiple notification methods: console, file, email, webhook.
 import os
 import sys
 import json
-import smtplib
-import requests
 from datetime import datetime
 from pathlib import Path
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 from typing import Dict, List, Optional
 
+sys.path.append(str(Path(__file__).parent.parent / 'utils'))
+from brain_profile import add_profile_argument, profiled, start as start_profile
+
 
 class ContextNotifier:
     """Send notifications about context file changes"""
@@ -133,6 +132,11 @@ class ContextNotifier:
             return
         
         try:
+            # Mail and HTTP modules are only loaded when a notification goes out
+            import smtplib
+            from email.mime.text import MIMEText
+            from email.mime.multipart import MIMEMultipart
+
             # Create message
             msg = MIMEMultipart()
             msg['From'] = email_config['from_email']
@@ -165,6 +169,12 @@ class ContextNotifier:
             print("⚠️  Webhook URL not configured")
             return
         
+        try:
+            import requests
+        except ImportError:
+            print("❌ Webhook notifications need requests: pip install requests")
+            return
+        
         try:
             payload = {
                 'text': message,
@@ -187,6 +197,7 @@ class ContextNotifier:
         except Exception as e:
             print(f"❌ Failed to send webhook notification: {e}")
     
+    @profiled('notify')
     def send_notifications(self, changes: Dict[str, Dict]):
         """Send all configured notifications"""
         if not changes:
@@ -254,8 +265,10 @@ def main():
     parser.add_argument('--disable', help='Disable notification type (console, file, email, webhook)')
     parser.add_argument('--test', action='store_true', help='Send test notification')
     parser.add_argument('--root', default='.', help='Root directory path')
+    add_profile_argument(parser)
     
     args = parser.parse_args()
+    start_profile(args.profile, memory=args.memprofile, slow_files=args.slow_files, trace=args.trace)
     
     notifier = ContextNotifier(args.root)
     
@@ -18,6 +18,11 @@ except ImportError:
     print("Please install python-frontmatter: pip install python-frontmatter")
     sys.exit(1)
 
+sys.path.append(str(Path(__file__).parent.parent / 'utils'))
+from frontmatter_reader import load_post
+from brain_walk import walk_files
+from brain_profile import add_profile_argument, profiled, start as start_profile
+
 
 class ContextSync:
     """Synchronizes context files with their source directories"""
@@ -51,14 +56,16 @@ class ContextSync:
         with open(self.context_files['infrastructure']['last_sync_file'], 'w') as f:
             json.dump(self.sync_state, f, indent=2)
     
+    @profiled('directory-hash')
     def get_directory_hash(self, dir_path: Path) -> str:
         """Get hash of directory contents"""
         if not dir_path.exists():
             return ""
         
         hashes = []
-        for file_path in sorted(dir_path.rglob("*")):
-            if file_path.is_file() and not file_path.name.startswith('.'):
+        # walk_files yields sorted paths and skips ignored directories entirely
+        for file_path in walk_files(dir_path, "*", root=self.root):
+            if not file_path.name.startswith('.'):
                 try:
                     with open(file_path, 'rb') as f:
                         hashes.append(hashlib.md5(f.read()).hexdigest())
@@ -95,7 +102,7 @@ class ContextSync:
         # Read existing context file
         if context_file.exists():
             with open(context_file, 'r', encoding='utf-8') as f:
-                post = frontmatter.load(f)
+                post = load_post(f.read())
         else:
             post = frontmatter.Post("")
         
@@ -118,6 +125,7 @@ class ContextSync:
             print("✅ Infrastructure context already up to date")
             return False
     
+    @profiled('infrastructure-content')
     def generate_infrastructure_content(self, source_dir: Path) -> str:
         """Generate infrastructure context content from source directory"""
         content = [
@@ -264,6 +272,7 @@ class ContextSync:
         else:
             return "Configuration file"
     
+    @profiled('sync-contexts')
     def sync_all_contexts(self):
         """Synchronize all context files"""
         print("🔄 Starting context synchronization...")
@@ -299,8 +308,10 @@ def main():
     parser.add_argument('--sync', action='store_true', help='Sync all context files')
     parser.add_argument('--check', action='store_true', help='Check if sync is needed')
     parser.add_argument('--root', default='.', help='Root directory path')
+    add_profile_argument(parser)
     
     args = parser.parse_args()
+    start_profile(args.profile, memory=args.memprofile, slow_files=args.slow_files, trace=args.trace)
     
     syncer = ContextSync(args.root)
     
@@ -5,6 +5,7 @@ Automatically scans the infrastructure directory and updates INFRASTRUCTURE-OVER
 with current state, services, and configurations.
 """
 
+import functools
 import os
 import sys
 import json
@@ -16,12 +17,29 @@ from typing import Dict, List, Set, Tuple, Any
 from collections import defaultdict
 
 try:
-    import frontmatter
     import yaml
 except ImportError:
-    print("Please install required dependencies: pip install python-frontmatter pyyaml")
+    print("Please install required dependencies: pip install pyyaml")
     sys.exit(1)
 
+# Header-only frontmatter reader lives in utils
+sys.path.append(str(Path(__file__).parent.parent / 'utils'))
+from frontmatter_reader import split_document
+from brain_walk import BrainIgnore, walk_files
+from brain_profile import add_profile_argument, file_cost, profiled, start as start_profile, tracing_files
+
+
+def extraction(method):
+    """Charge an extract_* method's time to the file it scans (for --slow-files)"""
+    @functools.wraps(method)
+    def wrapper(self, source):
+        if not tracing_files():
+            return method(self, source)
+        path = source if isinstance(source, Path) else self.infrastructure_dir / source['path']
+        with file_cost(path, 'extract'):
+            return method(self, source)
+    return wrapper
+
 
 class InfrastructureScanner:
     """Scans infrastructure directory and generates comprehensive overview"""
@@ -30,6 +48,7 @@ class InfrastructureScanner:
         self.root = Path(root_path)
         self.infrastructure_dir = self.root / "infrastructure"
         self.overview_file = self.infrastructure_dir / "INFRASTRUCTURE-OVERVIEW.md"
+        self.ignore = BrainIgnore(self.root)
         
         # Scan results
         self.scan_results = {
@@ -45,6 +64,11 @@ class InfrastructureScanner:
             'statistics': {}
         }
     
+    def walk(self, top: Path, patterns):
+        """Walk files below top, pruning ignored directories"""
+        return walk_files(top, patterns, root=self.root, ignore=self.ignore)
+    
+    @profiled('scan')
     def scan_infrastructure(self):
         """Main scan function that orchestrates all scanning operations"""
         print("🔍 Starting infrastructure scan...")
@@ -63,6 +87,7 @@ class InfrastructureScanner:
         
         print("✅ Infrastructure scan complete")
     
+    @profiled('environments')
     def scan_environments(self):
         """Scan environment configurations"""
         print("📁 Scanning environments...")
@@ -82,7 +107,7 @@ class InfrastructureScanner:
                 }
                 
                 # Scan files in environment
-                for file_path in env_folder.rglob("*.md"):
+                for file_path in self.walk(env_folder, "*.md"):
                     if file_path.is_file():
                         file_info = self.analyze_markdown_file(file_path)
                         env_info['files'].append(file_info)
@@ -101,6 +126,7 @@ class InfrastructureScanner:
                 
                 self.scan_results['environments'][env_name] = env_info
     
+    @profiled('services')
     def scan_services(self):
         """Scan service configurations"""
         print("🔧 Scanning services...")
@@ -120,7 +146,7 @@ class InfrastructureScanner:
                 }
                 
                 # Scan service files
-                for file_path in service_folder.rglob("*.md"):
+                for file_path in self.walk(service_folder, "*.md"):
                     if file_path.is_file():
                         file_info = self.analyze_markdown_file(file_path)
                         service_info['files'].append(file_info)
@@ -135,6 +161,7 @@ class InfrastructureScanner:
                 
                 self.scan_results['services'][service_name] = service_info
     
+    @profiled('networking')
     def scan_networking(self):
         """Scan networking configurations"""
         print("🌐 Scanning networking...")
@@ -150,7 +177,7 @@ class InfrastructureScanner:
             'vpn': {}
         }
         
-        for file_path in networking_dir.rglob("*.md"):
+        for file_path in self.walk(networking_dir, "*.md"):
             if file_path.is_file():
                 file_info = self.analyze_markdown_file(file_path)
                 
@@ -164,6 +191,7 @@ class InfrastructureScanner:
         
         self.scan_results['networking'] = networking_info
     
+    @profiled('security')
     def scan_security(self):
         """Scan security configurations"""
         print("🔒 Scanning security...")
@@ -178,7 +206,7 @@ class InfrastructureScanner:
             'access_control': {}
         }
         
-        for file_path in security_dir.rglob("*.md"):
+        for file_path in self.walk(security_dir, "*.md"):
             if file_path.is_file():
                 file_info = self.analyze_markdown_file(file_path)
                 
@@ -192,6 +220,7 @@ class InfrastructureScanner:
         
         self.scan_results['security'] = security_info
     
+    @profiled('containers')
     def scan_containers(self):
         """Scan container configurations"""
         print("🐳 Scanning containers...")
@@ -206,7 +235,7 @@ class InfrastructureScanner:
             'kubernetes': []
         }
         
-        for file_path in containers_dir.rglob("*"):
+        for file_path in self.walk(containers_dir, "*"):
             if file_path.is_file():
                 if file_path.name == 'docker-compose.yml':
                     container_info['docker_compose_files'].append({
@@ -221,6 +250,7 @@ class InfrastructureScanner:
         
         self.scan_results['containers'] = container_info
     
+    @profiled('mcp-servers')
     def scan_mcp_servers(self):
         """Scan MCP server configurations"""
         print("🤖 Scanning MCP servers...")
@@ -243,7 +273,7 @@ class InfrastructureScanner:
         # Scan individual MCP server configs
         mcp_servers_dir = mcp_dir / "mcp-servers"
         if mcp_servers_dir.exists():
-            for server_file in mcp_servers_dir.rglob("*.md"):
+            for server_file in self.walk(mcp_servers_dir, "*.md"):
                 if server_file.is_file():
                     server_info = self.analyze_markdown_file(server_file)
                     server_info['name'] = server_file.stem
@@ -251,6 +281,7 @@ class InfrastructureScanner:
         
         self.scan_results['mcp_servers'] = mcp_info
     
+    @profiled('cloud')
     def scan_cloud_services(self):
         """Scan cloud service configurations"""
         print("☁️ Scanning cloud services...")
@@ -265,7 +296,7 @@ class InfrastructureScanner:
             'cloudflare': {}
         }
         
-        for cloud_file in cloud_dir.rglob("*.md"):
+        for cloud_file in self.walk(cloud_dir, "*.md"):
             if cloud_file.is_file():
                 file_info = self.analyze_markdown_file(cloud_file)
                 cloud_name = cloud_file.stem
@@ -275,6 +306,7 @@ class InfrastructureScanner:
         
         self.scan_results['cloud_services'] = cloud_info
     
+    @profiled('databases')
     def scan_databases(self):
         """Scan database configurations"""
         print("🗄️ Scanning databases...")
@@ -289,7 +321,7 @@ class InfrastructureScanner:
             'supabase': {}
         }
         
-        for db_file in db_dir.rglob("*.md"):
+        for db_file in self.walk(db_dir, "*.md"):
             if db_file.is_file():
                 file_info = self.analyze_markdown_file(db_file)
                 db_name = db_file.stem
@@ -299,6 +331,7 @@ class InfrastructureScanner:
         
         self.scan_results['databases'] = db_info
     
+    @profiled('monitoring')
     def scan_monitoring(self):
         """Scan monitoring configurations"""
         print("📊 Scanning monitoring...")
@@ -313,7 +346,7 @@ class InfrastructureScanner:
             'alerting': []
         }
         
-        for monitor_file in monitoring_dir.rglob("*.md"):
+        for monitor_file in self.walk(monitoring_dir, "*.md"):
             if monitor_file.is_file():
                 file_info = self.analyze_markdown_file(monitor_file)
                 
@@ -350,12 +383,12 @@ class InfrastructureScanner:
     def analyze_markdown_file(self, file_path: Path) -> Dict[str, Any]:
         """Analyze a markdown file and extract metadata"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
+            with file_cost(file_path, 'read'), open(file_path, 'r', encoding='utf-8') as f:
                 content = f.read()
             
-            # Parse frontmatter
-            post = frontmatter.loads(content)
-            metadata = post.metadata
+            # Parse frontmatter (header block only)
+            with file_cost(file_path, 'parse'):
+                metadata, body = split_document(content)
             
             return {
                 'path': str(file_path.relative_to(self.infrastructure_dir)),
@@ -367,7 +400,7 @@ class InfrastructureScanner:
                 'modified': metadata.get('modified', ''),
                 'version': metadata.get('version', 1),
                 'ship_factor': metadata.get('ship_factor', 5),
-                'content': post.content,
+                'content': body,
                 'size': len(content)
             }
         except Exception as e:
@@ -386,6 +419,7 @@ class InfrastructureScanner:
                 'size': 0
             }
     
+    @extraction
     def extract_ports(self, file_info: Dict) -> List[Dict]:
         """Extract port information from file content"""
         ports = []
@@ -401,6 +435,7 @@ class InfrastructureScanner:
         
         return ports
     
+    @extraction
     def extract_firewall_rules(self, file_info: Dict) -> List[Dict]:
         """Extract firewall rules from file content"""
         rules = []
@@ -413,6 +448,7 @@ class InfrastructureScanner:
         
         return rules
     
+    @extraction
     def extract_ssh_keys(self, file_info: Dict) -> List[Dict]:
         """Extract SSH key information from file content"""
         keys = []
@@ -425,6 +461,7 @@ class InfrastructureScanner:
         
         return keys
     
+    @extraction
     def extract_certificates(self, file_info: Dict) -> List[Dict]:
         """Extract certificate information from file content"""
         certs = []
@@ -437,6 +474,7 @@ class InfrastructureScanner:
         
         return certs
     
+    @extraction
     def extract_docker_services(self, file_path: Path) -> List[Dict]:
         """Extract Docker services from docker-compose.yml"""
         services = []
@@ -453,6 +491,7 @@ class InfrastructureScanner:
         
         return services
     
+    @extraction
     def extract_dockerfile_base(self, file_path: Path) -> str:
         """Extract base image from Dockerfile"""
         try:
@@ -465,6 +504,7 @@ class InfrastructureScanner:
         
         return 'unknown'
     
+    @extraction
     def extract_database_config(self, file_info: Dict) -> Dict:
         """Extract database configuration from file info"""
         config = {}
@@ -480,6 +520,7 @@ class InfrastructureScanner:
         
         return config
     
+    @extraction
     def extract_cloud_config(self, file_info: Dict) -> Dict:
         """Extract cloud configuration from file info"""
         config = {}
@@ -495,6 +536,7 @@ class InfrastructureScanner:
         
         return config
     
+    @extraction
     def extract_monitoring_config(self, file_info: Dict) -> Dict:
         """Extract monitoring configuration from file info"""
         config = {}
@@ -510,6 +552,7 @@ class InfrastructureScanner:
         
         return config
     
+    @extraction
     def extract_health_checks(self, file_info: Dict) -> List[Dict]:
         """Extract health check configurations"""
         checks = []
@@ -522,6 +565,7 @@ class InfrastructureScanner:
         
         return checks
     
+    @extraction
     def extract_metrics(self, file_info: Dict) -> List[Dict]:
         """Extract metrics configurations"""
         metrics = []
@@ -534,6 +578,7 @@ class InfrastructureScanner:
         
         return metrics
     
+    @extraction
     def extract_alerting(self, file_info: Dict) -> List[Dict]:
         """Extract alerting configurations"""
         alerts = []
@@ -653,6 +698,7 @@ class InfrastructureScanner:
         # This can be enhanced to update database information
         return content
     
+    @profiled('update-overview')
     def update_overview_file(self):
         """Update the INFRASTRUCTURE-OVERVIEW.md file"""
         print("🔄 Updating infrastructure overview file...")
@@ -666,6 +712,7 @@ class InfrastructureScanner:
         
         print("✅ Infrastructure overview updated successfully")
     
+    @profiled('report')
     def generate_scan_report(self) -> str:
         """Generate a detailed scan report"""
         report = [
@@ -714,8 +761,10 @@ def main():
     parser.add_argument('--report', action='store_true', help='Generate detailed scan report')
     parser.add_argument('--report-file', default='infrastructure-scan-report.md', help='Output file for scan report')
     parser.add_argument('--root', default='.', help='Root directory path')
+    add_profile_argument(parser)
     
     args = parser.parse_args()
+    start_profile(args.profile, memory=args.memprofile, slow_files=args.slow_files, trace=args.trace)
     
     scanner = InfrastructureScanner(args.root)
     
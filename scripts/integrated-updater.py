@@ -5,15 +5,16 @@ Combines brain_helper.py and system-md-updater.py functionality for efficient up
 This script coordinates all documentation updates to avoid duplication and conflicts.
 """
 
-import os
 import sys
 import json
+import time
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Set, Tuple
 
 # Add utils to path for brain_helper import
-sys.path.append(str(Path(__file__).parent.parent / 'utils'))
+UTILS_DIR = Path(__file__).parent.parent / 'utils'
+sys.path.append(str(UTILS_DIR))
 
 try:
     from brain_helper import BrainHelper
@@ -21,29 +22,30 @@ except ImportError as e:
     print(f"Warning: Could not import brain_helper: {e}")
     BrainHelper = None
 
-# Import context monitor
-try:
-    import importlib.util
-    spec = importlib.util.spec_from_file_location("context_monitor", str(Path(__file__).parent / "context-monitor.py"))
-    context_monitor_module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(context_monitor_module)
-    ContextMonitor = context_monitor_module.ContextMonitor
-    ContextNotifier = getattr(context_monitor_module, 'ContextNotifier', None)
-except Exception as e:
-    print(f"Warning: Could not import context modules: {e}")
-    ContextMonitor = None
-    ContextNotifier = None
+from brain_profile import add_profile_argument, profile_command, stage, start as start_profile
 
-# Import system updater
-try:
-    import importlib.util
-    spec = importlib.util.spec_from_file_location("system_md_updater", str(Path(__file__).parent / "system-md-updater.py"))
-    system_updater_module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(system_updater_module)
-    SystemMDUpdater = system_updater_module.SystemMDUpdater
-except Exception as e:
-    print(f"Warning: Could not import system updater: {e}")
-    SystemMDUpdater = None
+# Profile counters copied into each --stage-report row
+STAGE_COUNTERS = ('files_read', 'files_written', 'bytes_written')
+
+# Sibling scripts (hyphenated file names, so not importable by name) are
+# loaded on first use rather than at startup; most runs need only one.
+_scripts = {}
+
+
+def load_script(filename: str, attribute: str):
+    """Load a class from a sibling script once, or None when it cannot be loaded"""
+    if filename not in _scripts:
+        try:
+            import importlib.util
+            module_name = filename[:-3].replace('-', '_')
+            spec = importlib.util.spec_from_file_location(module_name, str(Path(__file__).parent / filename))
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            _scripts[filename] = module
+        except Exception as e:
+            print(f"Warning: Could not import {filename}: {e}")
+            _scripts[filename] = None
+    return getattr(_scripts[filename], attribute, None)
 
 
 class IntegratedUpdater:
@@ -52,8 +54,8 @@ class IntegratedUpdater:
     def __init__(self, root_path: str = "."):
         self.root = Path(root_path)
         self.brain_helper = BrainHelper(str(self.root)) if BrainHelper else None
-        self.context_monitor = ContextMonitor(str(self.root)) if ContextMonitor else None
-        self.system_updater = SystemMDUpdater(str(self.root)) if SystemMDUpdater else None
+        self._context_monitor = None
+        self._system_updater = None
         
         # Track what needs updating
         self.update_needed = {
@@ -68,6 +70,45 @@ class IntegratedUpdater:
         
         # Shared analysis data
         self.shared_analysis = {}
+        
+        # Per-stage wall time (plus file counts while profiling), in run order
+        self.stages = []
+        self.success = False
+    
+    @property
+    def context_monitor(self):
+        """ContextMonitor, loaded the first time a stage needs it"""
+        if self._context_monitor is None:
+            ContextMonitor = load_script("context-monitor.py", "ContextMonitor")
+            self._context_monitor = ContextMonitor(str(self.root)) if ContextMonitor else False
+        return self._context_monitor
+
+    @property
+    def system_updater(self):
+        """SystemMDUpdater, loaded the first time a stage needs it"""
+        if self._system_updater is None:
+            SystemMDUpdater = load_script("system-md-updater.py", "SystemMDUpdater")
+            self._system_updater = SystemMDUpdater(str(self.root)) if SystemMDUpdater else False
+        return self._system_updater
+    
+    def run_stage(self, name: str, function):
+        """Run one pipeline stage, recording its wall time and, while profiling, its file I/O"""
+        start = time.perf_counter()
+        totals = {}
+        try:
+            with stage(name) as totals:
+                return function()
+        finally:
+            record = {'stage': name, 'seconds': round(time.perf_counter() - start, 6)}
+            if totals:
+                record.update({key: totals[key] for key in STAGE_COUNTERS})
+            self.stages.append(record)
+    
+    def run_script(self, script: str, *arguments: str):
+        """Run a sibling script in the repository root; while profiling, its counters join the current stage"""
+        import subprocess
+        with profile_command([sys.executable, f'scripts/{script}', *arguments]) as command:
+            return subprocess.run(command, capture_output=True, text=True, cwd=str(self.root))
     
     def analyze_changes(self) -> Dict[str, bool]:
         """Analyze what needs updating based on recent changes"""
@@ -159,10 +200,7 @@ class IntegratedUpdater:
         
         print("📝 Synchronizing context files...")
         try:
-            import subprocess
-            result = subprocess.run([
-                'python3', 'scripts/context-sync.py', '--sync'
-            ], capture_output=True, text=True, cwd=str(self.root))
+            result = self.run_script('context-sync.py', '--sync')
             
             if result.returncode == 0:
                 print("✅ Context files synchronized")
@@ -189,10 +227,7 @@ class IntegratedUpdater:
         
         print("📝 Updating infrastructure overview...")
         try:
-            import subprocess
-            result = subprocess.run([
-                'python3', 'scripts/infrastructure-scanner.py', '--scan'
-            ], capture_output=True, text=True, cwd=str(self.root))
+            result = self.run_script('infrastructure-scanner.py', '--scan')
             
             if result.returncode == 0:
                 print("✅ Infrastructure overview updated")
@@ -220,23 +255,24 @@ class IntegratedUpdater:
         print("🚀 Starting integrated update cycle...")
         
         # Run shared analysis once
-        self.run_shared_analysis()
+        self.run_stage('shared-analysis', self.run_shared_analysis)
         
         # Analyze what needs updating
-        self.analyze_changes()
+        self.run_stage('analyze', self.analyze_changes)
         
         # Run updates in optimal order
-        self.update_frontmatter()  # First, ensure all files have proper frontmatter
-        self.sync_context_files()  # Then sync context files with source directories
-        self.update_index()        # Then update index
-        self.update_context_monitoring()  # Then handle context changes
-        self.update_system_md()    # Update system documentation
-        self.update_infrastructure_overview()  # Update infrastructure overview
+        self.run_stage('frontmatter', self.update_frontmatter)  # First, ensure all files have proper frontmatter
+        self.run_stage('context-sync', self.sync_context_files)  # Then sync context files with source directories
+        self.run_stage('index', self.update_index)  # Then update index
+        self.run_stage('context-monitor', self.update_context_monitoring)  # Then handle context changes
+        self.run_stage('system', self.update_system_md)  # Update system documentation
+        self.run_stage('infrastructure', self.update_infrastructure_overview)  # Update infrastructure overview
         
         # Validate everything
-        validation_success = self.validate_system()
+        validation_success = self.run_stage('validation', self.validate_system)
         
         print("✅ Integrated update cycle complete")
+        self.success = validation_success
         return validation_success
     
     def run_quick_update(self):
@@ -244,15 +280,31 @@ class IntegratedUpdater:
         print("⚡ Running quick update...")
         
         # Only update what's absolutely necessary
-        self.analyze_changes()
+        self.run_stage('analyze', self.analyze_changes)
         
         if self.update_needed['context'] and self.context_monitor:
-            self.update_context_monitoring()
+            self.run_stage('context-monitor', self.update_context_monitoring)
         
         if self.update_needed['index']:
-            self.update_index()
+            self.run_stage('index', self.update_index)
         
         print("✅ Quick update complete")
+        self.success = True
+    
+    def write_metrics(self, path: str, started: float, seconds: float):
+        """Write this run's duration, stage times and outcome for the textfile collector"""
+        from brain_metrics import Registry, write_textfile
+        registry = Registry()
+        registry.gauge('brain_update_last_run_timestamp_seconds', 'Unix time the last update run started').set(started)
+        registry.gauge('brain_update_duration_seconds', 'Wall time of the last update run').set(seconds)
+        registry.gauge('brain_update_success', 'Whether the last update run finished and validated (1) or not (0)').set(self.success)
+        stage_seconds = registry.gauge('brain_update_stage_seconds', 'Wall time of each stage in the last update run')
+        for record in self.stages:
+            stage_seconds.set(record['seconds'], stage=record['stage'])
+        try:
+            write_textfile(registry, path)
+        except OSError as e:
+            print(f"⚠️  Could not write metrics to {path}: {e}")
     
     def generate_integration_report(self) -> str:
         """Generate a report showing how components work together"""
@@ -313,10 +365,31 @@ def main():
     parser.add_argument('--quick', action='store_true', help='Run quick update for recent changes')
     parser.add_argument('--report', action='store_true', help='Generate integration report')
     parser.add_argument('--root', default='.', help='Root directory path')
+    parser.add_argument('--stage-report', help='Write per-stage wall time and file I/O counts to this JSON file')
+    parser.add_argument('--metrics-textfile', metavar='FILE',
+                        help='Write Prometheus metrics for this run (duration, stage times, success) to FILE')
+    add_profile_argument(parser)
     
     args = parser.parse_args()
+    # A stage report reads its file counts from the profiler, so it keeps the counters running
+    start_profile(args.profile, memory=args.memprofile, slow_files=args.slow_files, trace=args.trace,
+                  root=args.root, counters=bool(args.stage_report))
     
     updater = IntegratedUpdater(args.root)
+    if args.stage_report:
+        import atexit
+        
+        def write_stage_report():
+            with open(args.stage_report, 'w', encoding='utf-8') as f:
+                json.dump({'stages': updater.stages}, f, indent=2)
+        
+        # Also written when a full update exits non-zero after failed validation
+        atexit.register(write_stage_report)
+    if args.metrics_textfile:
+        import atexit
+        started, start = time.time(), time.perf_counter()
+        # Written on every exit, so a failed or interrupted run shows up as success 0
+        atexit.register(lambda: updater.write_metrics(args.metrics_textfile, started, time.perf_counter() - start))
     
     if args.report:
         report = updater.generate_integration_report()
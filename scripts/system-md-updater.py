@@ -14,11 +14,11 @@ from pathlib import Path
 from typing import Dict, List, Set, Tuple
 from collections import defaultdict
 
-try:
-    import frontmatter
-except ImportError:
-    print("Please install python-frontmatter: pip install python-frontmatter")
-    sys.exit(1)
+# Header-only frontmatter reader and the shared walker live in utils
+sys.path.append(str(Path(__file__).parent.parent / 'utils'))
+from frontmatter_reader import read_header, split_document
+from brain_walk import BrainIgnore, walk_files
+from brain_profile import add_profile_argument, file_cost, profiled, start as start_profile
 
 
 class SystemMDUpdater:
@@ -29,6 +29,7 @@ class SystemMDUpdater:
         self.system_file = self.root / "SYSTEM.md"
         self.index_file = self.root / "INDEX.md"
         self.changelog_file = self.root / "CHANGELOG.md"
+        self.ignore = BrainIgnore(self.root)
         
         # Load current SYSTEM.md content
         self.current_content = self.load_system_md()
@@ -43,6 +44,7 @@ class SystemMDUpdater:
                 return f.read()
         return ""
     
+    @profiled('analyze')
     def analyze_codebase(self):
         """Analyze the current codebase structure and content"""
         print("🔍 Analyzing codebase structure...")
@@ -60,15 +62,20 @@ class SystemMDUpdater:
         
         print("✅ Codebase analysis complete")
     
+    def walk(self, top: Path, patterns):
+        """Walk files below top, pruning ignored directories"""
+        return walk_files(top, patterns, root=self.root, ignore=self.ignore)
+    
+    @profiled('directories')
     def analyze_directories(self) -> Dict[str, Dict]:
         """Analyze directory structure and purposes"""
         directories = {}
         
         for item in self.root.iterdir():
-            if item.is_dir() and not item.name.startswith('.') and item.name not in ['venv', '__pycache__', 'node_modules']:
+            if item.is_dir() and not item.name.startswith('.') and not self.ignore.ignored(item.name, True):
                 dir_info = {
                     'path': str(item.relative_to(self.root)),
-                    'file_count': len(list(item.rglob('*.md'))),
+                    'file_count': sum(1 for _ in self.walk(item, '*.md')),
                     'subdirs': [d.name for d in item.iterdir() if d.is_dir()],
                     'purpose': self.infer_directory_purpose(item)
                 }
@@ -109,11 +116,12 @@ class SystemMDUpdater:
         
         return purpose_map.get(name, f"Contains {name}-related files")
     
+    @profiled('file-patterns')
     def analyze_file_patterns(self) -> Dict[str, List[str]]:
         """Analyze file naming patterns and types"""
         patterns = defaultdict(list)
         
-        for md_file in self.root.rglob("*.md"):
+        for md_file in self.walk(self.root, "*.md"):
             if md_file.name in ['SYSTEM.md', 'INDEX.md', 'CHANGELOG.md']:
                 continue
             
@@ -131,21 +139,23 @@ class SystemMDUpdater:
             
             # Analyze file types by content
             try:
-                with open(md_file, 'r', encoding='utf-8') as f:
+                with file_cost(md_file, 'read'), open(md_file, 'r', encoding='utf-8') as f:
                     content = f.read()
                     
-                if '## ' in content and '### ' in content:
-                    patterns['structured'].append(relative_path)
-                if '```' in content:
-                    patterns['code_blocks'].append(relative_path)
-                if '---' in content:
-                    patterns['frontmatter'].append(relative_path)
+                with file_cost(md_file, 'extract'):
+                    if '## ' in content and '### ' in content:
+                        patterns['structured'].append(relative_path)
+                    if '```' in content:
+                        patterns['code_blocks'].append(relative_path)
+                    if '---' in content:
+                        patterns['frontmatter'].append(relative_path)
                     
             except:
                 pass
         
         return dict(patterns)
     
+    @profiled('frontmatter')
     def analyze_frontmatter(self) -> Dict[str, any]:
         """Analyze frontmatter patterns and statistics"""
         stats = {
@@ -160,21 +170,20 @@ class SystemMDUpdater:
         
         required_fields = ['title', 'type', 'subtype', 'tags', 'created', 'modified', 'version', 'ship_factor']
         
-        for md_file in self.root.rglob("*.md"):
+        for md_file in self.walk(self.root, "*.md"):
             if md_file.name in ['SYSTEM.md', 'INDEX.md', 'CHANGELOG.md']:
                 continue
             
             stats['total_files'] += 1
             
             try:
-                with open(md_file, 'r', encoding='utf-8') as f:
-                    post = frontmatter.load(f)
+                metadata = read_header(md_file)
                 
-                if post.metadata:
+                if metadata:
                     stats['with_frontmatter'] += 1
                     
                     # Count common values
-                    for field, value in post.metadata.items():
+                    for field, value in metadata.items():
                         if field == 'type':
                             stats['common_types'][value] += 1
                         elif field == 'subtype':
@@ -187,7 +196,7 @@ class SystemMDUpdater:
                     
                     # Check for missing required fields
                     for field in required_fields:
-                        if field not in post.metadata:
+                        if field not in metadata:
                             stats['missing_fields'][field] += 1
                             
             except:
@@ -195,6 +204,7 @@ class SystemMDUpdater:
         
         return stats
     
+    @profiled('content-patterns')
     def analyze_content_patterns(self) -> Dict[str, List[str]]:
         """Analyze content patterns and structures"""
         patterns = {
@@ -205,41 +215,40 @@ class SystemMDUpdater:
             'tutorial_documents': []
         }
         
-        for md_file in self.root.rglob("*.md"):
+        for md_file in self.walk(self.root, "*.md"):
             if md_file.name in ['SYSTEM.md', 'INDEX.md', 'CHANGELOG.md']:
                 continue
             
             try:
-                with open(md_file, 'r', encoding='utf-8') as f:
+                with file_cost(md_file, 'read'), open(md_file, 'r', encoding='utf-8') as f:
                     content = f.read()
                 
                 relative_path = str(md_file.relative_to(self.root))
                 
                 # Classify by content patterns
-                if any(keyword in content.lower() for keyword in ['decision', 'chose', 'selected', 'adopted']):
-                    patterns['decision_documents'].append(relative_path)
-                if any(keyword in content.lower() for keyword in ['workflow', 'process', 'steps', 'procedure']):
-                    patterns['workflow_documents'].append(relative_path)
-                if any(keyword in content.lower() for keyword in ['reference', 'cheat sheet', 'quick start']):
-                    patterns['reference_documents'].append(relative_path)
-                if any(keyword in content.lower() for keyword in ['config', 'setup', 'install', 'configure']):
-                    patterns['configuration_documents'].append(relative_path)
-                if any(keyword in content.lower() for keyword in ['tutorial', 'guide', 'how to', 'walkthrough']):
-                    patterns['tutorial_documents'].append(relative_path)
+                with file_cost(md_file, 'extract'):
+                    if any(keyword in content.lower() for keyword in ['decision', 'chose', 'selected', 'adopted']):
+                        patterns['decision_documents'].append(relative_path)
+                    if any(keyword in content.lower() for keyword in ['workflow', 'process', 'steps', 'procedure']):
+                        patterns['workflow_documents'].append(relative_path)
+                    if any(keyword in content.lower() for keyword in ['reference', 'cheat sheet', 'quick start']):
+                        patterns['reference_documents'].append(relative_path)
+                    if any(keyword in content.lower() for keyword in ['config', 'setup', 'install', 'configure']):
+                        patterns['configuration_documents'].append(relative_path)
+                    if any(keyword in content.lower() for keyword in ['tutorial', 'guide', 'how to', 'walkthrough']):
+                        patterns['tutorial_documents'].append(relative_path)
                     
             except:
                 pass
         
         return patterns
     
+    @profiled('automation-scripts')
     def find_automation_scripts(self) -> List[Dict[str, str]]:
         """Find automation scripts and their purposes"""
         scripts = []
         
-        for script_file in self.root.rglob("*.py"):
-            if 'venv' in str(script_file):
-                continue
-                
+        for script_file in self.walk(self.root, "*.py"):
             try:
                 with open(script_file, 'r', encoding='utf-8') as f:
                     content = f.read()
@@ -263,6 +272,7 @@ class SystemMDUpdater:
         
         return scripts
     
+    @profiled('configuration-files')
     def find_configuration_files(self) -> List[str]:
         """Find configuration files"""
         config_files = []
@@ -273,40 +283,40 @@ class SystemMDUpdater:
             'requirements.txt', 'Pipfile', 'pyproject.toml'
         ]
         
-        for pattern in config_patterns:
-            for config_file in self.root.rglob(pattern):
-                if 'venv' not in str(config_file) and '__pycache__' not in str(config_file):
-                    config_files.append(str(config_file.relative_to(self.root)))
+        for config_file in self.walk(self.root, config_patterns):
+            config_files.append(str(config_file.relative_to(self.root)))
         
         return sorted(config_files)
     
+    @profiled('documentation-files')
     def find_documentation_files(self) -> List[Dict[str, str]]:
         """Find documentation files and their purposes"""
         docs = []
         
-        for doc_file in self.root.rglob("*.md"):
+        for doc_file in self.walk(self.root, "*.md"):
             if doc_file.name in ['SYSTEM.md', 'INDEX.md', 'CHANGELOG.md']:
                 continue
             
             try:
-                with open(doc_file, 'r', encoding='utf-8') as f:
+                with file_cost(doc_file, 'read'), open(doc_file, 'r', encoding='utf-8') as f:
                     content = f.read()
                 
                 # Extract title from frontmatter or first heading
                 title = "Untitled"
-                if '---' in content:
-                    try:
-                        post = frontmatter.loads(content)
-                        title = post.metadata.get('title', title)
-                    except:
-                        pass
-                else:
-                    # Look for first heading
-                    lines = content.split('\n')
-                    for line in lines:
-                        if line.startswith('# '):
-                            title = line[2:].strip()
-                            break
+                with file_cost(doc_file, 'extract'):
+                    if '---' in content:
+                        try:
+                            metadata, _ = split_document(content)
+                            title = metadata.get('title', title)
+                        except:
+                            pass
+                    else:
+                        # Look for first heading
+                        lines = content.split('\n')
+                        for line in lines:
+                            if line.startswith('# '):
+                                title = line[2:].strip()
+                                break
                 
                 docs.append({
                     'path': str(doc_file.relative_to(self.root)),
@@ -320,6 +330,7 @@ class SystemMDUpdater:
         
         return docs
     
+    @profiled('maintenance-commands')
     def find_maintenance_commands(self) -> List[str]:
         """Find maintenance commands from Makefile"""
         commands = []
@@ -656,6 +667,7 @@ class SystemMDUpdater:
             ""
         ]
     
+    @profiled('update-system-md')
     def update_system_md(self):
         """Update SYSTEM.md with current codebase analysis"""
         print("🔄 Updating SYSTEM.md...")
@@ -669,6 +681,7 @@ class SystemMDUpdater:
         
         print("✅ SYSTEM.md updated successfully")
     
+    @profiled('report')
     def generate_analysis_report(self) -> str:
         """Generate a detailed analysis report"""
         report = [
@@ -721,8 +734,10 @@ def main():
     parser.add_argument('--analyze', action='store_true', help='Generate analysis report')
     parser.add_argument('--report-file', default='codebase-analysis-report.md', help='Output file for analysis report')
     parser.add_argument('--root', default='.', help='Root directory path')
+    add_profile_argument(parser)
     
     args = parser.parse_args()
+    start_profile(args.profile, memory=args.memprofile, slow_files=args.slow_files, trace=args.trace)
     
     updater = SystemMDUpdater(args.root)
     updater.analyze_codebase()
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+AI Brain Batched Writes
+
+Queues document creates, updates and deprecations and applies them in one
+commit. Every file is written to a temporary sibling and moved into place
+with `os.replace`, so readers never see a half-written document. The
+temporary files are synced together before any of them is renamed, and the
+catalog and snapshot indexes are updated once for the whole batch.
+"""
+
+import os
+import stat
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+try:
+    import frontmatter
+except ImportError:
+    print("Please install python-frontmatter: pip install python-frontmatter")
+    exit(1)
+
+from frontmatter_reader import load_post
+
+
+def _sync_directory(directory: Path):
+    """Persist renames in a directory (not supported on every platform)"""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _file_mode(path: Path) -> int:
+    """Permissions for a replacement: the existing file's, else what open() would give"""
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+def write_temp(path: Path, text: Union[str, bytes]) -> Path:
+    """Write text (or bytes) to a new temporary file next to `path` and return its path"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix='.tmp')
+    try:
+        # mkstemp creates files readable by the owner only
+        os.chmod(temp_path, _file_mode(path))
+        mode, encoding = ('wb', None) if isinstance(text, bytes) else ('w', 'utf-8')
+        with os.fdopen(fd, mode, encoding=encoding) as f:
+            f.write(text)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    return Path(temp_path)
+
+
+def sync_file(path: Path):
+    """Flush a file's contents to stable storage"""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def atomic_write(path: Path, text: Union[str, bytes], sync: bool = True):
+    """Replace a file's contents in one step via a temporary file"""
+    temp_path = write_temp(path, text)
+    try:
+        if sync:
+            sync_file(temp_path)
+        os.replace(temp_path, path)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+    if sync:
+        _sync_directory(path.parent)
+
+
+class BrainBatch:
+    """Pending document writes, applied atomically per file on commit
+
+    Use through `BrainHelper.batch()`:
+
+        with brain.batch() as tx:
+            tx.create("Title", "Body", "knowledge", "decisions")
+            tx.update("docs/guide.md", metadata_updates={'ship_factor': 7})
+
+    Leaving the block normally commits; an exception discards every queued
+    write and leaves the knowledge base untouched.
+    """
+
+    def __init__(self, helper):
+        self.helper = helper
+        self.root = helper.root
+        self.pending: Dict[Path, frontmatter.Post] = {}
+        self.committed = False
+
+    def __enter__(self) -> 'BrainBatch':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+        return False
+
+    def _unused_path(self, directory: Path, slug: str) -> Path:
+        """A document path that neither exists on disk nor is queued in this batch"""
+        path = directory / f"{slug}.md"
+        if not path.exists() and path not in self.pending:
+            return path
+
+        timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        path = directory / f"{slug}-{timestamp}.md"
+        suffix = 2
+        while path.exists() or path in self.pending:
+            path = directory / f"{slug}-{timestamp}-{suffix}.md"
+            suffix += 1
+        return path
+
+    def create(
+        self,
+        title: str,
+        content: str,
+        doc_type: str,
+        subtype: str,
+        tags: List[str] = None,
+        ship_factor: int = 5,
+        references: List[str] = None,
+        category: str = None
+    ) -> str:
+        """Queue a new document; returns the path it will be written to"""
+        slug = self.helper._slugify(title)
+        path = self._unused_path(self.root / (category or doc_type) / subtype, slug)
+
+        post = frontmatter.Post(content)
+        post['title'] = title
+        post['type'] = doc_type
+        post['subtype'] = subtype
+        post['tags'] = tags or []
+        post['created'] = datetime.now().isoformat()
+        post['modified'] = datetime.now().isoformat()
+        post['version'] = 1
+        post['ship_factor'] = ship_factor
+        post['deprecated'] = False
+
+        if references:
+            post['references'] = references
+
+        if category:
+            post['category'] = category
+
+        self.pending[path] = post
+        return str(path)
+
+    def update(
+        self,
+        path: str,
+        content: Optional[str] = None,
+        metadata_updates: Optional[Dict] = None
+    ) -> str:
+        """Queue changes to a document (existing or created earlier in this batch)"""
+        file_path = self.root / path
+        post = self.pending.get(file_path)
+        if post is None:
+            if not file_path.exists():
+                raise FileNotFoundError(f"Document not found: {path}")
+            with open(file_path, 'r', encoding='utf-8') as f:
+                post = load_post(f.read())
+            self.pending[file_path] = post
+
+        if content is not None:
+            post.content = content
+
+        if metadata_updates:
+            post.metadata.update(metadata_updates)
+
+        # Always update version and modified date
+        post['version'] = post.get('version', 1) + 1
+        post['modified'] = datetime.now().isoformat()
+
+        return str(file_path)
+
+    def deprecate(self, path: str, reason: str) -> str:
+        """Queue marking a document as deprecated"""
+        return self.update(
+            path,
+            metadata_updates={
+                'deprecated': True,
+                'deprecated_date': datetime.now().isoformat(),
+                'deprecated_reason': reason
+            }
+        )
+
+    def rollback(self):
+        """Discard every queued write"""
+        self.pending = {}
+
+    def commit(self) -> List[Path]:
+        """Write every queued document, sync once, then update the indexes once"""
+        if self.committed:
+            raise RuntimeError("Batch already committed")
+        self.committed = True
+        if not self.pending:
+            return []
+
+        # Stage everything first; a failure here leaves no document changed
+        staged = []
+        try:
+            for path, post in self.pending.items():
+                staged.append((write_temp(path, frontmatter.dumps(post)), path))
+            for temp_path, _ in staged:
+                sync_file(temp_path)
+        except BaseException:
+            for temp_path, _ in staged:
+                temp_path.unlink(missing_ok=True)
+            raise
+
+        for temp_path, path in staged:
+            os.replace(temp_path, path)
+        for directory in {path.parent for _, path in staged}:
+            _sync_directory(directory)
+
+        paths = [path for _, path in staged]
+        self.pending = {}
+        self.helper._apply_changes(paths)
+        self.helper.update_index()
+        return paths
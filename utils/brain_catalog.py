@@ -0,0 +1,557 @@
+#!/usr/bin/env python3
+"""
+AI Brain Catalog
+
+Persistent SQLite metadata catalog for the AI Brain knowledge base.
+Stores path, size, mtime, content hash and parsed frontmatter for every
+markdown file and refreshes incrementally with a stat-only pass. The link
+graph is rewritten per file along with its row. Search postings live in the
+same database but are only built when a search runs: `refresh_search()`
+re-indexes the documents whose content hash differs from the one their
+postings were built from, so metadata queries never pay for tokenizing.
+
+Every row write and removal bumps a generation counter in `catalog_info`
+in the same transaction, and stamps written rows with it. Processes that
+keep state derived from the catalog (the daemon's snapshot) compare it with
+the generation they last saw to pick up rows another process wrote, which
+a stat-only refresh cannot see because those rows already match the disk.
+"""
+
+import hashlib
+import io
+import json
+import sqlite3
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Any
+
+from frontmatter_reader import load_header
+from brain_search import build_postings
+from brain_links import extract_links, extract_references, write_links
+from brain_parallel import parallel_map
+from brain_walk import walk_files
+from brain_document import as_text, as_int
+from brain_profile import file_cost, profiled
+
+
+CATALOG_DIR = ".brain"
+CATALOG_FILE = "catalog.sqlite"
+SCHEMA_VERSION = 6
+
+# Page cache of a catalog connection in KiB (SQLite's default is 2 MiB). Bulk
+# builds outgrow a small cache and spill B-tree pages to disk many times over
+CACHE_KIB = 65536
+
+# Documents tokenized per sorted postings insert when building the search index
+SEARCH_BATCH = 1000
+
+# Re-indexing at least this many documents drops the path index on postings
+# first and recreates it once at the end
+BULK_REINDEX = 200
+
+# Files that describe the knowledge base rather than belong to it
+SPECIAL_FILES = ('SYSTEM.md', 'INDEX.md', 'README.md', 'CHANGELOG.md')
+
+HIGH_PRIORITY = 8
+COUNTERS = ('total', 'deprecated', 'high_priority')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS catalog_info (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS documents (
+    path TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    hash TEXT NOT NULL,
+    title TEXT,
+    type TEXT,
+    subtype TEXT,
+    category TEXT,
+    tags TEXT NOT NULL DEFAULT '[]',
+    ship_factor INTEGER,
+    deprecated INTEGER NOT NULL DEFAULT 0,
+    created TEXT,
+    modified TEXT,
+    version INTEGER,
+    metadata TEXT NOT NULL DEFAULT '{}',
+    error TEXT,
+    generation INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS tags (
+    tag TEXT NOT NULL,
+    path TEXT NOT NULL REFERENCES documents(path) ON DELETE CASCADE,
+    PRIMARY KEY (tag, path)
+);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS postings (
+    term TEXT NOT NULL,
+    path TEXT NOT NULL REFERENCES documents(path) ON DELETE CASCADE,
+    tf INTEGER NOT NULL,
+    positions BLOB NOT NULL,
+    PRIMARY KEY (term, path)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS doc_lengths (
+    path TEXT PRIMARY KEY REFERENCES documents(path) ON DELETE CASCADE,
+    length INTEGER NOT NULL,
+    hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS links (
+    source TEXT NOT NULL REFERENCES documents(path) ON DELETE CASCADE,
+    target TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    line INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_documents_ship_factor ON documents(ship_factor);
+CREATE INDEX IF NOT EXISTS idx_tags_path ON tags(path);
+CREATE INDEX IF NOT EXISTS idx_postings_path ON postings(path);
+CREATE INDEX IF NOT EXISTS idx_links_source ON links(source);
+CREATE INDEX IF NOT EXISTS idx_links_target ON links(target);
+"""
+
+
+def _json_default(value: Any) -> str:
+    """Serialize YAML scalars that JSON does not know about"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def parse_document(relative_path: str, data: bytes) -> Dict[str, Any]:
+    """Parse one file into everything the catalog stores for it
+
+    Pure and picklable so full passes can run it in worker processes.
+    """
+    metadata: Dict[str, Any] = {}
+    error = None
+    f = io.BytesIO(data)
+
+    try:
+        metadata = load_header(f)
+    except Exception as e:
+        error = str(e)
+        f.seek(0)
+
+    tags = metadata.get('tags', [])
+    if not isinstance(tags, list):
+        tags = []
+
+    # Index files link to everything, so they are left out of the link graph
+    links = []
+    if relative_path.rsplit('/', 1)[-1] not in SPECIAL_FILES:
+        first_line = data.count(b'\n', 0, f.tell()) + 1
+        with file_cost(None, 'extract'):
+            body = f.read().decode('utf-8', errors='replace')
+            links = extract_references(relative_path, metadata) + extract_links(relative_path, body, first_line)
+
+    return {
+        'metadata': metadata,
+        'error': error,
+        'tags': [str(tag) for tag in tags],
+        'links': links
+    }
+
+
+def read_changed_file(task) -> Optional[tuple]:
+    """Worker: hash a file whose stat changed and parse it if its content did
+
+    Returns (digest, parsed) where parsed is None for touched-but-identical
+    files, or None when the file vanished since the stat pass.
+    """
+    file_path, relative_path, known_hash = task
+    with file_cost(file_path, 'read'):
+        try:
+            with open(file_path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+
+        digest = hashlib.md5(data).hexdigest()
+        if digest == known_hash:
+            return digest, None
+        return digest, parse_document(relative_path, data)
+
+
+def read_search_body(file_path: str) -> Optional[tuple]:
+    """Worker: tokenize one file's body for the search index
+
+    Returns (digest, postings, length), or None when the file vanished.
+    """
+    with file_cost(file_path, 'read'):
+        try:
+            with open(file_path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+
+    f = io.BytesIO(data)
+    try:
+        load_header(f)
+    except Exception:
+        f.seek(0)
+    with file_cost(file_path, 'extract'):
+        postings, length = build_postings(f.read().decode('utf-8', errors='replace'))
+    return hashlib.md5(data).hexdigest(), postings, length
+
+
+class BrainCatalog:
+    """SQLite-backed index of markdown files and their frontmatter"""
+
+    def __init__(self, root_path: str = ".", catalog_path: Optional[str] = None, jobs: int = 1):
+        self.root = Path(root_path)
+        self.jobs = jobs
+        self.path = Path(catalog_path) if catalog_path else self.root / CATALOG_DIR / CATALOG_FILE
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Paths added, updated or removed by the last refresh()
+        self.changed_paths: List[str] = []
+
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute(f"PRAGMA cache_size = -{CACHE_KIB}")
+        self.ensure_schema()
+
+    def ensure_schema(self):
+        """Create tables, discarding catalogs written by another schema version"""
+        row = None
+        try:
+            row = self.conn.execute(
+                "SELECT value FROM catalog_info WHERE key = 'schema_version'"
+            ).fetchone()
+        except sqlite3.OperationalError:
+            pass
+
+        if row is not None and row['value'] != str(SCHEMA_VERSION):
+            self.conn.executescript(
+                "DROP TABLE IF EXISTS links; "
+                "DROP TABLE IF EXISTS postings; DROP TABLE IF EXISTS doc_lengths; "
+                "DROP TABLE IF EXISTS counters; "
+                "DROP TABLE IF EXISTS tags; DROP TABLE IF EXISTS documents; "
+                "DROP TABLE IF EXISTS catalog_info;"
+            )
+
+        self.conn.executescript(SCHEMA)
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO counters (name, value) VALUES (?, 0)",
+            [(name,) for name in COUNTERS]
+        )
+        self.conn.execute("INSERT OR IGNORE INTO catalog_info (key, value) VALUES ('generation', '0')")
+        self.conn.execute(
+            "INSERT OR REPLACE INTO catalog_info (key, value) VALUES ('schema_version', ?)",
+            (str(SCHEMA_VERSION),)
+        )
+        self.conn.commit()
+
+    def close(self):
+        """Close the underlying database connection"""
+        self.conn.close()
+
+    def iter_markdown_files(self):
+        """Yield every markdown file that belongs in the catalog"""
+        return walk_files(self.root, "*.md")
+
+    @profiled('catalog-refresh')
+    def refresh(self) -> Dict[str, int]:
+        """Bring the catalog up to date using a stat-only pass
+
+        Files are only read when their size or mtime changed, and only
+        re-parsed when their content hash changed as well. With jobs > 1 the
+        reads and parses run in a process pool; results are written in path
+        order so the catalog is identical to a serial refresh.
+        """
+        known = {
+            row['path']: row
+            for row in self.conn.execute("SELECT path, size, mtime_ns, hash FROM documents")
+        }
+        seen = set()
+        changed = []
+        self.changed_paths = []
+        counts = {'scanned': 0, 'added': 0, 'updated': 0, 'touched': 0, 'removed': 0}
+
+        for md_file in self.iter_markdown_files():
+            relative_path = md_file.relative_to(self.root).as_posix()
+            seen.add(relative_path)
+            counts['scanned'] += 1
+
+            try:
+                stat = md_file.stat()
+            except OSError:
+                continue
+
+            row = known.get(relative_path)
+            if row is not None and row['size'] == stat.st_size and row['mtime_ns'] == stat.st_mtime_ns:
+                continue
+            changed.append((relative_path, row, stat))
+
+        changed.sort(key=lambda item: item[0])
+        results = parallel_map(
+            read_changed_file,
+            [
+                (str(self.root / relative_path), relative_path, row['hash'] if row is not None else None)
+                for relative_path, row, _ in changed
+            ],
+            self.jobs
+        )
+
+        for (relative_path, row, stat), result in zip(changed, results):
+            if result is None:
+                continue
+            digest, parsed = result
+
+            if parsed is None:
+                # Touched but unchanged: only the stat fields need updating
+                self.conn.execute(
+                    "UPDATE documents SET size = ?, mtime_ns = ? WHERE path = ?",
+                    (stat.st_size, stat.st_mtime_ns, relative_path)
+                )
+                counts['touched'] += 1
+                continue
+
+            self.write(relative_path, stat.st_size, stat.st_mtime_ns, digest, parsed)
+            self.changed_paths.append(relative_path)
+            counts['updated' if row is not None else 'added'] += 1
+
+        for relative_path in sorted(set(known) - seen):
+            self.delete(relative_path)
+            self.changed_paths.append(relative_path)
+            counts['removed'] += 1
+
+        self.conn.commit()
+        return counts
+
+    @profiled('catalog-refresh-files')
+    def refresh_files(self, relative_paths: List[str]) -> Dict[str, Optional[sqlite3.Row]]:
+        """Re-read files after they were written, in one transaction; returns their new rows"""
+        for relative_path in relative_paths:
+            file_path = self.root / relative_path
+            if not file_path.exists():
+                self.delete(relative_path)
+                continue
+            stat = file_path.stat()
+            data = file_path.read_bytes()
+            self.store(relative_path, stat.st_size, stat.st_mtime_ns, hashlib.md5(data).hexdigest(), data)
+        self.conn.commit()
+        return {relative_path: self.get(relative_path) for relative_path in relative_paths}
+
+    def refresh_file(self, relative_path: str) -> Optional[sqlite3.Row]:
+        """Re-read a single file after it was written; returns its new row"""
+        return self.refresh_files([relative_path])[relative_path]
+
+    def get(self, relative_path: str) -> Optional[sqlite3.Row]:
+        """Return the catalog row for one file"""
+        return self.conn.execute(
+            "SELECT * FROM documents WHERE path = ?", (relative_path,)
+        ).fetchone()
+
+    def rebuild(self) -> Dict[str, int]:
+        """Drop every row and re-read the whole corpus"""
+        self.conn.execute("DELETE FROM documents")
+        self.conn.execute("UPDATE counters SET value = 0")
+        self._next_generation()
+        self.conn.commit()
+        return self.refresh()
+
+    def counters(self) -> Dict[str, int]:
+        """Maintained totals for knowledge base documents, without a scan"""
+        return {
+            row['name']: row['value']
+            for row in self.conn.execute("SELECT name, value FROM counters")
+        }
+
+    def _adjust_counters(self, row, delta: int):
+        """Add or subtract one row's contribution to the maintained totals"""
+        if row is None or row['name'] in SPECIAL_FILES:
+            return
+        self.conn.execute("UPDATE counters SET value = value + ? WHERE name = 'total'", (delta,))
+        if row['deprecated']:
+            self.conn.execute("UPDATE counters SET value = value + ? WHERE name = 'deprecated'", (delta,))
+        if (row['ship_factor'] or 0) >= HIGH_PRIORITY:
+            self.conn.execute("UPDATE counters SET value = value + ? WHERE name = 'high_priority'", (delta,))
+
+    def _counted_row(self, relative_path: str) -> Optional[sqlite3.Row]:
+        return self.conn.execute(
+            "SELECT name, ship_factor, deprecated FROM documents WHERE path = ?", (relative_path,)
+        ).fetchone()
+
+    def generation(self) -> int:
+        """Number of row writes and removals so far, by any process sharing this catalog"""
+        return int(self.conn.execute("SELECT value FROM catalog_info WHERE key = 'generation'").fetchone()[0])
+
+    def _next_generation(self) -> int:
+        """Bump the generation in the caller's transaction and return the new value"""
+        self.conn.execute(
+            "UPDATE catalog_info SET value = CAST(value AS INTEGER) + 1 WHERE key = 'generation'"
+        )
+        return self.generation()
+
+    def changed_since(self, generation: int) -> List[str]:
+        """Paths written after a generation (removed paths are not listed)"""
+        return [
+            row['path'] for row in self.conn.execute(
+                "SELECT path FROM documents WHERE generation > ? ORDER BY path", (generation,)
+            )
+        ]
+
+    def paths(self) -> List[str]:
+        """Every cataloged path"""
+        return [row['path'] for row in self.conn.execute("SELECT path FROM documents ORDER BY path")]
+
+    def file_stats(self) -> Dict[str, Tuple[int, int]]:
+        """(mtime_ns, size) each cataloged path was last read at"""
+        return {row['path']: (row['mtime_ns'], row['size'])
+                for row in self.conn.execute("SELECT path, mtime_ns, size FROM documents")}
+
+    def delete(self, relative_path: str):
+        """Remove one file's rows (the caller commits)"""
+        self._next_generation()
+        self._adjust_counters(self._counted_row(relative_path), -1)
+        self.conn.execute("DELETE FROM documents WHERE path = ?", (relative_path,))
+
+    def store(self, relative_path: str, size: int, mtime_ns: int, digest: str, data: bytes):
+        """Parse a file's frontmatter and upsert its catalog and search rows"""
+        self.write(relative_path, size, mtime_ns, digest, parse_document(relative_path, data))
+
+    def write(self, relative_path: str, size: int, mtime_ns: int, digest: str, parsed: Dict[str, Any]):
+        """Upsert the rows for an already parsed file (the caller commits)"""
+        metadata = parsed['metadata']
+        tags = parsed['tags']
+
+        self._adjust_counters(self._counted_row(relative_path), -1)
+        self.conn.execute(
+            """
+            INSERT OR REPLACE INTO documents (
+                path, name, size, mtime_ns, hash, title, type, subtype, category,
+                tags, ship_factor, deprecated, created, modified, version, metadata, error, generation
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                relative_path,
+                relative_path.rsplit('/', 1)[-1],
+                size,
+                mtime_ns,
+                digest,
+                as_text(metadata.get('title')),
+                as_text(metadata.get('type')),
+                as_text(metadata.get('subtype')),
+                as_text(metadata.get('category')),
+                json.dumps(tags),
+                as_int(metadata.get('ship_factor')),
+                1 if metadata.get('deprecated', False) else 0,
+                as_text(metadata.get('created')),
+                as_text(metadata.get('modified')),
+                as_int(metadata.get('version')),
+                json.dumps(metadata, default=_json_default),
+                parsed['error'],
+                self._next_generation()
+            )
+        )
+
+        self.conn.execute("DELETE FROM tags WHERE path = ?", (relative_path,))
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO tags (tag, path) VALUES (?, ?)",
+            [(tag, relative_path) for tag in tags]
+        )
+        self._adjust_counters(self._counted_row(relative_path), 1)
+        # Replacing the row cascaded to its postings; refresh_search() rebuilds them
+        write_links(self.conn, relative_path, parsed['links'])
+
+    # Search index
+
+    @profiled('search-index')
+    def refresh_search(self) -> int:
+        """Build postings for documents changed since they were last indexed; returns how many
+
+        Runs before each search. The first one indexes the whole corpus:
+        rows are inserted sorted by term in batches, with the path index
+        dropped until the end, so pages are filled in order rather than
+        split and rewritten at random.
+        """
+        stale = [
+            row['path'] for row in self.conn.execute(
+                "SELECT d.path FROM documents AS d LEFT JOIN doc_lengths AS l ON l.path = d.path "
+                f"WHERE d.name NOT IN ({', '.join('?' * len(SPECIAL_FILES))}) "
+                "AND (l.hash IS NULL OR l.hash != d.hash) ORDER BY d.path",
+                SPECIAL_FILES
+            )
+        ]
+        if not stale:
+            return 0
+
+        self.conn.executemany("DELETE FROM postings WHERE path = ?", [(path,) for path in stale])
+        self.conn.executemany("DELETE FROM doc_lengths WHERE path = ?", [(path,) for path in stale])
+        bulk = len(stale) >= BULK_REINDEX
+        if bulk:
+            self.conn.execute("DROP INDEX IF EXISTS idx_postings_path")
+
+        results = parallel_map(read_search_body, [str(self.root / path) for path in stale], self.jobs)
+        for start in range(0, len(stale), SEARCH_BATCH):
+            rows, lengths = [], []
+            for relative_path, result in zip(stale[start:start + SEARCH_BATCH], results):
+                if result is None:
+                    continue
+                digest, postings, length = result
+                rows.extend((term, relative_path, tf, positions) for term, tf, positions in postings)
+                lengths.append((relative_path, length, digest))
+            rows.sort()
+            self.conn.executemany("INSERT INTO postings (term, path, tf, positions) VALUES (?, ?, ?, ?)", rows)
+            self.conn.executemany("INSERT INTO doc_lengths (path, length, hash) VALUES (?, ?, ?)", lengths)
+
+        if bulk:
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_postings_path ON postings(path)")
+        self.conn.commit()
+        return len(stale)
+
+    # Link graph
+
+    def links_from(self, relative_path: str) -> List[sqlite3.Row]:
+        """Outgoing links of one file, with whether each target is cataloged"""
+        return self.conn.execute(
+            "SELECT target, kind, line, EXISTS (SELECT 1 FROM documents WHERE path = target) AS found "
+            "FROM links WHERE source = ? ORDER BY line, target",
+            (relative_path,)
+        ).fetchall()
+
+    def links_to(self, relative_path: str) -> List[sqlite3.Row]:
+        """Links pointing at one file, by linking file"""
+        return self.conn.execute(
+            "SELECT source, kind, line FROM links WHERE target = ? ORDER BY source, line",
+            (relative_path,)
+        ).fetchall()
+
+    def orphans(self) -> List[str]:
+        """Knowledge base documents no other document links to or references"""
+        return [
+            row['path'] for row in self.conn.execute(
+                f"SELECT path FROM documents AS d WHERE name NOT IN ({', '.join('?' * len(SPECIAL_FILES))}) "
+                "AND NOT EXISTS (SELECT 1 FROM links WHERE target = d.path AND source != d.path) ORDER BY path",
+                SPECIAL_FILES
+            )
+        ]
+
+    def broken_links(self) -> List[sqlite3.Row]:
+        """Links to markdown files that are not in the catalog, one index lookup per link
+
+        Only `.md` targets are checked: the catalog knows nothing else, and
+        other targets (directories, scripts, images) would need the disk.
+        """
+        return self.conn.execute(
+            "SELECT source, target, kind, line FROM links "
+            "WHERE target LIKE '%.md' AND NOT EXISTS (SELECT 1 FROM documents WHERE path = target) "
+            "ORDER BY source, line"
+        ).fetchall()
+
+    def documents(self) -> List[sqlite3.Row]:
+        """Return every cataloged file in one query, ordered by path"""
+        return self.conn.execute("SELECT * FROM documents ORDER BY path").fetchall()
+
+    def iter_entries(self) -> Iterator[sqlite3.Row]:
+        """Stream the indexed columns of every file (no stored metadata JSON)"""
+        return self.conn.execute(
+            "SELECT path, name, title, type, subtype, category, tags, ship_factor, "
+            "deprecated, created, modified, version FROM documents ORDER BY path"
+        )
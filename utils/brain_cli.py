@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+"""
+AI Brain Command Line
+
+Argument parsing and output for the `brain_helper.py` actions. Only the
+lightweight daemon client is imported up front: a read-only command is sent
+to a running daemon as is, which parses it, runs it and returns its output
+in one round trip, and the full BrainHelper stack is imported only when the
+action has to run locally. Like brain_client, this module avoids argparse
+(until a command runs locally), pathlib and typing to start quickly.
+"""
+
+import json
+import os
+import sys
+from itertools import islice
+
+from brain_client import BrainClient, DaemonError
+
+
+def paginate(items, offset: int = 0, limit: int = None):
+    """Skip `offset` items and stop after `limit` without consuming the rest"""
+    return islice(items, offset, None if limit is None else offset + limit)
+
+
+def emit_ndjson(items):
+    """Print one JSON object per line, flushed so pipelines see each result at once"""
+    try:
+        for item in items:
+            record = item if isinstance(item, dict) else item.to_dict()
+            print(json.dumps(record, default=str), flush=True)
+    except BrokenPipeError:
+        silence_stdout()
+
+
+def write_output(text: str):
+    """Write a daemon-rendered command's output"""
+    try:
+        sys.stdout.write(text)
+        sys.stdout.flush()
+    except BrokenPipeError:
+        silence_stdout()
+
+
+def silence_stdout():
+    """The reader (e.g. `head`) stopped early; silence the final flush"""
+    os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+
+
+# Read-only CLI actions a running daemon can answer
+QUERY_ACTIONS = {
+    'read', 'stats', 'high-priority', 'top-k', 'report', 'mcp-servers',
+    'commands', 'infrastructure', 'by-category', 'by-tags', 'search', 'links'
+}
+
+def build_parser():
+    """The argument parser shared by every action"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="AI Brain Helper")
+    parser.add_argument('action', choices=[
+        'create', 'read', 'stats', 'high-priority', 'top-k', 'report', 
+        'mcp-servers', 'commands', 'infrastructure', 'by-category', 'by-tags', 'search', 'links',
+        'sync-index', 'rebuild-index', 'cache-stats', 'update-frontmatter', 'validate', 'test', 
+        'format', 'lint', 'generate-docs', 'serve', 'snapshot'
+    ])
+    parser.add_argument('query', nargs='?', help='Search query (for search)')
+    parser.add_argument('--title', help='Document title')
+    parser.add_argument('--type', help='Document type')
+    parser.add_argument('--subtype', help='Document subtype')
+    parser.add_argument('--content', help='Document content')
+    parser.add_argument('--tags', nargs='+', help='Tags')
+    parser.add_argument('--ship-factor', type=int, default=5, help='Ship factor (1-10)')
+    parser.add_argument('--path', help='Document path')
+    parser.add_argument('--category', help='Document category')
+    parser.add_argument('--references', nargs='+', help='Reference paths')
+    parser.add_argument('--limit', type=int, help='Maximum number of results')
+    parser.add_argument('--offset', type=int, default=0, help='Skip this many results first')
+    parser.add_argument('--format', choices=['text', 'ndjson'], default='text',
+                        help='Output format for listings (ndjson streams one JSON object per line)')
+    parser.add_argument('--jobs', type=int, default=1, help='Worker processes for full passes (0 = one per CPU)')
+    parser.add_argument('--backlinks', metavar='PATH', help='List documents linking to PATH (for links)')
+    parser.add_argument('--orphans', action='store_true', help='List documents nothing links to (for links)')
+    parser.add_argument('--expr', help='Boolean tag expression, e.g. "mcp AND NOT deprecated"')
+    parser.add_argument('--no-daemon', action='store_true', help='Answer locally even if a daemon is running')
+    parser.add_argument('--interval', type=float, help='Seconds between change polls (for serve)')
+    parser.add_argument('--cache-size', type=int, default=256, help='Documents kept in the body cache (for serve)')
+    parser.add_argument('--metrics-port', type=int, metavar='PORT',
+                        help='Serve Prometheus metrics at http://127.0.0.1:PORT/metrics (for serve)')
+    parser.add_argument('--metrics-textfile', metavar='FILE',
+                        help='Write Prometheus metrics to FILE for the node_exporter textfile collector (for serve)')
+    parser.add_argument('--metrics-interval', type=float, default=15.0, metavar='SECONDS',
+                        help='Seconds between metrics textfile writes (for serve)')
+    parser.add_argument('--profile', nargs='?', const='-', metavar='JSON',
+                        help='Run locally and report per-stage time and I/O on stderr (or write it to a JSON file)')
+    parser.add_argument('--memprofile', nargs='?', const='-', metavar='JSON',
+                        help='Run locally and report per-stage peak and retained memory on stderr (or write it to a JSON file)')
+    parser.add_argument('--slow-files', nargs='?', type=int, const=10, metavar='N',
+                        help='Run locally and list the N files (default: 10) that took longest to read, parse and scan')
+    parser.add_argument('--trace', metavar='JSON', help='Run locally and write a Chrome Trace Event file of every stage')
+    
+    return parser
+
+
+def is_profiling(args) -> bool:
+    return bool(args.profile or args.memprofile or args.slow_files or args.trace)
+
+
+def answered_by_daemon(args) -> bool:
+    """Whether a running daemon may answer the parsed command"""
+    return args.action in QUERY_ACTIONS and not args.no_daemon and not is_profiling(args)
+
+
+def run(brain, args):
+    """Run one parsed action against a BrainHelper or a stand-in answering its queries"""
+    if args.action == 'create':
+        if not all([args.title, args.type, args.subtype, args.content]):
+            print("Error: create requires --title, --type, --subtype, and --content")
+            exit(1)
+        
+        path = brain.create_document(
+            title=args.title,
+            content=args.content,
+            doc_type=args.type,
+            subtype=args.subtype,
+            tags=args.tags,
+            ship_factor=args.ship_factor,
+            references=args.references,
+            category=args.category
+        )
+        print(f"Created: {path}")
+    
+    elif args.action == 'read':
+        if not args.path:
+            print("Error: read requires --path")
+            exit(1)
+        
+        doc = brain.read_document(args.path)
+        print(f"Title: {doc['metadata'].get('title')}")
+        print(f"Ship Factor: {doc['metadata'].get('ship_factor')}")
+        print(f"Category: {doc['metadata'].get('category', 'unknown')}")
+        print(f"\nContent:\n{doc['content']}")
+    
+    elif args.action == 'stats':
+        stats = brain.get_statistics(args.category)
+        scope = f" ({args.category})" if args.category else ""
+        print(f"\nKnowledge Base Statistics{scope}:")
+        for key, value in stats.items():
+            print(f"  {key}: {value}")
+    
+    elif args.action == 'high-priority':
+        items = paginate(brain.iter_high_priority(), args.offset, args.limit)
+        if args.format == 'ndjson':
+            emit_ndjson(items)
+        else:
+            print("\nHigh Priority Items (Ship Factor 8+):")
+            for item in items:
+                print(f"  [{item['ship_factor']}] {item['title']} ({item['category']})")
+                print(f"      Path: {item['path']}")
+    
+    elif args.action == 'top-k':
+        limit = args.limit or 10
+        items = brain.top_k(args.offset + limit, args.category)[args.offset:]
+        if args.format == 'ndjson':
+            emit_ndjson(items)
+        else:
+            scope = f" in {args.category}" if args.category else ""
+            print(f"\nTop {limit} Items{scope}:")
+            for item in items:
+                print(f"  [{item['ship_factor']}] {item['title']} ({item['category']})")
+                print(f"      Path: {item['path']}")
+    
+    elif args.action == 'report':
+        report = brain.generate_report()
+        print(report)
+    
+    elif args.action in ('mcp-servers', 'commands', 'infrastructure'):
+        label, listing, iterate = {
+            'mcp-servers': ("MCP Servers", brain.get_mcp_servers, brain.iter_mcp_servers),
+            'commands': ("Commands", brain.get_commands, brain.iter_commands),
+            'infrastructure': ("Infrastructure", brain.get_infrastructure, brain.iter_infrastructure),
+        }[args.action]
+        if args.format == 'ndjson':
+            emit_ndjson(paginate(iterate(), args.offset, args.limit))
+        else:
+            items = listing()
+            print(f"\n{label} ({len(items)}):")
+            for item in paginate(items, args.offset, args.limit):
+                print(f"  {item['title']} (Ship Factor: {item['ship_factor']})")
+    
+    elif args.action == 'by-category':
+        if not args.category:
+            print("Error: by-category requires --category")
+            exit(1)
+        
+        if args.format == 'ndjson':
+            emit_ndjson(paginate(brain.iter_by_category(args.category), args.offset, args.limit))
+        else:
+            items = brain.get_by_category(args.category)
+            print(f"\nItems in {args.category} ({len(items)}):")
+            for item in paginate(items, args.offset, args.limit):
+                print(f"  {item['title']} (Ship Factor: {item['ship_factor']})")
+    
+    elif args.action == 'by-tags':
+        if not args.tags and not args.expr:
+            print("Error: by-tags requires --tags or --expr")
+            exit(1)
+        
+        try:
+            if args.format == 'ndjson':
+                if args.expr:
+                    items = brain.iter_by_tag_expression(args.expr)
+                else:
+                    items = brain.iter_by_tags(args.tags)
+            elif args.expr:
+                items = brain.find_by_tag_expression(args.expr)
+            else:
+                items = brain.find_by_tags(args.tags)
+        except ValueError as e:
+            print(f"Error: {e}")
+            exit(1)
+        
+        if args.format == 'ndjson':
+            emit_ndjson(paginate(items, args.offset, args.limit))
+        else:
+            label = args.expr or ' OR '.join(args.tags)
+            print(f"\nItems tagged {label} ({len(items)}):")
+            for item in paginate(items, args.offset, args.limit):
+                print(f"  [{item['ship_factor']}] {item['title']} ({', '.join(map(str, item['tags']))})")
+                print(f"      Path: {item['path']}")
+    
+    elif args.action == 'search':
+        if not args.query:
+            print('Error: search requires a query, e.g. search "mcp setup"')
+            exit(1)
+        
+        items = brain.search(args.query, args.offset + (args.limit or 10))[args.offset:]
+        if args.format == 'ndjson':
+            emit_ndjson(items)
+        else:
+            print(f"\nSearch results for {args.query} ({len(items)}):")
+            for item in items:
+                marker = " [deprecated]" if item['deprecated'] else ""
+                print(f"  {item['score']:.2f}  [{item['ship_factor']}] {item['title']}{marker}")
+                print(f"      Path: {item['path']}")
+                if item['snippet']:
+                    print(f"      {item['snippet']}")
+    
+    elif args.action == 'links':
+        if args.backlinks:
+            items = brain.get_backlinks(args.backlinks)
+            label = f"Backlinks to {args.backlinks}"
+        elif args.orphans:
+            items = brain.get_orphans()
+            label = "Orphan documents"
+        elif args.path:
+            items = brain.get_links(args.path)
+            label = f"Links from {args.path}"
+        else:
+            print("Error: links requires --path, --backlinks or --orphans")
+            exit(1)
+        
+        if args.format == 'ndjson':
+            emit_ndjson(paginate(items, args.offset, args.limit))
+        else:
+            print(f"\n{label} ({len(items)}):")
+            for item in paginate(items, args.offset, args.limit):
+                if args.orphans:
+                    print(f"  [{item['ship_factor']}] {item['title']}")
+                    print(f"      Path: {item['path']}")
+                    continue
+                path = item['source'] if args.backlinks else item['target']
+                where = f"line {item['line']}" if item['line'] else "references"
+                marker = " [missing]" if not args.backlinks and not item['exists'] else ""
+                print(f"  {item['title'] or path}{marker} ({where})")
+                print(f"      Path: {path}")
+    
+    elif args.action == 'serve':
+        from brain_daemon import BrainDaemon
+        from brain_metrics import exporter
+        try:
+            daemon = BrainDaemon(brain, interval=args.interval, cache_size=args.cache_size)
+            with exporter(daemon.metrics, args):
+                daemon.run()
+        except (RuntimeError, OSError) as e:
+            print(f"Error: {e}")
+            exit(1)
+    
+    elif args.action == 'sync-index':
+        brain.sync_index()
+    
+    elif args.action == 'rebuild-index':
+        counts = brain.rebuild_index()
+        totals = brain.catalog.counters()
+        print(f"✅ Rebuilt index from {counts['scanned']} files")
+        print(f"   {totals['total']} documents, {totals['high_priority']} high priority, {totals['deprecated']} deprecated")
+    
+    elif args.action == 'snapshot':
+        from brain_packed import snapshot_path
+        counts = brain.pack_snapshot()
+        print(f"📦 Packed {counts['documents']} documents ({counts['bytes'] / 1024:.1f} KiB) to {snapshot_path(brain.root)}")
+        print(f"   Valid until one of {counts['directories']} directories changes")
+    
+    elif args.action == 'cache-stats':
+        from header_cache import get_cache
+        cache = get_cache()
+        if cache is None:
+            print("Header cache disabled (BRAIN_HEADER_CACHE=off)")
+            exit(0)
+        
+        stats = cache.stats()
+        print("\nHeader Parse Cache:")
+        print(f"  path: {stats['path']}")
+        print(f"  entries: {stats['entries']}")
+        print(f"  size: {stats['bytes'] / 1024:.1f} KiB of {stats['max_bytes'] / 1024 / 1024:.0f} MiB")
+        print(f"  hits: {stats['hits']}")
+        print(f"  misses: {stats['misses']}")
+        print(f"  hit rate: {stats['hit_rate']:.1%}")
+    
+    elif args.action == 'update-frontmatter':
+        brain.update_frontmatter()
+    
+    elif args.action == 'validate':
+        success = brain.validate()
+        exit(0 if success else 1)
+    
+    elif args.action == 'test':
+        success = brain.test()
+        exit(0 if success else 1)
+    
+    elif args.action == 'format':
+        brain.format()
+    
+    elif args.action == 'lint':
+        success = brain.lint()
+        exit(0 if success else 1)
+    
+    elif args.action == 'generate-docs':
+        brain.generate_docs()
+
+
+def run_captured(brain, argv: list):
+    """Parse and run a query command, returning what it printed and its exit status
+
+    Used by the daemon to answer a whole command in one round trip. Returns
+    None for commands that have to run in the calling process, including
+    --help and usage errors, whose text depends on the caller's program name
+    and terminal.
+    """
+    import io
+    from contextlib import redirect_stderr, redirect_stdout
+
+    stdout, stderr = io.StringIO(), io.StringIO()
+    status = 0
+    with redirect_stdout(stdout), redirect_stderr(stderr):
+        try:
+            args = build_parser().parse_args(argv)
+        except SystemExit:
+            return None
+        if not answered_by_daemon(args):
+            return None
+        try:
+            run(brain, args)
+        except SystemExit as e:
+            status = e.code if isinstance(e.code, int) else int(e.code is not None)
+    return {'stdout': stdout.getvalue(), 'stderr': stderr.getvalue(), 'status': status}
+
+
+def main(argv: list = None):
+    """Parse arguments and run one action"""
+    if argv is None:
+        argv = sys.argv[1:]
+
+    # A running daemon parses and answers query commands itself, so the fast
+    # path never imports argparse; it sends anything it cannot answer back
+    if argv and argv[0] in QUERY_ACTIONS:
+        client = BrainClient.connect()
+        if client is not None:
+            try:
+                result = client.call('run_command', argv)
+            except DaemonError:
+                # An older daemon without run_command, or a dropped connection
+                result = None
+            finally:
+                client.close()
+            if result is not None:
+                sys.stderr.write(result['stderr'])
+                write_output(result['stdout'])
+                exit(result['status'])
+    
+    args = build_parser().parse_args(argv)
+    
+    profiling = is_profiling(args)
+    if profiling:
+        from brain_profile import start
+        start(args.profile, f"brain {args.action}", memory=args.memprofile, slow_files=args.slow_files, trace=args.trace)
+    
+    brain = None
+    if answered_by_daemon(args):
+        brain = BrainClient.connect()
+    if brain is None:
+        from brain_helper import BrainHelper
+        brain = BrainHelper(jobs=args.jobs)
+    
+    run(brain, args)
+
+
+if __name__ == "__main__":
+    main()
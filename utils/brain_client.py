@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+AI Brain Daemon Client
+
+Minimal client for the `brain_helper.py serve` daemon. It only uses the
+standard library, so reaching a warm daemon costs a socket round trip
+rather than a corpus scan. Messages are newline-delimited JSON-RPC 2.0.
+
+This module is on the CLI's fast path: keep its imports to the few
+modules the round trip needs (no pathlib or typing). It talks to the
+socket through `_socket`, the C module behind `socket`, because the
+wrapper's imports (enum, selectors) cost more than the round trip itself.
+"""
+
+import _socket
+import itertools
+import json
+import os
+
+
+SOCKET_NAME = "brain.sock"
+
+# BrainHelper methods the daemon answers (all read-only); besides these,
+# `run_command` runs a whole read-only `brain` command and returns its output
+METHODS = frozenset({
+    'get_statistics', 'generate_report', 'read_document', 'search', 'top_k',
+    'get_high_priority', 'get_by_category', 'find_by_tags', 'find_by_tag_expression',
+    'get_mcp_servers', 'get_commands', 'get_infrastructure',
+    'iter_documents', 'iter_high_priority', 'iter_by_category', 'iter_by_tags',
+    'iter_by_tag_expression', 'iter_mcp_servers', 'iter_commands', 'iter_infrastructure',
+    'get_links', 'get_backlinks', 'get_orphans',
+})
+
+# Exceptions the daemon reports by name and the client raises again
+ERRORS = {
+    'FileNotFoundError': FileNotFoundError,
+    'ValueError': ValueError,
+    'KeyError': KeyError,
+}
+
+
+class DaemonError(RuntimeError):
+    """The daemon could not answer a request"""
+
+
+def socket_path(root=".") -> str:
+    """Socket for the daemon serving a tree (BRAIN_SOCKET overrides)"""
+    return os.environ.get('BRAIN_SOCKET') or os.path.join(str(root), ".brain", SOCKET_NAME)
+
+
+class BrainClient:
+    """Stand-in for BrainHelper's query methods, answered by a running daemon
+
+    Documents come back as plain dicts with the same keys `Document`
+    supports, so callers can index results either way.
+    """
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.buffer = b''
+        self.ids = itertools.count(1)
+
+    @classmethod
+    def connect(cls, root=".", timeout: float = 30.0) -> 'BrainClient':
+        """Connect to the daemon for a tree, or return None when none is running"""
+        if os.environ.get('BRAIN_DAEMON', '').lower() in ('off', '0', 'false', 'no'):
+            return None
+        path = socket_path(root)
+        if not hasattr(_socket, 'AF_UNIX') or not os.path.exists(path):
+            return None
+
+        sock = _socket.socket(_socket.AF_UNIX, _socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        try:
+            sock.connect(path)
+        except OSError:
+            # Stale socket file from a daemon that is gone
+            sock.close()
+            return None
+        return cls(sock)
+
+    def readline(self) -> bytes:
+        """Next newline-terminated message (shorter, or empty, once the daemon hangs up)"""
+        chunks = [self.buffer]
+        # Only new data can hold the newline, so large responses stay linear
+        while b'\n' not in chunks[-1]:
+            chunk = self.sock.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        line, newline, self.buffer = b''.join(chunks).partition(b'\n')
+        return line + newline
+
+    def call(self, method: str, *params):
+        """Send one request and wait for its result"""
+        request = {'jsonrpc': '2.0', 'id': next(self.ids), 'method': method, 'params': list(params)}
+        self.sock.sendall(json.dumps(request).encode('utf-8') + b'\n')
+        line = self.readline()
+        if not line:
+            raise DaemonError("Brain daemon closed the connection")
+
+        response = json.loads(line)
+        error = response.get('error')
+        if error:
+            kind = (error.get('data') or {}).get('type')
+            raise ERRORS.get(kind, DaemonError)(error.get('message', 'Unknown daemon error'))
+        return response.get('result')
+
+    def __getattr__(self, name: str):
+        if name not in METHODS:
+            raise AttributeError(name)
+        if name.startswith('iter_'):
+            return lambda *params: iter(self.call(name, *params))
+        return lambda *params: self.call(name, *params)
+
+    def close(self):
+        """Close the connection"""
+        self.sock.close()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+AI Brain Synthetic Corpus
+
+Deterministic generator for knowledge bases of any size, used by the
+benchmarks. The same seed and settings always produce byte-identical files:
+documents are spread over the usual top-level categories and nested
+subdirectories, tags follow a Zipf distribution over a fixed vocabulary,
+ship factors follow a configurable weighting, and body lengths are drawn
+from a log-normal distribution around a median word count.
+"""
+
+import math
+import random
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+
+CATEGORIES = ('knowledge', 'systems', 'tools', 'infrastructure', 'commands', 'prompts')
+
+# Document directories of this repository, for benchmarks of the scripts
+# that expect its layout (ai/context, infrastructure/services, ...)
+REPOSITORY_LAYOUT = (
+    'ai/context', 'ai/modes', 'ai/rules', 'ai/system-prompts', 'ai/workflows',
+    'commands/shortcuts', 'commands/slash-commands', 'commands/templates',
+    'docs/guides',
+    'infrastructure/environments/local', 'infrastructure/environments/production',
+    'infrastructure/networking', 'infrastructure/security',
+    'infrastructure/services/cloud', 'infrastructure/services/databases',
+    'infrastructure/services/mcp/mcp-servers',
+    'knowledge/decisions', 'knowledge/lessons', 'knowledge/references',
+    'systems/rules', 'systems/workflows',
+    'tools/integrations',
+)
+
+# Frontmatter type by top-level directory
+TYPES = {
+    'ai': 'knowledge',
+    'commands': 'tool',
+    'docs': 'guide',
+    'infrastructure': 'infrastructure',
+    'knowledge': 'knowledge',
+    'prompts': 'behavior',
+    'systems': 'system',
+    'tools': 'tool',
+}
+
+# Relative weights of ship factors 1..10 (most documents are normal priority)
+SHIP_FACTOR_WEIGHTS = (1, 2, 3, 4, 8, 8, 6, 4, 2, 1)
+
+SYLLABLES = ('ka', 'lo', 'mi', 'ne', 'ru', 'sa', 'te', 'vo', 'xi', 'zu', 'bra', 'dor', 'fen', 'gil', 'hox', 'pim')
+
+
+def make_words(rng: random.Random, count: int) -> List[str]:
+    """A vocabulary of distinct pseudo-words"""
+    words = set()
+    while len(words) < count:
+        words.add(''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def zipf_weights(count: int, exponent: float = 1.1) -> List[float]:
+    """Cumulative Zipf weights for rank 1..count (for random.choices)"""
+    total = 0.0
+    weights = []
+    for rank in range(1, count + 1):
+        total += 1.0 / rank ** exponent
+        weights.append(total)
+    return weights
+
+
+def generate_corpus(
+    root,
+    documents: int = 1000,
+    seed: int = 42,
+    tags: int = 200,
+    tags_per_document: int = 3,
+    depth: int = 2,
+    fanout: int = 8,
+    body_words: int = 300,
+    deprecated_ratio: float = 0.05,
+    ship_factor_weights: Optional[List[int]] = None,
+    categories: Sequence[str] = CATEGORIES
+) -> Dict[str, int]:
+    """Write a synthetic knowledge base below `root` and return a summary
+
+    Documents are dealt round-robin to the `categories` directories and land
+    `depth` directories below them, with `fanout` subdirectories per level.
+    Tags, ship factors, body sizes and deprecations are all drawn from one
+    generator seeded with `seed`.
+    """
+    root = Path(root)
+    rng = random.Random(seed)
+    vocabulary = make_words(rng, 2000)
+    tag_names = make_words(rng, tags)
+    tag_weights = zipf_weights(tags)
+    word_weights = zipf_weights(len(vocabulary))
+    ship_factors = list(range(1, 11))
+    ship_weights = list(ship_factor_weights or SHIP_FACTOR_WEIGHTS)
+    sigma = 0.6
+
+    summary = {'documents': 0, 'directories': 0, 'bytes': 0}
+    directories = set()
+
+    for number in range(documents):
+        category = categories[number % len(categories)]
+        name = category.rsplit('/', 1)[-1]
+        parts = category.split('/') + [f"{name[:3]}-{rng.randrange(fanout)}" for _ in range(depth)]
+        top = parts[0]
+        directory = root.joinpath(*parts)
+        if directory not in directories:
+            directory.mkdir(parents=True, exist_ok=True)
+            directories.add(directory)
+
+        title_words = rng.choices(vocabulary, cum_weights=word_weights, k=rng.randint(2, 6))
+        title = ' '.join(title_words).capitalize()
+        document_tags = sorted(set(rng.choices(tag_names, cum_weights=tag_weights, k=tags_per_document)))
+        ship_factor = rng.choices(ship_factors, weights=ship_weights)[0]
+        deprecated = rng.random() < deprecated_ratio
+        day = 1 + number % 28
+
+        # Log-normal body length with the requested median
+        length = max(1, int(body_words * math.exp(rng.gauss(0, sigma))))
+        words = rng.choices(vocabulary, cum_weights=word_weights, k=length)
+        lines = [' '.join(words[start:start + 12]) for start in range(0, length, 12)]
+        paragraphs = ['\n'.join(lines[start:start + 5]) for start in range(0, len(lines), 5)]
+
+        header = [
+            '---',
+            f'title: {title}',
+            f'type: {TYPES.get(top, "general")}',
+            f'subtype: {parts[1] if len(parts) > 1 else "general"}',
+            f'category: {category}',
+            f'tags: [{", ".join(document_tags)}]',
+            f'created: 2024-01-{day:02d}T10:00:00',
+            f'modified: 2024-02-{day:02d}T10:00:00',
+            'version: 1',
+            f'ship_factor: {ship_factor}',
+        ]
+        if deprecated:
+            header.append('deprecated: true')
+        header.append('---')
+
+        text = '\n'.join(header) + f'\n\n# {title}\n\n' + '\n\n'.join(paragraphs) + '\n'
+        path = directory / f"doc-{number:07d}.md"
+        data = text.encode('utf-8')
+        path.write_bytes(data)
+
+        summary['documents'] += 1
+        summary['bytes'] += len(data)
+
+    # Directories that hold documents (their parents are not counted)
+    summary['directories'] = len(directories)
+    return summary
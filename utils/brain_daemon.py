@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+AI Brain Query Daemon
+
+Keeps the parsed corpus, its indexes and recently read bodies in memory and
+answers BrainHelper queries from many clients over a Unix socket
+(newline-delimited JSON-RPC 2.0, see brain_client). `run_command` also runs
+a whole read-only `brain` command line and returns its output, so the CLI
+needs neither argparse nor the query results. Changes on disk are
+applied as they happen through watchdog notifications when watchdog is
+installed, and by a periodic catalog sync in every case. The sync is a
+stat-only refresh for edits made outside the tooling, plus a check of the
+catalog generation for rows other `brain` processes already wrote (their
+files match the catalog, so the stat pass alone would miss them).
+"""
+
+import asyncio
+import json
+import os
+import signal
+import time
+from pathlib import Path
+from typing import Any, List, Optional
+
+from brain_client import BrainClient, METHODS, socket_path
+from brain_document import BodyCache, Document
+from brain_metrics import Registry
+from brain_walk import BrainIgnore
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    FileSystemEventHandler = object
+    Observer = None
+
+
+# Seconds between stat-only refreshes, with and without file notifications
+POLL_INTERVAL = 2.0
+WATCHED_POLL_INTERVAL = 30.0
+
+# Coalesce bursts of notifications (editors often write several times)
+DEBOUNCE = 0.05
+
+
+def encode(value: Any) -> Any:
+    """JSON-ready form of a query result"""
+    if isinstance(value, Document):
+        return value.to_dict()
+    if isinstance(value, (str, int, float, bool, dict)) or value is None:
+        return value
+    return [encode(item) for item in value]
+
+
+class ChangeHandler(FileSystemEventHandler):
+    """Forwards watchdog events from the observer thread to the event loop"""
+
+    def __init__(self, daemon: 'BrainDaemon'):
+        self.daemon = daemon
+
+    def on_any_event(self, event):
+        if event.event_type in ('opened', 'closed_no_write'):
+            return
+        if event.is_directory and event.event_type == 'modified':
+            # Fired for the parent of every changed file; the file has its own event
+            return
+        paths = [path for path in (event.src_path, getattr(event, 'dest_path', '')) if path]
+        self.daemon.loop.call_soon_threadsafe(self.daemon.notify, event.is_directory, paths)
+
+
+class DaemonQueries(BrainClient):
+    """The client's query methods, answered by the daemon in-process
+
+    Lets `brain_cli.run` render a whole command inside the daemon with the
+    same results a socket client would get.
+    """
+
+    def __init__(self, daemon: 'BrainDaemon'):
+        self.daemon = daemon
+
+    def call(self, method: str, *params):
+        return self.daemon.call(method, list(params))
+
+
+class BrainDaemon:
+    """Serves one BrainHelper's warm snapshot over a Unix socket"""
+
+    def __init__(self, helper, path: Optional[Path] = None, interval: Optional[float] = None, cache_size: int = 256):
+        self.helper = helper
+        self.root = helper.root.resolve()
+        self.path = Path(path or socket_path(helper.root))
+        self.interval = interval
+        self.helper.body_cache = BodyCache(helper.root, cache_size)
+        self.ignore = BrainIgnore(self.root)
+
+        self.loop = None
+        self.observer = None
+        self.watched = set()
+        self.pending = set()
+        self.resync = False
+        self.flush_handle = None
+        self.clients = {}
+        self.started = time.time()
+        self.requests = 0
+        self.create_metrics()
+
+    def create_metrics(self):
+        """Counters and histograms served with --metrics-port or --metrics-textfile"""
+        cache = self.helper.body_cache
+        self.metrics = Registry()
+        self.request_counter = self.metrics.counter('brain_daemon_requests_total', 'JSON-RPC requests answered')
+        self.request_seconds = self.metrics.histogram('brain_daemon_request_seconds', 'Time to answer one request',
+                                                      buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0))
+        self.metrics.gauge('brain_daemon_queue_depth', 'Changed paths waiting to be applied',
+                           function=lambda: len(self.pending))
+        self.flush_paths = self.metrics.histogram('brain_daemon_flush_paths', 'Changed paths applied per flush',
+                                                  buckets=(1, 2, 5, 10, 50, 100, 500))
+        self.flush_seconds = self.metrics.histogram('brain_daemon_flush_seconds', 'Time to apply queued changes')
+        self.poll_seconds = self.metrics.histogram('brain_daemon_poll_seconds', 'Time of one stat-only refresh of the tree')
+        self.metrics.gauge('brain_daemon_clients', 'Connected clients', function=lambda: len(self.clients))
+        self.metrics.counter('brain_body_cache_hits_total', 'Document bodies served from memory', function=lambda: cache.hits)
+        self.metrics.counter('brain_body_cache_misses_total', 'Document bodies read from disk', function=lambda: cache.misses)
+        self.documents = self.metrics.gauge('brain_daemon_documents', 'Documents in the served snapshot')
+
+    # File changes
+
+    def notify(self, is_directory: bool, paths: List[str]):
+        """Queue paths reported by the observer (runs on the event loop)"""
+        for path in paths:
+            try:
+                relative_path = Path(path).resolve().relative_to(self.root)
+            except ValueError:
+                continue
+            if self.ignore.is_ignored(self.root / relative_path):
+                continue
+            if is_directory:
+                # A directory appeared, vanished or moved: rescan rather than guess
+                self.resync = True
+            elif relative_path.suffix == '.md':
+                self.pending.add(relative_path.as_posix())
+
+        if (self.resync or self.pending) and self.flush_handle is None:
+            self.flush_handle = self.loop.call_later(DEBOUNCE, self.flush)
+
+    def flush(self):
+        """Apply queued changes to the catalog and snapshot"""
+        self.flush_handle = None
+        start = time.perf_counter()
+        if self.resync:
+            self.resync = False
+            self.pending.clear()
+            self.helper.sync_snapshot()
+        else:
+            paths = sorted(self.pending)
+            self.pending.clear()
+            self.flush_paths.observe(len(paths))
+            self.helper._apply_changes([self.helper.root / path for path in paths])
+        self.watch_directories()
+        self.flush_seconds.observe(time.perf_counter() - start)
+        self.count_documents()
+
+    def count_documents(self):
+        self.documents.set(self.helper.snapshot().statistics()['total'])
+
+    def watch_directories(self):
+        """Watch every directory holding a document, without descending into ignored trees"""
+        if self.observer is None:
+            return
+        directories = {self.root}
+        for path in self.helper.snapshot().paths:
+            directories.add((self.root / path).parent)
+        handler = ChangeHandler(self)
+        for directory in sorted(directories - self.watched):
+            try:
+                self.observer.schedule(handler, str(directory), recursive=False)
+            except OSError:
+                continue
+            self.watched.add(directory)
+
+    async def poll(self, interval: float):
+        """Periodic stat-only refresh, catching anything notifications missed"""
+        while True:
+            await asyncio.sleep(interval)
+            start = time.perf_counter()
+            self.helper.sync_snapshot()
+            self.watch_directories()
+            self.poll_seconds.observe(time.perf_counter() - start)
+            self.count_documents()
+
+    # Requests
+
+    def status(self) -> dict:
+        cache = self.helper.body_cache
+        return {
+            'pid': os.getpid(),
+            'root': str(self.root),
+            'documents': self.helper.snapshot().statistics()['total'],
+            'uptime': round(time.time() - self.started, 1),
+            'requests': self.requests,
+            'watching': self.observer is not None,
+            'body_cache': {'entries': len(cache.entries), 'hits': cache.hits, 'misses': cache.misses},
+        }
+
+    def call(self, method: str, params: Any) -> Any:
+        """Run one BrainHelper query"""
+        function = getattr(self.helper, method)
+        result = function(**params) if isinstance(params, dict) else function(*params)
+        if method == 'read_document':
+            document = result.to_dict()
+            document['metadata'] = result.metadata
+            document['content'] = result.content
+            return document
+        return encode(result)
+
+    def run_command(self, argv: List[str]) -> Optional[dict]:
+        """Output and exit status of a `brain` query command, or None if it must run in the client"""
+        from brain_cli import run_captured
+        if not isinstance(argv, list) or not all(isinstance(arg, str) for arg in argv):
+            raise TypeError("run_command expects a list of arguments")
+        return run_captured(DaemonQueries(self), argv)
+
+    def respond(self, line: bytes) -> bytes:
+        """Answer one JSON-RPC request line, counting and timing it"""
+        self.requests += 1
+        self.request_counter.inc()
+        start = time.perf_counter()
+        try:
+            return self.answer(line)
+        finally:
+            self.request_seconds.observe(time.perf_counter() - start)
+
+    def answer(self, line: bytes) -> bytes:
+        """The response to one request line"""
+        try:
+            request = json.loads(line)
+        except ValueError:
+            request = None
+        if not isinstance(request, dict):
+            return self.reply(None, error={'code': -32700, 'message': "Parse error"})
+
+        request_id = request.get('id')
+        method = request.get('method')
+        if method == 'ping':
+            return self.reply(request_id, self.status())
+        if method != 'run_command' and method not in METHODS:
+            return self.reply(request_id, error={'code': -32601, 'message': f"Unknown method: {method}"})
+
+        try:
+            params = request.get('params', [])
+            if method == 'run_command':
+                return self.reply(request_id, self.run_command(*params))
+            return self.reply(request_id, self.call(method, params))
+        except TypeError as e:
+            return self.reply(request_id, error={'code': -32602, 'message': str(e)})
+        except Exception as e:
+            error = {'code': -32000, 'message': str(e), 'data': {'type': type(e).__name__}}
+            return self.reply(request_id, error=error)
+
+    @staticmethod
+    def reply(request_id: Any, result: Any = None, error: Optional[dict] = None) -> bytes:
+        response = {'jsonrpc': '2.0', 'id': request_id}
+        if error is None:
+            response['result'] = result
+        else:
+            response['error'] = error
+        return json.dumps(response, default=str).encode('utf-8') + b'\n'
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve one client connection until it disconnects"""
+        self.clients[writer] = asyncio.current_task()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                writer.write(self.respond(line))
+                await writer.drain()
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            del self.clients[writer]
+            writer.close()
+
+    # Lifecycle
+
+    async def serve(self):
+        """Warm the snapshot, then answer queries until SIGINT or SIGTERM"""
+        self.loop = asyncio.get_running_loop()
+
+        client = BrainClient.connect(self.helper.root)
+        if client is not None:
+            client.close()
+            raise RuntimeError(f"A brain daemon is already serving {self.path}")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.unlink(missing_ok=True)
+
+        self.count_documents()
+        server = await asyncio.start_unix_server(self.handle, path=str(self.path))
+        os.chmod(self.path, 0o600)
+
+        if Observer is not None:
+            self.observer = Observer()
+            self.watch_directories()
+            self.observer.start()
+        else:
+            print("ℹ️  watchdog not installed; polling for changes (pip install watchdog for instant updates)")
+
+        interval = self.interval or (WATCHED_POLL_INTERVAL if self.observer else POLL_INTERVAL)
+        poller = asyncio.create_task(self.poll(interval))
+
+        stop = asyncio.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            self.loop.add_signal_handler(signum, stop.set)
+
+        print(f"🧠 Brain daemon serving {self.helper.snapshot().statistics()['total']} documents on {self.path}")
+        try:
+            await stop.wait()
+        finally:
+            poller.cancel()
+            server.close()
+            # Closing a connection ends its handler at the next read
+            handlers = list(self.clients.values())
+            for writer in list(self.clients):
+                writer.close()
+            await asyncio.gather(*handlers, return_exceptions=True)
+            await server.wait_closed()
+            if self.observer is not None:
+                self.observer.stop()
+                self.observer.join()
+            self.path.unlink(missing_ok=True)
+            print("🛑 Brain daemon stopped")
+
+    def run(self):
+        asyncio.run(self.serve())
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+AI Brain Document Record
+
+Compact record for one knowledge base document. Metadata fields live in
+`__slots__`, directory names, tags and types are interned so documents
+share them, and the body is only read from disk when `.content` is first
+accessed.
+"""
+
+import os
+import sys
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from frontmatter_reader import read_header, split_document
+
+
+def as_text(value: Any) -> Optional[str]:
+    """Normalize a frontmatter scalar to text for an indexed field"""
+    if value is None:
+        return None
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+def intern(value: Optional[str]) -> Optional[str]:
+    """Share one copy of a frequently repeated string (tags, types, categories)"""
+    return sys.intern(value) if value is not None else None
+
+
+def as_int(value: Any) -> Optional[int]:
+    """Keep only genuine integers (YAML booleans are not ship factors)"""
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    return None
+
+
+class Document:
+    """One document's metadata, with its body and full frontmatter loaded lazily
+
+    Item access (`doc['title']`) mirrors the dicts the BrainHelper APIs used
+    to return, including their display defaults for missing values.
+    """
+
+    __slots__ = (
+        'root', 'path', 'parts', 'title', 'type', 'subtype', 'category', 'tags',
+        'ship_factor', 'deprecated', 'created', 'modified', 'version',
+        '_metadata', '_content'
+    )
+
+    FIELDS = (
+        'path', 'title', 'type', 'subtype', 'category', 'tags',
+        'ship_factor', 'deprecated', 'created', 'modified', 'version'
+    )
+    PROPERTIES = ('name', 'directory', 'content', 'metadata')
+    DEFAULTS = {'title': 'Untitled', 'ship_factor': 0, 'category': 'unknown'}
+
+    def __init__(
+        self,
+        root: Path,
+        path: str,
+        title: Optional[str] = None,
+        type: Optional[str] = None,
+        subtype: Optional[str] = None,
+        category: Optional[str] = None,
+        tags: Tuple[str, ...] = (),
+        ship_factor: Optional[int] = None,
+        deprecated: bool = False,
+        created: Optional[str] = None,
+        modified: Optional[str] = None,
+        version: Optional[int] = None
+    ):
+        self.root = root
+        self.path = path
+        *directories, name = path.split('/')
+        self.parts = tuple(sys.intern(part) for part in directories) + (name,)
+        self.title = title
+        self.type = intern(type)
+        self.subtype = intern(subtype)
+        self.category = intern(category)
+        self.tags = tuple(sys.intern(tag) for tag in tags)
+        self.ship_factor = ship_factor
+        self.deprecated = deprecated
+        self.created = created
+        self.modified = modified
+        self.version = version
+        self._metadata = None
+        self._content = None
+
+    @classmethod
+    def from_row(cls, root: Path, row, tags: Tuple[str, ...] = ()) -> 'Document':
+        """Build a document from a catalog row (tags already decoded)"""
+        return cls(
+            root, row['path'],
+            title=row['title'],
+            type=row['type'],
+            subtype=row['subtype'],
+            category=row['category'],
+            tags=tags,
+            ship_factor=row['ship_factor'],
+            deprecated=bool(row['deprecated']),
+            created=row['created'],
+            modified=row['modified'],
+            version=row['version']
+        )
+
+    @classmethod
+    def from_metadata(cls, root: Path, path: str, metadata: Dict[str, Any]) -> 'Document':
+        """Build a document from parsed frontmatter"""
+        tags = metadata.get('tags', [])
+        document = cls(
+            root, path,
+            title=as_text(metadata.get('title')),
+            type=as_text(metadata.get('type')),
+            subtype=as_text(metadata.get('subtype')),
+            category=as_text(metadata.get('category')),
+            tags=tuple(str(tag) for tag in tags) if isinstance(tags, list) else (),
+            ship_factor=as_int(metadata.get('ship_factor')),
+            deprecated=bool(metadata.get('deprecated', False)),
+            created=as_text(metadata.get('created')),
+            modified=as_text(metadata.get('modified')),
+            version=as_int(metadata.get('version'))
+        )
+        document._metadata = metadata
+        return document
+
+    @property
+    def name(self) -> str:
+        return self.parts[-1]
+
+    @property
+    def directory(self) -> str:
+        return '/'.join(self.parts[:-1])
+
+    @property
+    def file_path(self) -> Path:
+        return self.root / self.path
+
+    def _load(self):
+        with open(self.file_path, 'r', encoding='utf-8') as f:
+            metadata, self._content = split_document(f.read())
+        if self._metadata is None:
+            self._metadata = metadata
+
+    @property
+    def content(self) -> str:
+        """The document body, read from disk on first access"""
+        if self._content is None:
+            self._load()
+        return self._content
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        """The complete frontmatter, read (header only) on first access"""
+        if self._metadata is None:
+            self._metadata = read_header(self.file_path)
+        return self._metadata
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self.FIELDS or key in self.PROPERTIES:
+            value = getattr(self, key)
+            return (value or self.DEFAULTS[key]) if key in self.DEFAULTS else value
+        raise KeyError(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except (KeyError, AttributeError):
+            return default
+
+    def keys(self) -> Iterator[str]:
+        return iter(self.FIELDS)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain metadata dict (body excluded), e.g. for JSON output"""
+        return {key: list(self[key]) if key == 'tags' else self[key] for key in self.FIELDS}
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Document) and other.path == self.path and other.root == self.root
+
+    def __hash__(self) -> int:
+        return hash(self.path)
+
+    def __repr__(self) -> str:
+        return f"Document({self.path!r}, title={self.title!r}, ship_factor={self.ship_factor!r})"
+
+
+class SearchHit(Document):
+    """A document returned by full-text search, with its score and snippet"""
+
+    __slots__ = ('score', 'snippet')
+
+    FIELDS = Document.FIELDS + ('score', 'snippet')
+
+    @classmethod
+    def of(cls, document: Document, score: float) -> 'SearchHit':
+        """Copy a snapshot document so the hit can load its body independently"""
+        hit = cls.__new__(cls)
+        for slot in Document.__slots__:
+            setattr(hit, slot, getattr(document, slot))
+        hit._content = None
+        hit.score = score
+        hit.snippet = ''
+        return hit
+
+
+class BodyCache:
+    """LRU of recently read documents with their bodies loaded
+
+    Entries are validated against the file's mtime and size on every
+    lookup, so a changed file is re-read even if no one invalidated it.
+    """
+
+    def __init__(self, root: Path, max_entries: int = 256):
+        self.root = Path(root)
+        self.max_entries = max_entries
+        self.entries: 'OrderedDict[str, Tuple[Tuple[int, int], Document]]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path: str, load: Callable[[], Document]) -> Document:
+        """Return the cached document for path, calling `load` on a miss"""
+        stat = os.stat(self.root / path)
+        key = (stat.st_mtime_ns, stat.st_size)
+        entry = self.entries.get(path)
+        if entry is not None and entry[0] == key:
+            self.entries.move_to_end(path)
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        document = load()
+        document.content
+        self.entries[path] = (key, document)
+        self.entries.move_to_end(path)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return document
+
+    def discard(self, path: str):
+        """Forget a document (it changed or was removed)"""
+        self.entries.pop(path, None)
@@ -6,29 +6,164 @@ Utility functions for managing the AI Brain knowledge base.
 Updated to reflect current repository structure (2025-01-15).
 """
 
-import os
-import yaml
-import json
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple
 
-try:
-    import frontmatter
-except ImportError:
-    print("Please install python-frontmatter: pip install python-frontmatter")
-    exit(1)
+from brain_catalog import BrainCatalog
+from frontmatter_reader import load_post, read_header
+from brain_snapshot import CorpusSnapshot
+from brain_search import BrainSearch, snippet
+from brain_document import Document, SearchHit
+from brain_parallel import parallel_map, resolve_jobs
+from brain_walk import walk_directories, walk_files
+from brain_profile import profiled
+
+# python-frontmatter (needed only for writes) and the batch machinery are
+# imported on first use, so read-only actions start quickly
+if TYPE_CHECKING:
+    from brain_batch import BrainBatch
+
+
+def file_title(md_file: Path) -> str:
+    """Get title from frontmatter or generate from filename"""
+    try:
+        metadata = read_header(md_file)
+        if 'title' in metadata:
+            return metadata['title']
+    except:
+        pass
+    
+    # Fallback to filename
+    return md_file.stem.replace('-', ' ').replace('_', ' ').title()
+
+
+def validate_file(md_file: Path) -> Tuple[List[str], List[str]]:
+    """Worker: check one file's frontmatter, returning (errors, warnings)"""
+    errors = []
+    warnings = []
+    
+    try:
+        metadata = read_header(md_file)
+        
+        # Check required frontmatter fields
+        required_fields = ['title', 'type', 'created', 'modified', 'version', 'ship_factor']
+        for field in required_fields:
+            if field not in metadata:
+                warnings.append(f"{md_file}: Missing {field} in frontmatter")
+        
+        # Validate ship_factor range
+        if 'ship_factor' in metadata:
+            sf = metadata['ship_factor']
+            if not isinstance(sf, int) or sf < 1 or sf > 10:
+                errors.append(f"{md_file}: Invalid ship_factor {sf} (must be 1-10)")
+        
+        # Validate type
+        if 'type' in metadata:
+            valid_types = ['knowledge', 'behavior', 'system', 'tool', 'general', 'guide']
+            if metadata['type'] not in valid_types:
+                warnings.append(f"{md_file}: Unknown type '{metadata['type']}'")
+        
+    except Exception as e:
+        errors.append(f"{md_file}: {str(e)}")
+    
+    return errors, warnings
+
+
+def update_file_frontmatter(task) -> Tuple[bool, Optional[str]]:
+    """Worker: fill in missing frontmatter fields for one file
+    
+    Returns (updated, warning). Module-level so it can run in a process pool.
+    """
+    root, md_file = task
+    try:
+        with open(md_file, 'r', encoding='utf-8') as f:
+            post = load_post(f.read())
+        
+        # Check if frontmatter needs updating
+        needs_update = False
+        metadata = post.metadata
+        
+        # Ensure required fields exist
+        if 'title' not in metadata:
+            metadata['title'] = file_title(md_file)
+            needs_update = True
+        
+        if 'type' not in metadata:
+            # Determine type from path
+            path_parts = md_file.relative_to(root).parts
+            if path_parts[0] == "knowledge":
+                metadata['type'] = "knowledge"
+            elif path_parts[0] == "prompts":
+                metadata['type'] = "behavior"
+            elif path_parts[0] == "systems":
+                metadata['type'] = "system"
+            elif path_parts[0] == "tools":
+                metadata['type'] = "tool"
+            else:
+                metadata['type'] = "general"
+            needs_update = True
+        
+        # Get path_parts for subtype check
+        path_parts = md_file.relative_to(root).parts
+        if 'subtype' not in metadata and len(path_parts) > 1:
+            metadata['subtype'] = path_parts[1]
+            needs_update = True
+        
+        if 'created' not in metadata:
+            metadata['created'] = datetime.now().isoformat()
+            needs_update = True
+        
+        if 'modified' not in metadata:
+            metadata['modified'] = datetime.now().isoformat()
+            needs_update = True
+        else:
+            # Update modified date
+            metadata['modified'] = datetime.now().isoformat()
+            needs_update = True
+        
+        if 'version' not in metadata:
+            metadata['version'] = 1
+            needs_update = True
+        
+        if 'ship_factor' not in metadata:
+            metadata['ship_factor'] = 5
+            needs_update = True
+        
+        if 'tags' not in metadata:
+            metadata['tags'] = []
+            needs_update = True
+        
+        if needs_update:
+            import frontmatter
+            from brain_batch import atomic_write
+            post.metadata = metadata
+            atomic_write(md_file, frontmatter.dumps(post), sync=False)
+            return True, None
+            
+    except Exception as e:
+        return False, f"Warning: Could not update {md_file}: {e}"
+    
+    return False, None
 
 
 class BrainHelper:
     """Helper class for AI Brain operations"""
     
-    def __init__(self, root_path: str = "."):
+    def __init__(self, root_path: str = ".", jobs: int = 1):
         self.root = Path(root_path)
-        self.ensure_structure()
+        self.jobs = resolve_jobs(jobs)
+        self.catalog = None
+        self._snapshot = None
+        # Optional BodyCache (the daemon attaches one) for read_document and search
+        self.body_cache = None
     
     def ensure_structure(self):
-        """Ensure all required directories exist based on current structure"""
+        """Ensure all required directories exist based on current structure
+        
+        Called before writes and structural passes rather than on every
+        construction, so read-only queries touch nothing on disk.
+        """
         directories = [
             # Knowledge base
             "knowledge/decisions",
@@ -70,6 +205,84 @@ class BrainHelper:
         for dir_path in directories:
             (self.root / dir_path).mkdir(parents=True, exist_ok=True)
     
+    def open_catalog(self) -> BrainCatalog:
+        """Open the metadata catalog without refreshing it"""
+        if self.catalog is None:
+            self.catalog = BrainCatalog(str(self.root), jobs=self.jobs)
+        return self.catalog
+    
+    @profiled('snapshot')
+    def snapshot(self, refresh: bool = False) -> CorpusSnapshot:
+        """Return the in-memory corpus snapshot, building it with one catalog pass"""
+        if self._snapshot is None or refresh:
+            self._snapshot = CorpusSnapshot.from_catalog(self.open_catalog())
+        return self._snapshot
+    
+    def invalidate_snapshot(self):
+        """Drop the cached snapshot after files were written"""
+        self._snapshot = None
+    
+    def sync_snapshot(self) -> List[str]:
+        """Pick up files changed since the snapshot was built
+        
+        Runs the catalog's stat-only refresh and applies each changed file
+        to the loaded snapshot as a delta. Rows another process wrote to the
+        shared catalog (which the stat pass finds up to date) are found by
+        the catalog generation. Returns the changed paths.
+        """
+        if self._snapshot is None:
+            self.snapshot()
+            return []
+        catalog = self.open_catalog()
+        catalog.refresh()
+        changed = list(catalog.changed_paths)
+        
+        generation = catalog.generation()
+        if generation != self._snapshot.generation:
+            seen = set(changed)
+            changed.extend(path for path in catalog.changed_since(self._snapshot.generation) if path not in seen)
+            seen.update(changed)
+            # Removed rows leave nothing to select, so compare the path lists
+            changed.extend(sorted(set(self._snapshot.paths) - set(catalog.paths()) - seen))
+            self._snapshot.generation = generation
+        
+        self._apply_rows(changed)
+        return changed
+    
+    def _apply_rows(self, relative_paths: List[str], rows: Optional[Dict] = None):
+        """Bring the loaded snapshot in line with the catalog rows for some paths"""
+        if self._snapshot is None:
+            return
+        for relative_path in relative_paths:
+            row = rows[relative_path] if rows is not None else self.catalog.get(relative_path)
+            if self.body_cache is not None:
+                self.body_cache.discard(relative_path)
+            if row is None:
+                self._snapshot.discard(relative_path)
+            else:
+                self._snapshot.upsert(CorpusSnapshot.entry_from_row(self.root, row))
+    
+    def _apply_changes(self, file_paths: List[Path]):
+        """Apply written documents to the catalog and snapshot indexes
+        
+        Only the touched files are re-read, in one catalog transaction;
+        catalog counters, links and (when loaded) the snapshot indexes are
+        adjusted by their deltas. Their search postings are rebuilt by the
+        next search.
+        """
+        relative_paths = [file_path.relative_to(self.root).as_posix() for file_path in file_paths]
+        self._apply_rows(relative_paths, self.open_catalog().refresh_files(relative_paths))
+    
+    def batch(self) -> 'BrainBatch':
+        """Queue several writes and apply them in one commit
+        
+        Files are replaced atomically, synced together, and the indexes
+        are updated once when the `with` block exits.
+        """
+        from brain_batch import BrainBatch
+        self.ensure_structure()
+        return BrainBatch(self)
+    
     def create_document(
         self,
         title: str,
@@ -82,67 +295,27 @@ class BrainHelper:
         category: str = None
     ) -> str:
         """Create a new document with frontmatter"""
-        
-        # Generate filename from title
-        slug = self._slugify(title)
-        
-        # Determine path based on category and type
-        if category:
-            path = self.root / category / subtype / f"{slug}.md"
-        else:
-            path = self.root / doc_type / subtype / f"{slug}.md"
-        
-        # Check if file exists
-        if path.exists():
-            timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
-            if category:
-                path = self.root / category / subtype / f"{slug}-{timestamp}.md"
-            else:
-                path = self.root / doc_type / subtype / f"{slug}-{timestamp}.md"
-        
-        # Create document with frontmatter
-        post = frontmatter.Post(content)
-        post['title'] = title
-        post['type'] = doc_type
-        post['subtype'] = subtype
-        post['tags'] = tags or []
-        post['created'] = datetime.now().isoformat()
-        post['modified'] = datetime.now().isoformat()
-        post['version'] = 1
-        post['ship_factor'] = ship_factor
-        post['deprecated'] = False
-        
-        if references:
-            post['references'] = references
-        
-        if category:
-            post['category'] = category
-        
-        # Write file
-        path.parent.mkdir(parents=True, exist_ok=True)
-        with open(path, 'w', encoding='utf-8') as f:
-            f.write(frontmatter.dumps(post))
-        
-        # Update index
-        self.update_index()
-        
-        return str(path)
-    
-    def read_document(self, path: str) -> Dict[str, Any]:
-        """Read a document and return metadata and content"""
+        with self.batch() as tx:
+            return tx.create(
+                title, content, doc_type, subtype,
+                tags=tags, ship_factor=ship_factor, references=references, category=category
+            )
+    
+    def read_document(self, path: str) -> Document:
+        """Read a document's metadata; its content is loaded on first access"""
         file_path = self.root / path
         
         if not file_path.exists():
             raise FileNotFoundError(f"Document not found: {path}")
         
-        with open(file_path, 'r', encoding='utf-8') as f:
-            post = frontmatter.load(f)
-        
-        return {
-            'metadata': post.metadata,
-            'content': post.content,
-            'path': path
-        }
+        return self._read(Path(path).as_posix())
+    
+    def _read(self, relative_path: str) -> Document:
+        """Read a document, through the body cache when one is attached"""
+        load = lambda: Document.from_metadata(self.root, relative_path, read_header(self.root / relative_path))
+        if self.body_cache is None:
+            return load()
+        return self.body_cache.get(relative_path, load)
     
     def update_document(
         self,
@@ -151,117 +324,87 @@ class BrainHelper:
         metadata_updates: Optional[Dict] = None
     ) -> str:
         """Update an existing document"""
-        file_path = self.root / path
-        
-        if not file_path.exists():
-            raise FileNotFoundError(f"Document not found: {path}")
-        
-        # Load existing document
-        with open(file_path, 'r', encoding='utf-8') as f:
-            post = frontmatter.load(f)
-        
-        # Update content if provided
-        if content is not None:
-            post.content = content
-        
-        # Update metadata
-        if metadata_updates:
-            post.metadata.update(metadata_updates)
-        
-        # Always update version and modified date
-        post['version'] = post.get('version', 1) + 1
-        post['modified'] = datetime.now().isoformat()
-        
-        # Write back
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(frontmatter.dumps(post))
-        
-        # Update index
-        self.update_index()
-        
-        return str(file_path)
+        with self.batch() as tx:
+            return tx.update(path, content, metadata_updates)
     
     def deprecate_document(self, path: str, reason: str) -> str:
         """Mark a document as deprecated"""
-        return self.update_document(
-            path,
-            metadata_updates={
-                'deprecated': True,
-                'deprecated_date': datetime.now().isoformat(),
-                'deprecated_reason': reason
-            }
-        )
+        with self.batch() as tx:
+            return tx.deprecate(path, reason)
     
-    def find_by_tags(self, tags: List[str]) -> List[Dict]:
+    def find_by_tags(self, tags: List[str]) -> List[Document]:
         """Find all documents with specified tags"""
-        results = []
+        return self.snapshot().find_by_tags(tags)
+    
+    def find_by_tag_expression(self, expression: str) -> List[Document]:
+        """Find documents matching a boolean tag expression
         
-        for md_file in self.root.rglob("*.md"):
-            if md_file.name in ['SYSTEM.md', 'INDEX.md', 'README.md', 'CHANGELOG.md']:
-                continue
-            
-            with open(md_file, 'r', encoding='utf-8') as f:
-                post = frontmatter.load(f)
-            
-            doc_tags = post.get('tags', [])
-            if any(tag in doc_tags for tag in tags):
-                results.append({
-                    'path': str(md_file.relative_to(self.root)),
-                    'title': post.get('title', 'Untitled'),
-                    'tags': doc_tags,
-                    'ship_factor': post.get('ship_factor', 0),
-                    'category': post.get('category', 'unknown')
-                })
-        
-        return sorted(results, key=lambda x: x['ship_factor'], reverse=True)
-    
-    def get_high_priority(self, min_ship_factor: int = 8) -> List[Dict]:
+        Example: "mcp AND NOT deprecated", "(setup OR install) AND infra*"
+        """
+        return self.snapshot().query_tags(expression)
+    
+    def get_high_priority(self, min_ship_factor: int = 8) -> List[Document]:
         """Get all high-priority items"""
-        results = []
-        
-        for md_file in self.root.rglob("*.md"):
-            if md_file.name in ['SYSTEM.md', 'INDEX.md', 'README.md', 'CHANGELOG.md']:
-                continue
-            
-            with open(md_file, 'r', encoding='utf-8') as f:
-                post = frontmatter.load(f)
-            
-            if post.get('ship_factor', 0) >= min_ship_factor:
-                if not post.get('deprecated', False):
-                    results.append({
-                        'path': str(md_file.relative_to(self.root)),
-                        'title': post.get('title', 'Untitled'),
-                        'ship_factor': post.get('ship_factor'),
-                        'modified': post.get('modified'),
-                        'category': post.get('category', 'unknown')
-                    })
-        
-        return sorted(results, key=lambda x: x['ship_factor'], reverse=True)
-    
-    def get_by_category(self, category: str) -> List[Dict]:
+        return self.snapshot().high_priority(min_ship_factor)
+    
+    def top_k(self, n: int, category: Optional[str] = None) -> List[Document]:
+        """Get the n highest-priority non-deprecated items, optionally within a category path"""
+        return self.snapshot().top_k(n, category)
+    
+    def get_by_category(self, category: str) -> List[Document]:
         """Get all documents in a specific category"""
-        results = []
-        category_path = self.root / category
-        
-        if not category_path.exists():
-            return results
-        
-        for md_file in category_path.rglob("*.md"):
-            if md_file.name in ['README.md']:
-                continue
-            
-            with open(md_file, 'r', encoding='utf-8') as f:
-                post = frontmatter.load(f)
-            
-            results.append({
-                'path': str(md_file.relative_to(self.root)),
-                'title': post.get('title', 'Untitled'),
-                'ship_factor': post.get('ship_factor', 0),
-                'modified': post.get('modified'),
-                'deprecated': post.get('deprecated', False)
-            })
-        
-        return sorted(results, key=lambda x: x['ship_factor'], reverse=True)
+        return self.snapshot().by_category(category)
+    
+    @profiled('search')
+    def search(self, query: str, limit: int = 10) -> List[SearchHit]:
+        """Full-text BM25 search over document bodies
+        
+        Ranking is boosted by title matches and ship factor; quoted
+        phrases must appear verbatim.
+        """
+        snapshot = self.snapshot()
+        self.catalog.refresh_search()
+        hits = []
+        for result in BrainSearch(self.catalog.conn).search(query, limit):
+            hit = SearchHit.of(snapshot.by_path[result['path']], result['score'])
+            body = hit.content if self.body_cache is None else self._read(hit.path).content
+            hit.snippet = snippet(body, result['position'])
+            hits.append(hit)
+        return hits
+    
+    def iter_documents(self) -> Iterator[Document]:
+        """Yield every knowledge base document in path order"""
+        return self.snapshot().iter_documents()
+    
+    def iter_by_tags(self, tags: List[str]) -> Iterator[Document]:
+        """Yield documents with any of the specified tags, in path order"""
+        return self.snapshot().iter_by_tags(tags)
+    
+    def iter_by_tag_expression(self, expression: str) -> Iterator[Document]:
+        """Yield documents matching a boolean tag expression, in path order"""
+        return self.snapshot().iter_by_tag_expression(expression)
+    
+    def iter_high_priority(self, min_ship_factor: int = 8) -> Iterator[Document]:
+        """Yield high-priority items, highest ship factor first"""
+        return self.snapshot().iter_high_priority(min_ship_factor)
+    
+    def iter_by_category(self, category: str) -> Iterator[Document]:
+        """Yield documents in a category in path order"""
+        return self.snapshot().iter_by_category(category)
+    
+    def iter_mcp_servers(self) -> Iterator[Document]:
+        """Yield MCP server configurations"""
+        return self.iter_by_category("tools/mcp-servers")
+    
+    def iter_commands(self) -> Iterator[Document]:
+        """Yield command-related documents, one subdirectory at a time"""
+        for subdir in ['shortcuts', 'templates', 'macros', 'slash-commands']:
+            yield from self.iter_by_category(f"commands/{subdir}")
+    
+    def iter_infrastructure(self) -> Iterator[Document]:
+        """Yield infrastructure-related documents, one subdirectory at a time"""
+        for subdir in ['servers', 'local', 'databases', 'docker', 'networking']:
+            yield from self.iter_by_category(f"infrastructure/{subdir}")
     
     def get_mcp_servers(self) -> List[Dict]:
         """Get all MCP server configurations"""
@@ -281,77 +424,91 @@ class BrainHelper:
             results.extend(self.get_by_category(f"infrastructure/{subdir}"))
         return results
     
+    def _link_title(self, path: str) -> Optional[str]:
+        """Title of a linked document, or None when it is not in the knowledge base"""
+        entry = self._snapshot.by_path.get(path) if self._snapshot is not None else None
+        return entry.title if entry is not None else None
+    
+    def get_links(self, path: str) -> List[Dict]:
+        """Outgoing links and references of a document, with whether each target exists"""
+        self.snapshot()
+        return [
+            {
+                'target': row['target'], 'kind': row['kind'], 'line': row['line'],
+                'exists': bool(row['found']), 'title': self._link_title(row['target'])
+            }
+            for row in self.catalog.links_from(Path(path).as_posix())
+        ]
+    
+    def get_backlinks(self, path: str) -> List[Dict]:
+        """Documents that link to or reference a document"""
+        self.snapshot()
+        return [
+            {'source': row['source'], 'kind': row['kind'], 'line': row['line'], 'title': self._link_title(row['source'])}
+            for row in self.catalog.links_to(Path(path).as_posix())
+        ]
+    
+    def get_orphans(self) -> List[Document]:
+        """Documents no other document links to or references, in path order"""
+        snapshot = self.snapshot()
+        return [snapshot.by_path[path] for path in self.catalog.orphans()]
+    
     def update_index(self):
-        """Update the INDEX.md file with current content"""
-        stats = self.get_statistics()
-        high_priority = self.get_high_priority()
-        
-        # Read current INDEX.md and update statistics section
-        # (Implementation depends on your specific needs)
+        """Report the maintained index totals after a single-document write"""
+        # Counters are kept current by _apply_changes, so no corpus scan here
+        stats = self.open_catalog().counters()
         print(f"Index updated: {stats['total']} total items")
     
-    def get_statistics(self) -> Dict[str, int]:
-        """Get comprehensive statistics about the knowledge base"""
-        stats = {
-            'total': 0,
-            'knowledge': 0,
-            'prompts': 0,
-            'systems': 0,
-            'tools': 0,
-            'infrastructure': 0,
-            'commands': 0,
-            'instructions': 0,
-            'prompts': 0,
-            'deprecated': 0,
-            'mcp_servers': 0,
-            'high_priority': 0
-        }
-        
-        for md_file in self.root.rglob("*.md"):
-            if md_file.name in ['SYSTEM.md', 'INDEX.md', 'README.md', 'CHANGELOG.md']:
-                continue
-            
-            # Skip files in venv directory
-            if "venv/" in str(md_file):
+    @profiled('pack-snapshot')
+    def pack_snapshot(self) -> Dict[str, int]:
+        """Write the packed snapshot (.brain/snapshot.bin) that scripts can mmap"""
+        from brain_batch import atomic_write
+        from brain_packed import pack, snapshot_path
+
+        # Directory mtimes are taken before the catalog pass, so anything
+        # changed while packing leaves the written snapshot stale
+        path = snapshot_path(self.root)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        directories = []
+        for directory in walk_directories(self.root):
+            relative_path = directory.relative_to(self.root).as_posix()
+            try:
+                directories.append(('' if relative_path == '.' else relative_path, directory.stat().st_mtime_ns))
+            except OSError:
                 continue
-            
-            stats['total'] += 1
-            
-            with open(md_file, 'r', encoding='utf-8') as f:
-                post = frontmatter.load(f)
-            
-            if post.get('deprecated', False):
-                stats['deprecated'] += 1
-            
-            if post.get('ship_factor', 0) >= 8:
-                stats['high_priority'] += 1
-            
-            # Categorize by path
-            relative_path = str(md_file.relative_to(self.root))
-            
-            if relative_path.startswith('knowledge/'):
-                stats['knowledge'] += 1
-            elif relative_path.startswith('prompts/'):
-                stats['prompts'] += 1
-            elif relative_path.startswith('systems/'):
-                stats['systems'] += 1
-            elif relative_path.startswith('tools/'):
-                stats['tools'] += 1
-                if relative_path.startswith('tools/mcp-servers/'):
-                    stats['mcp_servers'] += 1
-            elif relative_path.startswith('infrastructure/'):
-                stats['infrastructure'] += 1
-            elif relative_path.startswith('commands/'):
-                stats['commands'] += 1
-            elif relative_path.startswith('instructions/'):
-                stats['instructions'] += 1
-            elif relative_path.startswith('prompts/'):
-                stats['prompts'] += 1
-        
+
+        snapshot = self.snapshot(refresh=True)
+        priority = (path for _, path in snapshot.priority.iter_at_least(float('-inf')))
+        # The stats the cataloged metadata was read at, so a later edit never matches
+        data = pack(snapshot.iter_documents(), priority, self.open_catalog().file_stats(), directories)
+        atomic_write(path, data)
+        return {'documents': snapshot.statistics()['total'], 'directories': len(directories), 'bytes': len(data)}
+    
+    @profiled('rebuild-index')
+    def rebuild_index(self) -> Dict[str, int]:
+        """Discard the catalog and every maintained index and re-read the corpus"""
+        counts = self.open_catalog().rebuild()
+        self.invalidate_snapshot()
+        return counts
+    
+    def get_statistics(self, category: Optional[str] = None) -> Dict[str, int]:
+        """Get comprehensive statistics about the knowledge base
+
+        Counts are rolled up from the snapshot's path trie: total, deprecated
+        and high priority for the requested directory (the whole knowledge
+        base by default), then a total for each of its subdirectories.
+        """
+        snapshot = self.snapshot()
+        stats = snapshot.statistics(category or '')
+        if not category:
+            stats['mcp_servers'] = snapshot.tree.counts("tools/mcp-servers")['total']
         return stats
     
+    @profiled('report')
     def generate_report(self) -> str:
         """Generate a comprehensive report of the knowledge base"""
+        # Every section below is a view over the same single-pass snapshot
+        self.snapshot()
         stats = self.get_statistics()
         high_priority = self.get_high_priority()
         mcp_servers = self.get_mcp_servers()
@@ -364,14 +521,10 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 
 ## Statistics
 - **Total Documents**: {stats['total']}
-- **Knowledge**: {stats['knowledge']}
-- **Prompts**: {stats['prompts']}
-- **Systems**: {stats['systems']}
-- **Tools**: {stats['tools']} (MCP Servers: {stats['mcp_servers']})
-- **Infrastructure**: {stats['infrastructure']}
-- **Commands**: {stats['commands']}
-- **Instructions**: {stats['instructions']}
-- **Prompts**: {stats['prompts']}
+"""
+        for name, total in self.snapshot().tree.child_counts().items():
+            report += f"- **{name.replace('-', ' ').title()}**: {total}\n"
+        report += f"""- **MCP Servers**: {stats['mcp_servers']}
 - **High Priority**: {stats['high_priority']}
 - **Deprecated**: {stats['deprecated']}
 
@@ -404,8 +557,10 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
         text = text.strip('-')
         return text
 
+    @profiled('sync-index')
     def sync_index(self):
         """Sync INDEX.md with current file structure"""
+        self.ensure_structure()
         index_path = self.root / "INDEX.md"
         
         # Dynamically discover all top-level directories
@@ -414,13 +569,9 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
             if item.is_dir() and not item.name.startswith('.') and item.name not in ['venv', '__pycache__']:
                 categories[item.name.title()] = []
         
-        for md_file in self.root.rglob("*.md"):
+        for md_file in walk_files(self.root, "*.md"):
             if md_file.name in ["README.md", "INDEX.md", "CHANGELOG.md", "SYSTEM.md"]:
                 continue
-            
-            # Skip files in venv directory
-            if "venv/" in str(md_file):
-                continue
                 
             relative_path = md_file.relative_to(self.root)
             path_parts = relative_path.parts
@@ -436,6 +587,10 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
                 
                 categories[category_name].append((relative_path, md_file))
         
+        # Read every title up front so the headers can be parsed in parallel
+        md_files = [md_file for files in categories.values() for _, md_file in files]
+        titles = dict(zip(md_files, parallel_map(file_title, md_files, self.jobs)))
+        
         # Generate INDEX.md content
         content = ["# AI Brain Index", ""]
         content.append("> Auto-generated index of all knowledge base files")
@@ -463,8 +618,7 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
                     subcategories[subcategory] = []
                 
                 # Get title from frontmatter or filename
-                title = self._get_file_title(md_file)
-                subcategories[subcategory].append((title, relative_path))
+                subcategories[subcategory].append((titles[md_file], relative_path))
             
             for subcategory, file_list in sorted(subcategories.items()):
                 content.append(f"### {subcategory}")
@@ -483,100 +637,35 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 
     def _get_file_title(self, md_file: Path) -> str:
         """Get title from frontmatter or generate from filename"""
-        try:
-            with open(md_file, 'r', encoding='utf-8') as f:
-                post = frontmatter.load(f)
-                if 'title' in post.metadata:
-                    return post.metadata['title']
-        except:
-            pass
-        
-        # Fallback to filename
-        return md_file.stem.replace('-', ' ').replace('_', ' ').title()
+        return file_title(md_file)
 
+    @profiled('update-frontmatter')
     def update_frontmatter(self):
         """Update frontmatter in all markdown files"""
         updated_count = 0
+        tasks = []
         
-        for md_file in self.root.rglob("*.md"):
+        for md_file in walk_files(self.root, "*.md"):
             if md_file.name in ["README.md", "INDEX.md", "CHANGELOG.md", "SYSTEM.md"]:
                 continue
             
-            # Skip files in venv directory
-            if "venv/" in str(md_file):
-                continue
-            
-            try:
-                with open(md_file, 'r', encoding='utf-8') as f:
-                    post = frontmatter.load(f)
-                
-                # Check if frontmatter needs updating
-                needs_update = False
-                metadata = post.metadata
-                
-                # Ensure required fields exist
-                if 'title' not in metadata:
-                    metadata['title'] = self._get_file_title(md_file)
-                    needs_update = True
-                
-                if 'type' not in metadata:
-                    # Determine type from path
-                    path_parts = md_file.relative_to(self.root).parts
-                    if path_parts[0] == "knowledge":
-                        metadata['type'] = "knowledge"
-                    elif path_parts[0] == "prompts":
-                        metadata['type'] = "behavior"
-                    elif path_parts[0] == "systems":
-                        metadata['type'] = "system"
-                    elif path_parts[0] == "tools":
-                        metadata['type'] = "tool"
-                    else:
-                        metadata['type'] = "general"
-                    needs_update = True
-                
-                # Get path_parts for subtype check
-                path_parts = md_file.relative_to(self.root).parts
-                if 'subtype' not in metadata and len(path_parts) > 1:
-                    metadata['subtype'] = path_parts[1]
-                    needs_update = True
-                
-                if 'created' not in metadata:
-                    metadata['created'] = datetime.now().isoformat()
-                    needs_update = True
-                
-                if 'modified' not in metadata:
-                    metadata['modified'] = datetime.now().isoformat()
-                    needs_update = True
-                else:
-                    # Update modified date
-                    metadata['modified'] = datetime.now().isoformat()
-                    needs_update = True
-                
-                if 'version' not in metadata:
-                    metadata['version'] = 1
-                    needs_update = True
-                
-                if 'ship_factor' not in metadata:
-                    metadata['ship_factor'] = 5
-                    needs_update = True
-                
-                if 'tags' not in metadata:
-                    metadata['tags'] = []
-                    needs_update = True
-                
-                if needs_update:
-                    post.metadata = metadata
-                    with open(md_file, 'w', encoding='utf-8') as f:
-                        f.write(frontmatter.dumps(post))
-                    updated_count += 1
-                    
-            except Exception as e:
-                print(f"Warning: Could not update {md_file}: {e}")
+            tasks.append((self.root, md_file))
+        
+        for updated, warning in parallel_map(update_file_frontmatter, tasks, self.jobs):
+            if warning:
+                print(warning)
+            elif updated:
+                updated_count += 1
+        
+        if updated_count:
+            self.invalidate_snapshot()
         
         print(f"✅ Updated frontmatter in {updated_count} files")
 
+    @profiled('validate')
     def validate(self):
         """Validate all files and structure"""
+        self.ensure_structure()
         errors = []
         warnings = []
         
@@ -597,44 +686,22 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
                 errors.append(f"Missing required file: {file_name}")
         
         # Validate markdown files
-        for md_file in self.root.rglob("*.md"):
+        tasks = []
+        for md_file in walk_files(self.root, "*.md"):
             if md_file.name in ["README.md", "INDEX.md", "CHANGELOG.md", "SYSTEM.md"]:
                 continue
             
-            # Skip files in venv directory
-            if "venv/" in str(md_file):
-                continue
-            
-            # Skip files in venv directory
-            if "venv/" in str(md_file):
-                continue
-            
-            try:
-                with open(md_file, 'r', encoding='utf-8') as f:
-                    post = frontmatter.load(f)
-                
-                metadata = post.metadata
-                
-                # Check required frontmatter fields
-                required_fields = ['title', 'type', 'created', 'modified', 'version', 'ship_factor']
-                for field in required_fields:
-                    if field not in metadata:
-                        warnings.append(f"{md_file}: Missing {field} in frontmatter")
-                
-                # Validate ship_factor range
-                if 'ship_factor' in metadata:
-                    sf = metadata['ship_factor']
-                    if not isinstance(sf, int) or sf < 1 or sf > 10:
-                        errors.append(f"{md_file}: Invalid ship_factor {sf} (must be 1-10)")
-                
-                # Validate type
-                if 'type' in metadata:
-                    valid_types = ['knowledge', 'behavior', 'system', 'tool', 'general', 'guide']
-                    if metadata['type'] not in valid_types:
-                        warnings.append(f"{md_file}: Unknown type '{metadata['type']}'")
-                
-            except Exception as e:
-                errors.append(f"{md_file}: {str(e)}")
+            tasks.append(md_file)
+        
+        for file_errors, file_warnings in parallel_map(validate_file, tasks, self.jobs):
+            errors.extend(file_errors)
+            warnings.extend(file_warnings)
+        
+        # Link targets are checked against the catalog, not the disk
+        self.sync_snapshot()
+        for link in self.catalog.broken_links():
+            where = f"{self.root / link['source']}:{link['line']}" if link['line'] else f"{self.root / link['source']} (references)"
+            errors.append(f"{where}: Broken {link['kind']} to {link['target']}")
         
         # Report results
         if errors:
@@ -681,18 +748,15 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
         print("✅ All tests passed")
         return True
 
+    @profiled('format')
     def format(self):
         """Format all markdown files"""
         formatted_count = 0
         
-        for md_file in self.root.rglob("*.md"):
+        for md_file in walk_files(self.root, "*.md"):
             if md_file.name in ["README.md", "INDEX.md", "CHANGELOG.md", "SYSTEM.md"]:
                 continue
             
-            # Skip files in venv directory
-            if "venv/" in str(md_file):
-                continue
-            
             try:
                 with open(md_file, 'r', encoding='utf-8') as f:
                     content = f.read()
@@ -728,20 +792,20 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
             except Exception as e:
                 print(f"Warning: Could not format {md_file}: {e}")
         
+        if formatted_count:
+            self.invalidate_snapshot()
+        
         print(f"✅ Formatted {formatted_count} files")
 
+    @profiled('lint')
     def lint(self):
         """Lint all files for issues"""
         issues = []
         
-        for md_file in self.root.rglob("*.md"):
+        for md_file in walk_files(self.root, "*.md"):
             if md_file.name in ["README.md", "INDEX.md", "CHANGELOG.md", "SYSTEM.md"]:
                 continue
             
-            # Skip files in venv directory
-            if "venv/" in str(md_file):
-                continue
-            
             try:
                 with open(md_file, 'r', encoding='utf-8') as f:
                     content = f.read()
@@ -786,6 +850,7 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
             f.write("### Methods\n\n")
             f.write("- `create_document()`: Create a new document\n")
             f.write("- `update_document()`: Update an existing document\n")
+            f.write("- `batch()`: Queue several writes and apply them in one commit\n")
             f.write("- `get_document()`: Retrieve a document\n")
             f.write("- `list_documents()`: List documents by criteria\n")
             f.write("- `sync_index()`: Update INDEX.md\n")
@@ -794,124 +859,8 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
         
         print("✅ Documentation generated in docs/")
 
-# CLI Interface
+
+# CLI Interface (see brain_cli.py; the `brain` script is the quicker entry point)
 if __name__ == "__main__":
-    import argparse
-    
-    parser = argparse.ArgumentParser(description="AI Brain Helper")
-    parser.add_argument('action', choices=[
-        'create', 'read', 'stats', 'high-priority', 'report', 
-        'mcp-servers', 'commands', 'infrastructure', 'by-category',
-        'sync-index', 'update-frontmatter', 'validate', 'test', 
-        'format', 'lint', 'generate-docs'
-    ])
-    parser.add_argument('--title', help='Document title')
-    parser.add_argument('--type', help='Document type')
-    parser.add_argument('--subtype', help='Document subtype')
-    parser.add_argument('--content', help='Document content')
-    parser.add_argument('--tags', nargs='+', help='Tags')
-    parser.add_argument('--ship-factor', type=int, default=5, help='Ship factor (1-10)')
-    parser.add_argument('--path', help='Document path')
-    parser.add_argument('--category', help='Document category')
-    parser.add_argument('--references', nargs='+', help='Reference paths')
-    
-    args = parser.parse_args()
-    
-    brain = BrainHelper()
-    
-    if args.action == 'create':
-        if not all([args.title, args.type, args.subtype, args.content]):
-            print("Error: create requires --title, --type, --subtype, and --content")
-            exit(1)
-        
-        path = brain.create_document(
-            title=args.title,
-            content=args.content,
-            doc_type=args.type,
-            subtype=args.subtype,
-            tags=args.tags,
-            ship_factor=args.ship_factor,
-            references=args.references,
-            category=args.category
-        )
-        print(f"Created: {path}")
-    
-    elif args.action == 'read':
-        if not args.path:
-            print("Error: read requires --path")
-            exit(1)
-        
-        doc = brain.read_document(args.path)
-        print(f"Title: {doc['metadata'].get('title')}")
-        print(f"Ship Factor: {doc['metadata'].get('ship_factor')}")
-        print(f"Category: {doc['metadata'].get('category', 'unknown')}")
-        print(f"\nContent:\n{doc['content']}")
-    
-    elif args.action == 'stats':
-        stats = brain.get_statistics()
-        print("\nKnowledge Base Statistics:")
-        for key, value in stats.items():
-            print(f"  {key}: {value}")
-    
-    elif args.action == 'high-priority':
-        items = brain.get_high_priority()
-        print("\nHigh Priority Items (Ship Factor 8+):")
-        for item in items:
-            print(f"  [{item['ship_factor']}] {item['title']} ({item['category']})")
-            print(f"      Path: {item['path']}")
-    
-    elif args.action == 'report':
-        report = brain.generate_report()
-        print(report)
-    
-    elif args.action == 'mcp-servers':
-        servers = brain.get_mcp_servers()
-        print(f"\nMCP Servers ({len(servers)}):")
-        for server in servers:
-            print(f"  {server['title']} (Ship Factor: {server['ship_factor']})")
-    
-    elif args.action == 'commands':
-        commands = brain.get_commands()
-        print(f"\nCommands ({len(commands)}):")
-        for cmd in commands:
-            print(f"  {cmd['title']} (Ship Factor: {cmd['ship_factor']})")
-    
-    elif args.action == 'infrastructure':
-        infra = brain.get_infrastructure()
-        print(f"\nInfrastructure ({len(infra)}):")
-        for item in infra:
-            print(f"  {item['title']} (Ship Factor: {item['ship_factor']})")
-    
-    elif args.action == 'by-category':
-        if not args.category:
-            print("Error: by-category requires --category")
-            exit(1)
-        
-        items = brain.get_by_category(args.category)
-        print(f"\nItems in {args.category} ({len(items)}):")
-        for item in items:
-            print(f"  {item['title']} (Ship Factor: {item['ship_factor']})")
-    
-    elif args.action == 'sync-index':
-        brain.sync_index()
-    
-    elif args.action == 'update-frontmatter':
-        brain.update_frontmatter()
-    
-    elif args.action == 'validate':
-        success = brain.validate()
-        exit(0 if success else 1)
-    
-    elif args.action == 'test':
-        success = brain.test()
-        exit(0 if success else 1)
-    
-    elif args.action == 'format':
-        brain.format()
-    
-    elif args.action == 'lint':
-        success = brain.lint()
-        exit(0 if success else 1)
-    
-    elif args.action == 'generate-docs':
-        brain.generate_docs()
\ No newline at end of file
+    from brain_cli import main
+    main()
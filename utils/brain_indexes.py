@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+AI Brain In-Memory Indexes
+
+Maintained indexes over the corpus snapshot. Each index supports adding and
+removing a single document so it can be kept current without a rebuild.
+"""
+
+import re
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+
+class TagIndex:
+    """Inverted index from tag to the set of document paths carrying it
+
+    Deprecated documents are also indexed under the reserved term
+    `deprecated`, so expressions like `mcp AND NOT deprecated` work.
+    """
+
+    DEPRECATED_TERM = 'deprecated'
+
+    def __init__(self):
+        self.postings: Dict[str, Set[str]] = {}
+        self.doc_terms: Dict[str, tuple] = {}
+        self._sorted_terms: List[str] = None
+
+    def add(self, path: str, tags: Iterable[str], deprecated: bool = False):
+        """Index a document, replacing any previous entry for its path"""
+        self.remove(path)
+        terms = set(tags)
+        if deprecated:
+            terms.add(self.DEPRECATED_TERM)
+
+        for term in terms:
+            if term not in self.postings:
+                self.postings[term] = set()
+                self._sorted_terms = None
+            self.postings[term].add(path)
+        self.doc_terms[path] = tuple(terms)
+
+    def remove(self, path: str):
+        """Drop a document from every posting list"""
+        for term in self.doc_terms.pop(path, ()):
+            paths = self.postings.get(term)
+            if paths is None:
+                continue
+            paths.discard(path)
+            if not paths:
+                del self.postings[term]
+                self._sorted_terms = None
+
+    @property
+    def all_paths(self) -> Set[str]:
+        """Every indexed document (the universe for NOT)"""
+        return set(self.doc_terms)
+
+    def lookup(self, tag: str) -> Set[str]:
+        """Documents carrying exactly this tag"""
+        return set(self.postings.get(tag, ()))
+
+    def lookup_prefix(self, prefix: str) -> Set[str]:
+        """Documents carrying any tag that starts with prefix"""
+        if self._sorted_terms is None:
+            self._sorted_terms = sorted(self.postings)
+
+        results: Set[str] = set()
+        for i in range(bisect_left(self._sorted_terms, prefix), len(self._sorted_terms)):
+            term = self._sorted_terms[i]
+            if not term.startswith(prefix):
+                break
+            results |= self.postings[term]
+        return results
+
+    def any_of(self, tags: Iterable[str]) -> Set[str]:
+        """Documents carrying at least one of the tags (OR)"""
+        results: Set[str] = set()
+        for tag in tags:
+            results |= self.postings.get(tag, set())
+        return results
+
+    def query(self, expression: str) -> Set[str]:
+        """Evaluate a boolean tag expression
+
+        Supports AND, OR, NOT (case-insensitive), parentheses, `prefix*`
+        wildcards and double-quoted tags. Adjacent terms are ANDed.
+        """
+        return TagExpression(expression).evaluate(self)
+
+
+class PriorityIndex:
+    """Non-deprecated documents bucketed by ship factor
+
+    Each bucket is kept sorted by `modified`, so documents come out highest
+    ship factor first with the most recently modified breaking ties.
+    """
+
+    def __init__(self):
+        self.buckets: Dict[int, List[Tuple[str, str]]] = {}
+        self.keys: Dict[str, Tuple[int, Tuple[str, str]]] = {}
+
+    def add(self, path: str, ship_factor: Optional[int], modified: Optional[str], deprecated: bool = False):
+        """Index a document, replacing any previous entry for its path"""
+        self.remove(path)
+        if deprecated:
+            return
+
+        # Documents without a ship factor rank as 0, like the old scans did
+        ship_factor = ship_factor or 0
+        key = (modified or '', path)
+        insort(self.buckets.setdefault(ship_factor, []), key)
+        self.keys[path] = (ship_factor, key)
+
+    def remove(self, path: str):
+        """Drop a document from its bucket"""
+        previous = self.keys.pop(path, None)
+        if previous is None:
+            return
+
+        ship_factor, key = previous
+        bucket = self.buckets[ship_factor]
+        del bucket[bisect_left(bucket, key)]
+        if not bucket:
+            del self.buckets[ship_factor]
+
+    def iter_at_least(self, min_ship_factor: int) -> Iterator[Tuple[int, str]]:
+        """Yield (ship_factor, path) in priority order down to a threshold"""
+        for ship_factor in sorted(self.buckets, reverse=True):
+            if ship_factor < min_ship_factor:
+                return
+            for _, path in reversed(self.buckets[ship_factor]):
+                yield ship_factor, path
+
+    def at_least(self, min_ship_factor: int) -> List[str]:
+        """Paths at or above a ship factor, in priority order"""
+        return [path for _, path in self.iter_at_least(min_ship_factor)]
+
+    def top_k(self, n: int, prefix: Optional[str] = None) -> List[str]:
+        """The n highest-priority paths, optionally below a directory prefix"""
+        if prefix is not None:
+            prefix = prefix.strip('/') + '/'
+
+        results = []
+        for _, path in self.iter_at_least(float('-inf')):
+            if len(results) >= n:
+                break
+            if prefix is None or path.startswith(prefix):
+                results.append(path)
+        return results
+
+
+class TrieNode:
+    """One directory in the path trie, with rolled-up counters"""
+
+    __slots__ = ('children', 'files', 'total', 'deprecated', 'high_priority')
+
+    def __init__(self):
+        self.children: Dict[str, 'TrieNode'] = {}
+        self.files: Dict[str, str] = {}
+        self.total = 0
+        self.deprecated = 0
+        self.high_priority = 0
+
+    def counts(self) -> Dict[str, int]:
+        """Aggregate counters for this subtree"""
+        return {
+            'total': self.total,
+            'deprecated': self.deprecated,
+            'high_priority': self.high_priority
+        }
+
+
+class PathTrie:
+    """Directory trie of documents with per-node aggregate counters
+
+    Counts for any directory are O(depth); listing a directory is
+    O(subtree size).
+    """
+
+    HIGH_PRIORITY = 8
+
+    def __init__(self):
+        self.root = TrieNode()
+        self.flags: Dict[str, Tuple[bool, bool]] = {}
+
+    @staticmethod
+    def _parts(path: str) -> List[str]:
+        return [part for part in path.strip('/').split('/') if part]
+
+    def node(self, prefix: str = '') -> Optional[TrieNode]:
+        """Return the node for a directory prefix, or None if it holds no documents"""
+        node = self.root
+        for part in self._parts(prefix):
+            node = node.children.get(part)
+            if node is None:
+                return None
+        return node
+
+    def add(self, path: str, ship_factor: Optional[int], deprecated: bool = False):
+        """Insert a document, replacing any previous entry for its path"""
+        self.remove(path)
+        flags = (bool(deprecated), (ship_factor or 0) >= self.HIGH_PRIORITY)
+        *directories, name = self._parts(path)
+
+        node = self._bump(self.root, flags, 1)
+        for part in directories:
+            node = self._bump(node.children.setdefault(part, TrieNode()), flags, 1)
+        node.files[name] = path
+        self.flags[path] = flags
+
+    def remove(self, path: str):
+        """Drop a document and prune directories left empty"""
+        flags = self.flags.pop(path, None)
+        if flags is None:
+            return
+        *directories, name = self._parts(path)
+
+        trail = [self._bump(self.root, flags, -1)]
+        for part in directories:
+            trail.append(self._bump(trail[-1].children[part], flags, -1))
+        del trail[-1].files[name]
+
+        for parent, part, child in reversed(list(zip(trail, directories, trail[1:]))):
+            if child.total == 0:
+                del parent.children[part]
+
+    @staticmethod
+    def _bump(node: TrieNode, flags: Tuple[bool, bool], delta: int) -> TrieNode:
+        deprecated, high_priority = flags
+        node.total += delta
+        node.deprecated += delta if deprecated else 0
+        node.high_priority += delta if high_priority else 0
+        return node
+
+    def iter_paths(self, prefix: str = '') -> Iterator[str]:
+        """Yield every document path below a prefix, depth-first in name order"""
+        node = self.node(prefix)
+        if node is None:
+            return
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            for name in sorted(current.files):
+                yield current.files[name]
+            stack.extend(current.children[name] for name in sorted(current.children, reverse=True))
+
+    def counts(self, prefix: str = '') -> Dict[str, int]:
+        """Aggregate counters for a prefix (zeros when it holds no documents)"""
+        node = self.node(prefix)
+        return node.counts() if node else TrieNode().counts()
+
+    def child_counts(self, prefix: str = '') -> Dict[str, int]:
+        """Document totals for each immediate subdirectory of a prefix"""
+        node = self.node(prefix)
+        if node is None:
+            return {}
+        return {name: node.children[name].total for name in sorted(node.children)}
+
+
+class TagExpression:
+    """Recursive-descent parser and evaluator for tag expressions"""
+
+    TOKEN = re.compile(r'\(|\)|"[^"]*"|[^\s()]+')
+    OPERATORS = ('AND', 'OR', 'NOT')
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        self.tokens = self.TOKEN.findall(expression)
+        if not self.tokens:
+            raise ValueError("Empty tag expression")
+
+    def evaluate(self, index: TagIndex) -> Set[str]:
+        """Parse and evaluate against an index"""
+        self.index = index
+        self.position = 0
+        result = self._or()
+        if self.position != len(self.tokens):
+            raise ValueError(f"Unexpected '{self.tokens[self.position]}' in tag expression: {self.expression}")
+        return result
+
+    def _peek(self) -> str:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def _is(self, token: str, operator: str) -> bool:
+        return token is not None and token.upper() == operator
+
+    def _or(self) -> Set[str]:
+        result = self._and()
+        while self._is(self._peek(), 'OR'):
+            self.position += 1
+            result = result | self._and()
+        return result
+
+    def _and(self) -> Set[str]:
+        result = self._not()
+        while True:
+            token = self._peek()
+            if self._is(token, 'AND'):
+                self.position += 1
+            elif token is None or token == ')' or self._is(token, 'OR'):
+                return result
+            result = result & self._not()
+
+    def _not(self) -> Set[str]:
+        if self._is(self._peek(), 'NOT'):
+            self.position += 1
+            return self.index.all_paths - self._not()
+        return self._atom()
+
+    def _atom(self) -> Set[str]:
+        token = self._peek()
+        if token is None:
+            raise ValueError(f"Tag expression ends unexpectedly: {self.expression}")
+        self.position += 1
+
+        if token == '(':
+            result = self._or()
+            if self._peek() != ')':
+                raise ValueError(f"Missing ')' in tag expression: {self.expression}")
+            self.position += 1
+            return result
+        if token == ')' or token.upper() in self.OPERATORS:
+            raise ValueError(f"Unexpected '{token}' in tag expression: {self.expression}")
+
+        if token.startswith('"'):
+            return self.index.lookup(token[1:-1])
+        if token.endswith('*'):
+            return self.index.lookup_prefix(token[:-1])
+        return self.index.lookup(token)
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+AI Brain Link Graph
+
+Extracts the internal links of a document: relative markdown links in the
+body (inline `[text](path)` and reference definitions `[label]: path`) and
+the paths listed in its `references` frontmatter. Targets are stored in the
+catalog as root-relative paths next to the other per-file rows, so outgoing
+links, backlinks, orphans and broken links are all answered from indexed
+queries without reading any file.
+
+Markdown links resolve against the linking document's directory (or the
+root with a leading `/`); `references` entries are root-relative unless
+they start with `./` or `../`. URLs, in-page anchors, images and links in
+code are skipped.
+"""
+
+import posixpath
+import re
+import sqlite3
+from typing import Any, List, Optional, Tuple
+from urllib.parse import unquote
+
+
+INLINE_LINK = re.compile(r'(?<!!)\[[^\]]*\]\(\s*<?([^)\s>]+)>?(?:\s+["\'(][^)]*)?\)')
+DEFINITION = re.compile(r'^ {0,3}\[[^\]]+\]:\s*<?([^\s>]+)>?')
+CODE_SPAN = re.compile(r'`[^`]*`')
+FENCE = re.compile(r'^ {0,3}(```|~~~)')
+SCHEME = re.compile(r'^[A-Za-z][A-Za-z0-9+.-]*:')
+
+# (target, kind, line): kind is 'link' or 'reference', line is 0 for references
+Link = Tuple[str, str, int]
+
+
+def resolve(source: str, target: str, relative_to_root: bool = False) -> Optional[str]:
+    """Root-relative path of a link target, or None for URLs and anchors"""
+    target = target.split('#', 1)[0].split('?', 1)[0]
+    if not target or SCHEME.match(target):
+        return None
+    target = unquote(target)
+    if target.startswith('/'):
+        path = target.lstrip('/')
+    elif relative_to_root and not target.startswith(('./', '../')):
+        path = target
+    else:
+        path = posixpath.join(posixpath.dirname(source), target)
+    # Paths that climb above the root keep their leading '..' and never match a document
+    path = posixpath.normpath(path)
+    return None if path == '.' else path
+
+
+def extract_links(source: str, body: str, first_line: int = 1) -> List[Link]:
+    """Internal links in a document body; `first_line` is the body's line number in the file"""
+    if '](' not in body and ']:' not in body:
+        return []
+
+    links = []
+    fence = None
+    for number, line in enumerate(body.split('\n'), first_line):
+        marker = FENCE.match(line)
+        if marker:
+            if fence is None:
+                fence = marker.group(1)
+            elif marker.group(1) == fence:
+                fence = None
+            continue
+        if fence is not None or ']' not in line:
+            continue
+
+        line = CODE_SPAN.sub('', line)
+        targets = INLINE_LINK.findall(line)
+        definition = DEFINITION.match(line)
+        if definition:
+            targets.append(definition.group(1))
+        for target in targets:
+            path = resolve(source, target)
+            if path is not None:
+                links.append((path, 'link', number))
+    return links
+
+
+def extract_references(source: str, metadata: dict) -> List[Link]:
+    """Paths listed in the `references` frontmatter field"""
+    references: Any = metadata.get('references')
+    if isinstance(references, str):
+        references = [references]
+    if not isinstance(references, list):
+        return []
+
+    links = []
+    for reference in references:
+        if isinstance(reference, str):
+            path = resolve(source, reference.strip(), relative_to_root=True)
+            if path is not None:
+                links.append((path, 'reference', 0))
+    return links
+
+
+def write_links(conn: sqlite3.Connection, path: str, links: List[Link]):
+    """Replace one document's outgoing links (the caller commits)"""
+    conn.execute("DELETE FROM links WHERE source = ?", (path,))
+    conn.executemany(
+        "INSERT INTO links (source, target, kind, line) VALUES (?, ?, ?, ?)",
+        [(path, target, kind, line) for target, kind, line in links]
+    )
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+AI Brain Metrics
+
+Counters, gauges and histograms for the long-running processes (the
+context monitor's watch loop and the query daemon) and for each run of the
+integrated updater, exported in the Prometheus text format (version 0.0.4)
+without any third-party package.
+
+Export is opt-in. `--metrics-port PORT` serves the metrics at
+http://127.0.0.1:PORT/metrics from a background thread, and
+`--metrics-textfile FILE` writes them every `--metrics-interval` seconds
+(and once more on exit) for node_exporter's textfile collector. The file is
+replaced atomically, so the collector never reads a partial file.
+"""
+
+import math
+import os
+import threading
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+# Prometheus' default buckets, suited to durations in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Seconds between textfile writes
+TEXTFILE_INTERVAL = 15.0
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, str]) -> Labels:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ''
+    escaped = (
+        f'{name}="' + value.replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"') + '"'
+        for name, value in labels
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, bool):
+        return str(int(value))
+    if isinstance(value, int):
+        return str(value)
+    if math.isnan(value):
+        return 'NaN'
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value))
+
+
+class Metric:
+    """One metric family: a name, help text and a value per label set
+
+    With `function`, the unlabelled value is read from it at export time
+    instead (for totals other code already keeps, such as cache hits).
+    """
+
+    kind = 'untyped'
+
+    def __init__(self, registry: 'Registry', name: str, help: str, function: Optional[Callable[[], float]] = None):
+        self.registry = registry
+        self.name = name
+        self.help = help
+        self.function = function
+        self.values: Dict[Labels, float] = {}
+
+    def samples(self) -> Iterator[Tuple[str, Labels, float]]:
+        if self.function is not None:
+            yield self.name, (), self.function()
+        for labels, value in sorted(self.values.items()):
+            yield self.name, labels, value
+
+
+class Counter(Metric):
+    """A total that only goes up (or resets when the process restarts)"""
+
+    kind = 'counter'
+
+    def __init__(self, registry: 'Registry', name: str, help: str, function: Optional[Callable[[], float]] = None):
+        super().__init__(registry, name, help, function)
+        if function is None:
+            # Exported as 0 before the first increment, so rate() has a starting point
+            self.values[()] = 0
+
+    def inc(self, amount: float = 1, **labels: str):
+        key = _labels(labels)
+        with self.registry.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    """A value that goes up and down"""
+
+    kind = 'gauge'
+
+    def set(self, value: float, **labels: str):
+        with self.registry.lock:
+            self.values[_labels(labels)] = value
+
+    def inc(self, amount: float = 1, **labels: str):
+        key = _labels(labels)
+        with self.registry.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+
+class Histogram(Metric):
+    """Observations counted into cumulative buckets, with their sum and count"""
+
+    kind = 'histogram'
+
+    def __init__(self, registry: 'Registry', name: str, help: str, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(registry, name, help)
+        self.buckets = tuple(sorted(buckets))
+        self.series: Dict[Labels, List[float]] = {}
+
+    def observe(self, value: float, **labels: str):
+        key = _labels(labels)
+        with self.registry.lock:
+            # Per-bucket counts, then the +Inf count and the sum
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+                    break
+            else:
+                series[len(self.buckets)] += 1
+            series[-1] += value
+
+    def samples(self) -> Iterator[Tuple[str, Labels, float]]:
+        for labels, series in sorted(self.series.items()):
+            total = 0
+            for bound, count in zip(self.buckets + (math.inf,), series):
+                total += count
+                yield f'{self.name}_bucket', labels + (('le', _format_value(float(bound))),), total
+            yield f'{self.name}_sum', labels, series[-1]
+            yield f'{self.name}_count', labels, total
+
+
+class Registry:
+    """The metrics one process exports"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.metrics: Dict[str, Metric] = {}
+
+    def _add(self, metric: Metric) -> Metric:
+        if metric.name in self.metrics:
+            raise ValueError(f"Duplicate metric: {metric.name}")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, function: Optional[Callable[[], float]] = None) -> Counter:
+        return self._add(Counter(self, name, help, function))
+
+    def gauge(self, name: str, help: str, function: Optional[Callable[[], float]] = None) -> Gauge:
+        return self._add(Gauge(self, name, help, function))
+
+    def histogram(self, name: str, help: str, buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._add(Histogram(self, name, help, buckets))
+
+    def exposition(self) -> str:
+        """Every metric in the Prometheus text format"""
+        lines = []
+        with self.lock:
+            for metric in self.metrics.values():
+                lines.append(f'# HELP {metric.name} ' + metric.help.replace('\\', r'\\').replace('\n', r'\n'))
+                lines.append(f'# TYPE {metric.name} {metric.kind}')
+                for name, labels, value in metric.samples():
+                    lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+def write_textfile(registry: Registry, path) -> None:
+    """Write the metrics to a file, replacing it atomically"""
+    path = os.fspath(path)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # The collector only reads *.prom files, so the temporary name is skipped
+    temporary = f'{path}.{os.getpid()}.tmp'
+    with open(temporary, 'w', encoding='utf-8') as f:
+        f.write(registry.exposition())
+    os.replace(temporary, path)
+
+
+def serve_http(registry: Registry, port: int, host: str = '127.0.0.1'):
+    """Serve the metrics at /metrics from a daemon thread; returns the server"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?', 1)[0] not in ('/', '/metrics'):
+                self.send_error(404)
+                return
+            body = registry.exposition().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='brain-metrics-http', daemon=True).start()
+    return server
+
+
+class MetricsExporter:
+    """Serves and/or periodically writes a registry until closed"""
+
+    def __init__(self, registry: Registry, port: Optional[int] = None, textfile: Optional[str] = None,
+                 interval: float = TEXTFILE_INTERVAL):
+        self.registry = registry
+        self.port = port
+        self.textfile = textfile
+        self.interval = interval
+        self.server = None
+        self.stopped = threading.Event()
+        self.writer = None
+
+    def start(self) -> 'MetricsExporter':
+        if self.port is not None:
+            self.server = serve_http(self.registry, self.port)
+            print(f"📈 Metrics on http://127.0.0.1:{self.server.server_address[1]}/metrics")
+        if self.textfile:
+            self.write()
+            self.writer = threading.Thread(target=self._write_periodically, name='brain-metrics-textfile', daemon=True)
+            self.writer.start()
+            print(f"📈 Writing metrics to {self.textfile} every {self.interval:g}s")
+        return self
+
+    def write(self):
+        try:
+            write_textfile(self.registry, self.textfile)
+        except OSError as e:
+            print(f"⚠️  Could not write metrics to {self.textfile}: {e}")
+
+    def _write_periodically(self):
+        while not self.stopped.wait(self.interval):
+            self.write()
+
+    def close(self):
+        """Stop serving and write the textfile one last time"""
+        self.stopped.set()
+        if self.writer is not None:
+            self.writer.join()
+            self.write()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+
+    def __enter__(self) -> 'MetricsExporter':
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+def add_metrics_arguments(parser):
+    """The metrics export options for a long-running command"""
+    parser.add_argument('--metrics-port', type=int, metavar='PORT',
+                        help='Serve Prometheus metrics at http://127.0.0.1:PORT/metrics')
+    parser.add_argument('--metrics-textfile', metavar='FILE',
+                        help='Write Prometheus metrics to FILE (for the node_exporter textfile collector)')
+    parser.add_argument('--metrics-interval', type=float, default=TEXTFILE_INTERVAL, metavar='SECONDS',
+                        help=f'Seconds between metrics textfile writes (default: {TEXTFILE_INTERVAL:g})')
+
+
+def exporter(registry: Registry, args) -> MetricsExporter:
+    """An exporter for the parsed metrics options (does nothing when none were given)"""
+    return MetricsExporter(registry, args.metrics_port, args.metrics_textfile, args.metrics_interval)
@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+AI Brain Packed Snapshot
+
+Versioned binary copy of the corpus snapshot that any process can `mmap`
+and query without parsing YAML, JSON or SQLite. The file holds a string
+table, fixed-width metadata columns ordered by path, sorted tag terms with
+offsets into a postings array of document numbers, the priority order, the
+mtime and size of every document as cataloged, and the mtime of every
+directory walked when it was written.
+
+A snapshot is fresh while every document keeps its mtime and size and every
+recorded directory keeps its mtime. The per-file check catches edits that
+rewrite a file in place; the directory check catches documents added,
+removed or renamed. Both are a stat per entry, with no parsing.
+`load_snapshot()` rebuilds a stale or missing snapshot before mapping it.
+"""
+
+import mmap
+import os
+import struct
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from brain_document import Document
+
+
+PACKED_DIR = ".brain"
+PACKED_FILE = "snapshot.bin"
+
+MAGIC = b'BRAINPAK'
+FORMAT_VERSION = 2
+
+# Read back as a different number when the file was written on a host with
+# the other byte order; such a file is treated as stale and rewritten
+BYTE_ORDER_MARK = 0x01020304
+
+# Sections in file order, with the array typecode of their items
+SECTIONS = (
+    ('string_offsets', 'I'),    # start of each string in `strings`, plus the end
+    ('strings', 'B'),           # UTF-8 text of every distinct string
+    ('path', 'I'),              # one entry per document, in path order
+    ('title', 'I'),
+    ('type', 'I'),
+    ('subtype', 'I'),
+    ('category', 'I'),
+    ('created', 'I'),
+    ('modified', 'I'),
+    ('ship_factor', 'i'),
+    ('version', 'i'),
+    ('flags', 'B'),
+    ('mtimes', 'q'),            # st_mtime_ns and st_size of each document's file
+    ('sizes', 'q'),
+    ('tag_offsets', 'I'),       # start of each document's tags in `doc_tags`, plus the end
+    ('doc_tags', 'I'),          # string numbers of each document's tags
+    ('terms', 'I'),             # string numbers of tag terms, sorted
+    ('term_offsets', 'I'),      # start of each term's documents in `postings`, plus the end
+    ('postings', 'I'),          # document numbers, ascending within a term
+    ('priority', 'I'),          # non-deprecated documents in PriorityIndex order
+    ('directories', 'I'),       # string numbers of walked directories ('' is the root)
+    ('directory_mtimes', 'q'),
+)
+
+HEADER = struct.Struct('=8sII' + 'QQ' * len(SECTIONS))
+
+NO_STRING = 0xFFFFFFFF
+NO_INT = -2 ** 31
+DEPRECATED = 1
+HIGH_PRIORITY = 8
+
+
+def snapshot_path(root=".") -> Path:
+    """Where the packed snapshot for a tree lives"""
+    return Path(root) / PACKED_DIR / PACKED_FILE
+
+
+def pack(documents: Iterable[Document], priority: Iterable[str], files: Dict[str, Tuple[int, int]],
+         directories: List[Tuple[str, int]]) -> bytes:
+    """Serialize documents (in path order), the priority order, file (mtime_ns, size) and directory mtimes"""
+    strings: Dict[str, int] = {}
+
+    def string(value: Optional[str]) -> int:
+        if value is None:
+            return NO_STRING
+        number = strings.get(value)
+        if number is None:
+            number = strings[value] = len(strings)
+        return number
+
+    def integer(value: Optional[int]) -> int:
+        return NO_INT if value is None or not NO_INT < value < 2 ** 31 else value
+
+    columns = {name: array(typecode) for name, typecode in SECTIONS}
+    numbers: Dict[str, int] = {}
+    postings: Dict[str, List[int]] = {}
+    columns['tag_offsets'].append(0)
+
+    for number, document in enumerate(documents):
+        numbers[document.path] = number
+        for name in ('path', 'title', 'type', 'subtype', 'category', 'created', 'modified'):
+            columns[name].append(string(getattr(document, name)))
+        columns['ship_factor'].append(integer(document.ship_factor))
+        columns['version'].append(integer(document.version))
+        columns['flags'].append(DEPRECATED if document.deprecated else 0)
+        # A document without a recorded stat never matches, so it reads as stale
+        mtime_ns, size = files.get(document.path, (-1, -1))
+        columns['mtimes'].append(mtime_ns)
+        columns['sizes'].append(size)
+
+        columns['doc_tags'].extend(string(tag) for tag in document.tags)
+        columns['tag_offsets'].append(len(columns['doc_tags']))
+
+        # Same terms as TagIndex, including the reserved `deprecated` term
+        terms = set(document.tags)
+        if document.deprecated:
+            terms.add('deprecated')
+        for term in terms:
+            postings.setdefault(term, []).append(number)
+
+    columns['term_offsets'].append(0)
+    for term in sorted(postings):
+        columns['terms'].append(string(term))
+        columns['postings'].extend(postings[term])
+        columns['term_offsets'].append(len(columns['postings']))
+
+    columns['priority'].extend(numbers[path] for path in priority)
+
+    for directory, mtime_ns in directories:
+        columns['directories'].append(string(directory))
+        columns['directory_mtimes'].append(mtime_ns)
+
+    offset = 0
+    columns['string_offsets'].append(0)
+    for value in strings:
+        encoded = value.encode('utf-8')
+        columns['strings'].frombytes(encoded)
+        offset += len(encoded)
+        columns['string_offsets'].append(offset)
+
+    # Lay sections out after the header, each aligned to 8 bytes
+    body = bytearray()
+    table = []
+    for name, _ in SECTIONS:
+        body.extend(b'\0' * (-(HEADER.size + len(body)) % 8))
+        data = columns[name].tobytes()
+        table.extend((HEADER.size + len(body), len(data)))
+        body.extend(data)
+
+    return HEADER.pack(MAGIC, FORMAT_VERSION, BYTE_ORDER_MARK, *table) + bytes(body)
+
+
+class PackedSnapshot:
+    """Read-only, memory-mapped view of a packed snapshot
+
+    Document numbers follow path order. Queries return `Document` records
+    built from the mapped columns; nothing else is decoded.
+    """
+
+    def __init__(self, root=".", path=None):
+        self.root = Path(root)
+        self.path = Path(path) if path else snapshot_path(root)
+        with open(self.path, 'rb') as f:
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self.buffer) < HEADER.size:
+            self.buffer.close()
+            raise ValueError(f"Truncated packed snapshot: {self.path}")
+        magic, version, byte_order, *table = HEADER.unpack_from(self.buffer)
+        if magic != MAGIC or version != FORMAT_VERSION or byte_order != BYTE_ORDER_MARK:
+            self.buffer.close()
+            raise ValueError(f"Incompatible packed snapshot: {self.path}")
+
+        view = memoryview(self.buffer)
+        self.columns = {}
+        for index, (name, typecode) in enumerate(SECTIONS):
+            offset, length = table[2 * index], table[2 * index + 1]
+            self.columns[name] = view[offset:offset + length].cast(typecode)
+        view.release()
+
+    def __enter__(self) -> 'PackedSnapshot':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def close(self):
+        """Release the mapping"""
+        for column in self.columns.values():
+            column.release()
+        self.columns = {}
+        self.buffer.close()
+
+    def __len__(self) -> int:
+        return len(self.columns['path'])
+
+    # Decoding
+
+    def string(self, number: int) -> Optional[str]:
+        """Text of a string-table entry"""
+        if number == NO_STRING:
+            return None
+        offsets = self.columns['string_offsets']
+        return str(self.columns['strings'][offsets[number]:offsets[number + 1]], 'utf-8')
+
+    def integer(self, column: str, number: int) -> Optional[int]:
+        value = self.columns[column][number]
+        return None if value == NO_INT else value
+
+    def path_of(self, number: int) -> str:
+        return self.string(self.columns['path'][number])
+
+    def document(self, number: int) -> Document:
+        """Build the record for one document number"""
+        columns = self.columns
+        text = self.string
+        tags = columns['doc_tags'][columns['tag_offsets'][number]:columns['tag_offsets'][number + 1]]
+        return Document(
+            self.root, text(columns['path'][number]),
+            title=text(columns['title'][number]),
+            type=text(columns['type'][number]),
+            subtype=text(columns['subtype'][number]),
+            category=text(columns['category'][number]),
+            tags=tuple(text(tag) for tag in tags),
+            ship_factor=self.integer('ship_factor', number),
+            deprecated=bool(columns['flags'][number] & DEPRECATED),
+            created=text(columns['created'][number]),
+            modified=text(columns['modified'][number]),
+            version=self.integer('version', number)
+        )
+
+    def _bisect(self, count: int, key, target: str) -> int:
+        """First position in [0, count) whose key is not below target"""
+        low, high = 0, count
+        while low < high:
+            middle = (low + high) // 2
+            if key(middle) < target:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    # Freshness
+
+    def is_fresh(self) -> bool:
+        """True while every document keeps its mtime and size and every directory its mtime"""
+        mtimes = self.columns['mtimes']
+        sizes = self.columns['sizes']
+        for number in range(len(self)):
+            try:
+                stat = os.stat(self.root / self.path_of(number))
+            except OSError:
+                return False
+            if stat.st_mtime_ns != mtimes[number] or stat.st_size != sizes[number]:
+                return False
+
+        directories = self.columns['directories']
+        mtimes = self.columns['directory_mtimes']
+        for index in range(len(directories)):
+            try:
+                mtime_ns = os.stat(self.root / self.string(directories[index])).st_mtime_ns
+            except OSError:
+                return False
+            if mtime_ns != mtimes[index]:
+                return False
+        return True
+
+    # Queries
+
+    def iter_documents(self) -> Iterator[Document]:
+        """Yield every document in path order"""
+        return (self.document(number) for number in range(len(self)))
+
+    def get(self, path: str) -> Optional[Document]:
+        """The document at a path, found by binary search"""
+        number = self._bisect(len(self), self.path_of, path)
+        if number < len(self) and self.path_of(number) == path:
+            return self.document(number)
+        return None
+
+    def tag_numbers(self, tag: str) -> memoryview:
+        """Document numbers carrying a tag (a slice of the postings array)"""
+        terms = self.columns['terms']
+        position = self._bisect(len(terms), lambda index: self.string(terms[index]), tag)
+        if position == len(terms) or self.string(terms[position]) != tag:
+            return self.columns['postings'][0:0]
+        offsets = self.columns['term_offsets']
+        return self.columns['postings'][offsets[position]:offsets[position + 1]]
+
+    def iter_by_tags(self, tags: List[str]) -> Iterator[Document]:
+        """Documents carrying any of the given tags, in path order"""
+        numbers = set()
+        for tag in tags:
+            numbers.update(self.tag_numbers(tag))
+        return (self.document(number) for number in sorted(numbers))
+
+    def iter_high_priority(self, min_ship_factor: int = HIGH_PRIORITY) -> Iterator[Document]:
+        """Non-deprecated documents at or above a ship factor, in priority order"""
+        for number in self.columns['priority']:
+            if (self.integer('ship_factor', number) or 0) < min_ship_factor:
+                return
+            yield self.document(number)
+
+    def category_range(self, category: str) -> range:
+        """Document numbers below a directory (a contiguous run in path order)"""
+        prefix = category.strip('/')
+        if not prefix:
+            return range(len(self))
+        prefix += '/'
+        start = self._bisect(len(self), self.path_of, prefix)
+        # '0' sorts right after '/', so this is the first path past the prefix
+        end = self._bisect(len(self), self.path_of, prefix[:-1] + '0')
+        return range(start, end)
+
+    def iter_by_category(self, category: str) -> Iterator[Document]:
+        """Documents below a category directory, in path order"""
+        return (self.document(number) for number in self.category_range(category))
+
+    def statistics(self, prefix: str = '') -> Dict[str, int]:
+        """Same rolled-up counters as CorpusSnapshot.statistics, read from the columns"""
+        ship_factors = self.columns['ship_factor']
+        flags = self.columns['flags']
+        depth = len([part for part in prefix.split('/') if part])
+        stats = {'total': 0, 'deprecated': 0, 'high_priority': 0}
+        children: Dict[str, int] = {}
+
+        for number in self.category_range(prefix):
+            stats['total'] += 1
+            stats['deprecated'] += flags[number] & DEPRECATED
+            stats['high_priority'] += ship_factors[number] >= HIGH_PRIORITY
+            parts = self.path_of(number).split('/')
+            if len(parts) > depth + 1:
+                children[parts[depth]] = children.get(parts[depth], 0) + 1
+
+        for name in sorted(children):
+            stats.setdefault(name, children[name])
+        return stats
+
+
+def load_snapshot(root=".", rebuild: bool = True) -> Optional[PackedSnapshot]:
+    """Map the packed snapshot for a tree, rebuilding it first if it is missing or stale
+
+    With rebuild=False a missing or stale snapshot gives None instead.
+    """
+    snapshot = None
+    try:
+        snapshot = PackedSnapshot(root)
+    except (OSError, ValueError):
+        pass
+    if snapshot is not None:
+        if snapshot.is_fresh():
+            return snapshot
+        snapshot.close()
+    if not rebuild:
+        return None
+
+    from brain_helper import BrainHelper
+    BrainHelper(str(root)).pack_snapshot()
+    return PackedSnapshot(root)
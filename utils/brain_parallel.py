@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+AI Brain Parallel Helpers
+
+Shards full-corpus passes across a process pool. Results always come back
+in input order, so callers merge them exactly as a serial loop would.
+"""
+
+import os
+from typing import Callable, Iterable, Iterator, Any
+
+
+# Below this many items a pool costs more to start than it saves
+MIN_PARALLEL_ITEMS = 64
+
+# Upper bound on items per task, which also bounds results held in memory
+MAX_CHUNKSIZE = 256
+
+
+def resolve_jobs(jobs: int) -> int:
+    """Normalize a --jobs value (0 or less means one per CPU)"""
+    if jobs is None:
+        return 1
+    if jobs <= 0:
+        return os.cpu_count() or 1
+    return jobs
+
+
+def parallel_map(func: Callable[[Any], Any], items: Iterable[Any], jobs: int = 1) -> Iterator[Any]:
+    """Map a module-level function over items, in order, on up to `jobs` processes
+
+    Results are yielded as they are consumed, and at most one window of
+    results is in flight, so memory stays flat however many items there are.
+    """
+    items = list(items)
+    jobs = min(resolve_jobs(jobs), len(items))
+    if jobs <= 1 or len(items) < MIN_PARALLEL_ITEMS:
+        yield from map(func, items)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    # A few chunks per worker balances uneven file sizes without much IPC
+    chunksize = max(1, min(len(items) // (jobs * 4), MAX_CHUNKSIZE))
+    window = jobs * chunksize * 4
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for start in range(0, len(items), window):
+            yield from pool.map(func, items[start:start + window], chunksize=chunksize)
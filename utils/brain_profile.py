@@ -0,0 +1,553 @@
+#!/usr/bin/env python3
+"""
+AI Brain Profiler
+
+Shared instrumentation for the helper CLI and every maintenance script.
+Code marks its stages with `stage(name)` or `@profiled(name)`; while
+profiling is off both cost a single check. `--profile` turns it on and
+reports, per stage, wall and CPU time, files stat'ed and opened, distinct
+files read and written below the root directory, bytes read and written,
+and frontmatter header parses (and how many needed the full YAML parser),
+as a table on stderr or as a JSON file.
+
+Stages nest, and every row includes the stages below it. Scripts started
+through `profile_command()` report back into the stage that ran them.
+Work done in process-pool workers (--jobs > 1) is not counted. Byte counts
+come from the kernel's per-process totals (/proc/self/io on Linux, zero
+elsewhere), so they include module loading, pipes and terminal output.
+File counts come from a single audit hook on `open` and follow atomic
+`os.replace` moves from temporary files; Python sources and bytecode are
+not counted. `stage()` also hands each block its own counters, which is
+how the integrated updater's `--stage-report` gets them.
+
+`--memprofile` also traces allocations with tracemalloc: each stage reports
+the peak traced memory while it ran and the memory it left allocated, and
+the report lists the source lines holding the most memory at the end of the
+top-level stage after which the process held the most. Tracing slows a run down several times,
+so its timings are not comparable with a plain `--profile` run.
+
+`--slow-files N` charges time on the shared scan paths to the file being
+worked on, split into reading, header parsing and extraction (tokenizing,
+regex and keyword matching), and lists the N most expensive files with
+their sizes. Each block is charged its own time, excluding nested blocks.
+
+`--trace FILE` writes every stage call as a span in Chrome Trace Event
+format, viewable in Perfetto (ui.perfetto.dev) or chrome://tracing.
+Subprocesses started through `profile_command()` add their spans as
+separate processes on the same timeline; span times come from the
+monotonic clock, which all processes on a host share.
+"""
+
+import atexit
+import functools
+import os
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict, Iterator, List, Optional
+
+
+COUNTERS = ('files_stat', 'files_opened', 'files_read', 'files_written', 'bytes_read', 'bytes_written',
+            'header_parses', 'yaml_parses')
+MEMORY = ('peak_bytes', 'retained_bytes')
+TOP_ALLOCATIONS = 10
+FILE_PHASES = ('read', 'parse', 'extract')
+
+_profiler: Optional['Profiler'] = None
+_file_costs: Optional['FileCosts'] = None
+_idle = nullcontext()
+
+WRITE_FLAGS = os.O_WRONLY | os.O_RDWR | os.O_APPEND | os.O_CREAT
+
+
+def count(name: str, amount: int = 1):
+    """Add to a counter of the running profile (no-op when profiling is off)"""
+    if _profiler is not None:
+        _profiler.counts[name] += amount
+
+
+def enabled() -> bool:
+    return _profiler is not None
+
+
+def _kernel_io() -> tuple:
+    """Bytes this process has read and written (rchar, wchar), if the OS reports them"""
+    try:
+        with open('/proc/self/io', 'rb') as f:
+            fields = dict(line.split(b': ') for line in f.read().splitlines())
+        return int(fields[b'rchar']), int(fields[b'wchar'])
+    except (OSError, KeyError, ValueError):
+        return 0, 0
+
+
+def _audit(event: str, args: tuple):
+    if _profiler is None:
+        return
+    if event == 'open':
+        path, mode, flags = args
+        if isinstance(path, (str, bytes)):
+            path = os.fsdecode(path)
+            # Module imports and the profiler's own /proc reads are not workload I/O
+            if not path.endswith(('.py', '.pyc')) and not path.startswith('/proc/'):
+                _profiler.counts['files_opened'] += 1
+                if mode is not None:
+                    writing = any(flag in mode for flag in 'wax+')
+                else:
+                    writing = bool((flags or 0) & WRITE_FLAGS)
+                _profiler.opened(os.path.abspath(path), writing)
+    elif event == 'os.rename':
+        source, destination = args[0], args[1]
+        if isinstance(source, (str, bytes)) and isinstance(destination, (str, bytes)):
+            _profiler.moved(os.path.abspath(os.fsdecode(source)), os.path.abspath(os.fsdecode(destination)))
+
+
+class Profiler:
+    """Stage timings and counters for one process, plus traced memory when asked
+
+    Each open stage keeps the paths below `root` opened for reading and
+    writing while it runs; `counts` holds the other totals (and the file
+    counts subprocesses reported).
+    """
+
+    def __init__(self, name: str, memory: bool = False, trace: bool = False, root: str = '.'):
+        self.counts = dict.fromkeys(COUNTERS, 0)
+        self.root = os.path.abspath(root) + os.sep
+        self.stack: List[list] = []
+        self.rows: Dict[str, Dict[str, Any]] = {}
+        self.child_cpu = 0.0
+        self.memory = memory
+        self.held = 0
+        self.top_allocations: List[Dict[str, Any]] = []
+        self.child_allocations: List[Dict[str, Any]] = []
+        self.pid = os.getpid()
+        self.events: Optional[List[Dict[str, Any]]] = None
+        if trace:
+            self.events = [{'name': 'process_name', 'ph': 'M', 'pid': self.pid, 'tid': 0, 'args': {'name': name}}]
+        if memory:
+            import tracemalloc
+            tracemalloc.start()
+        self.begin(name)
+
+    def sample(self) -> Dict[str, float]:
+        values = dict(self.counts)
+        values['bytes_read'], values['bytes_written'] = _kernel_io()
+        values['bytes_read'] += self.counts['bytes_read']
+        values['bytes_written'] += self.counts['bytes_written']
+        values['wall'] = time.perf_counter()
+        values['cpu'] = time.process_time() + self.child_cpu
+        return values
+
+    def opened(self, path: str, writing: bool):
+        if path.startswith(self.root):
+            for entry in self.stack:
+                entry[5 if writing else 4].add(path)
+
+    def moved(self, source: str, destination: str):
+        if destination.startswith(self.root):
+            for entry in self.stack:
+                if source in entry[5]:
+                    entry[5].discard(source)
+                    entry[5].add(destination)
+
+    def path(self, name: str) -> str:
+        return f"{self.stack[-1][0]}/{name}" if self.stack else name
+
+    def begin(self, name: str):
+        path = self.path(name)
+        # Rows are created on entry so reports list parents before children
+        if path not in self.rows:
+            self.rows[path] = dict({'stage': path, 'calls': 0, 'wall': 0.0, 'cpu': 0.0}, **dict.fromkeys(COUNTERS, 0))
+            if self.memory:
+                self.rows[path].update(dict.fromkeys(MEMORY, 0))
+        entry = [path, self.sample(), 0, 0, set(), set()]
+        if self.memory:
+            # tracemalloc keeps a single peak, so each stage resets it and
+            # hands the peak it saw on to the stage that encloses it
+            import tracemalloc
+            current, peak = tracemalloc.get_traced_memory()
+            if self.stack:
+                self.stack[-1][3] = max(self.stack[-1][3], peak)
+            tracemalloc.reset_peak()
+            entry[2:4] = [current, current]
+        self.stack.append(entry)
+
+    def end(self) -> Dict[str, float]:
+        """Close the innermost stage and return that call's own counters"""
+        path, start, memory_start, memory_peak, read, written = self.stack.pop()
+        finish = self.sample()
+        call = {key: finish[key] - start[key] for key in ('wall', 'cpu') + COUNTERS}
+        # Audit events fire before a file is opened, so probes for files that
+        # do not exist (ignore files, optional state) are dropped here
+        call['files_read'] += sum(1 for name in read if os.path.isfile(name))
+        call['files_written'] += len(written)
+        row = self.rows[path]
+        row['calls'] += 1
+        for key, value in call.items():
+            row[key] += value
+        if self.events is not None:
+            counters = {key: call[key] for key in COUNTERS if call[key]}
+            self.span(path.rsplit('/', 1)[-1], start['wall'], finish['wall'], dict(counters, stage=path))
+        if self.memory:
+            import tracemalloc
+            current, peak = tracemalloc.get_traced_memory()
+            peak = max(peak, memory_peak)
+            row['peak_bytes'] = max(row['peak_bytes'], peak)
+            row['retained_bytes'] += current - memory_start
+            if self.stack:
+                self.stack[-1][3] = max(self.stack[-1][3], peak)
+            # Snapshots are slow, so sites are only listed at the end of
+            # top-level stages, and again only once 10% more memory is held
+            if len(self.stack) <= 1 and current > self.held * 1.1:
+                self.held = current
+                self.top_allocations = top_allocations(path)
+        return call
+
+    def span(self, name: str, start: float, finish: float, args: Dict[str, Any], category: str = 'stage'):
+        """Record a complete trace event; times are perf_counter() seconds"""
+        self.events.append({
+            'name': name, 'cat': category, 'ph': 'X', 'pid': self.pid, 'tid': 0,
+            'ts': round(start * 1e6, 3), 'dur': round((finish - start) * 1e6, 3), 'args': args
+        })
+
+    def merge(self, report: Dict[str, Any]):
+        """Nest a subprocess's report under the current stage
+
+        Its totals are added to the counters, so every open stage includes
+        them; its wall time already passed in this process while it ran.
+        Memory figures stay with the subprocess's own rows.
+        """
+        rows = report.get('stages', [])
+        if not rows:
+            return
+        for key in COUNTERS:
+            self.counts[key] += rows[0][key]
+        self.child_cpu += rows[0]['cpu']
+        prefix = self.stack[-1][0]
+        for row in rows:
+            path = f"{prefix}/{row['stage']}"
+            if path in self.rows:
+                existing = self.rows[path]
+                for key in ('calls', 'wall', 'cpu', 'retained_bytes') + COUNTERS:
+                    if key in row:
+                        existing[key] = existing.get(key, 0) + row[key]
+                if 'peak_bytes' in row:
+                    existing['peak_bytes'] = max(existing.get('peak_bytes', 0), row['peak_bytes'])
+            else:
+                self.rows[path] = dict(row, stage=path)
+        for allocation in report.get('top_allocations', []):
+            self.child_allocations.append(dict(allocation, stage=f"{prefix}/{allocation['stage']}"))
+
+    def finish(self) -> Dict[str, Any]:
+        """Close every open stage and return the report"""
+        while self.stack:
+            self.end()
+        stages = []
+        for row in self.rows.values():
+            stages.append(dict(row, wall=round(row['wall'], 6), cpu=round(row['cpu'], 6)))
+        report = {'command': ' '.join(sys.argv), 'stages': stages}
+        if self.memory:
+            import tracemalloc
+            tracemalloc.stop()
+            report['max_rss_bytes'] = max_rss()
+            report['top_allocations'] = self.top_allocations + self.child_allocations
+        return report
+
+
+def top_allocations(stage_path: str, limit: int = TOP_ALLOCATIONS) -> List[Dict[str, Any]]:
+    """The source lines holding the most traced memory right now"""
+    import tracemalloc
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+        tracemalloc.Filter(False, __file__),
+    ))
+    sites = []
+    for statistic in snapshot.statistics('lineno')[:limit]:
+        frame = statistic.traceback[0]
+        sites.append({'stage': stage_path, 'site': f"{frame.filename}:{frame.lineno}",
+                      'bytes': statistic.size, 'blocks': statistic.count})
+    return sites
+
+
+def max_rss() -> int:
+    """Peak resident set size of this process in bytes (0 where unknown)"""
+    try:
+        import resource
+    except ImportError:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def format_table(report: Dict[str, Any]) -> str:
+    """Render a report as an aligned text table, children indented below parents"""
+    header = f"{'stage':<40} {'calls':>6} {'wall s':>9} {'cpu s':>9} {'stat':>8} {'open':>7} " \
+             f"{'files r':>7} {'files w':>7} {'read KiB':>10} {'write KiB':>10} {'parses':>7} {'yaml':>6}"
+    lines = [f"⏱️  Profile: {report['command']}", header, '-' * len(header)]
+    for row in report['stages']:
+        lines.append(
+            f"{_stage_label(row):<40} {row['calls']:>6} {row['wall']:>9.3f} {row['cpu']:>9.3f} "
+            f"{row['files_stat']:>8} {row['files_opened']:>7} {row['files_read']:>7} {row['files_written']:>7} "
+            f"{row['bytes_read'] / 1024:>10.1f} "
+            f"{row['bytes_written'] / 1024:>10.1f} {row['header_parses']:>7} {row['yaml_parses']:>6}"
+        )
+    return '\n'.join(lines)
+
+
+def format_memory_table(report: Dict[str, Any]) -> str:
+    """Render the memory columns of a report and its top allocation sites"""
+    mib = 1024 * 1024
+    header = f"{'stage':<40} {'calls':>6} {'peak MiB':>10} {'retained MiB':>13}"
+    lines = [f"🧠 Memory profile: {report['command']}", header, '-' * len(header)]
+    for row in report['stages']:
+        if 'peak_bytes' in row:
+            lines.append(f"{_stage_label(row):<40} {row['calls']:>6} {row['peak_bytes'] / mib:>10.2f} "
+                         f"{row['retained_bytes'] / mib:>13.2f}")
+    lines.append(f"Peak RSS: {report.get('max_rss_bytes', 0) / mib:.1f} MiB")
+    if report.get('top_allocations'):
+        lines.append("Top allocation sites (when the most memory was held):")
+        for allocation in report['top_allocations']:
+            lines.append(f"  {allocation['bytes'] / mib:>8.2f} MiB {allocation['blocks']:>8} blocks  "
+                         f"{allocation['site']}  [{allocation['stage']}]")
+    return '\n'.join(lines)
+
+
+def _stage_label(row: Dict[str, Any]) -> str:
+    """Stage name indented by its depth, cut to the table's column width"""
+    depth = row['stage'].count('/')
+    return ('  ' * depth + row['stage'].rsplit('/', 1)[-1])[:40]
+
+
+class FileCosts:
+    """Time per file and scan phase, for the slowest-files report"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.costs: Dict[str, Dict[str, float]] = {}
+        self.open: List['FileCost'] = []
+
+    def add(self, path: str, phase: str, seconds: float):
+        entry = self.costs.get(path)
+        if entry is None:
+            entry = self.costs[path] = dict.fromkeys(FILE_PHASES, 0.0)
+        entry[phase] += seconds
+
+    def merge(self, files: List[Dict[str, Any]]):
+        """Add the slowest files reported by a subprocess"""
+        for item in files:
+            for phase in FILE_PHASES:
+                self.add(item['path'], phase, item[phase])
+
+    def slowest(self) -> List[Dict[str, Any]]:
+        """The `limit` files with the most total time, with their current sizes"""
+        ranked = sorted(self.costs.items(), key=lambda item: sum(item[1].values()), reverse=True)
+        files = []
+        for path, phases in ranked[:self.limit]:
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                size = 0
+            files.append(dict({'path': path, 'bytes': size}, total=round(sum(phases.values()), 6),
+                              **{phase: round(seconds, 6) for phase, seconds in phases.items()}))
+        return files
+
+
+class FileCost:
+    """Context manager charging its block's time to one file and phase"""
+
+    __slots__ = ('path', 'phase', 'start', 'inner')
+
+    def __init__(self, path, phase: str):
+        self.path = path
+        self.phase = phase
+        self.inner = 0.0
+
+    def __enter__(self) -> 'FileCost':
+        costs = _file_costs
+        # Blocks without a path (header parsing) belong to the enclosing file
+        if self.path is None and costs.open:
+            self.path = costs.open[-1].path
+        costs.open.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        costs = _file_costs
+        costs.open.pop()
+        if costs.open:
+            costs.open[-1].inner += elapsed
+        if self.path is not None:
+            costs.add(os.path.normpath(os.fspath(self.path)), self.phase, elapsed - self.inner)
+        return False
+
+
+def file_cost(path, phase: str):
+    """Charge a block to a file ('read', 'parse' or 'extract'); path None means the enclosing file"""
+    if _file_costs is None:
+        return _idle
+    return FileCost(path, phase)
+
+
+def tracing_files() -> bool:
+    return _file_costs is not None
+
+
+def format_slow_files(report: Dict[str, Any]) -> str:
+    """Render the slowest-files list of a report"""
+    header = f"{'total ms':>9} {'read ms':>9} {'parse ms':>9} {'extract ms':>10} {'KiB':>9}  file"
+    lines = [f"🐢 Slowest files: {report['command']}", header, '-' * len(header)]
+    for item in report.get('slow_files', []):
+        lines.append(f"{item['total'] * 1000:>9.1f} {item['read'] * 1000:>9.1f} {item['parse'] * 1000:>9.1f} "
+                     f"{item['extract'] * 1000:>10.1f} {item['bytes'] / 1024:>9.1f}  {item['path']}")
+    return '\n'.join(lines)
+
+
+def _counting(function):
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        if _profiler is not None:
+            _profiler.counts['files_stat'] += 1
+        return function(*args, **kwargs)
+    return wrapper
+
+
+def start(target: Optional[str], name: Optional[str] = None, memory: Optional[str] = None,
+          slow_files: Optional[int] = None, trace: Optional[str] = None, root: str = '.',
+          counters: bool = False):
+    """Profile the rest of this process and report at exit
+
+    `target` receives the time and I/O report and `memory` the tracemalloc
+    report; each is '-' for a table on stderr or a path for a JSON file.
+    `slow_files` lists that many of the most expensive files on stderr (and
+    in the JSON reports). `trace` is a path for a Chrome Trace Event file
+    with one span per stage call. Files read and written are counted below
+    `root`. `counters` keeps the counters running without any report, for
+    callers that read them from `stage()`. Profiling stays off when all are
+    unset.
+    """
+    global _profiler, _file_costs
+    if not (target or memory or slow_files or trace or counters) or _profiler is not None or _file_costs is not None:
+        return
+
+    if slow_files:
+        _file_costs = FileCosts(slow_files)
+    if target or memory or trace or counters:
+        # pathlib and os.path both stat through these module attributes
+        os.stat = _counting(os.stat)
+        os.lstat = _counting(os.lstat)
+        sys.addaudithook(_audit)
+        _profiler = Profiler(name or os.path.basename(sys.argv[0]) or 'python', memory=bool(memory), trace=bool(trace),
+                             root=root)
+
+    def report():
+        import json
+        result = _profiler.finish() if _profiler is not None else {'command': ' '.join(sys.argv), 'stages': []}
+        if _file_costs is not None:
+            result['slow_files'] = _file_costs.slowest()
+            print(format_slow_files(result), file=sys.stderr)
+        for output, formatter in ((target, format_table), (memory, format_memory_table)):
+            if output == '-':
+                print(formatter(result), file=sys.stderr)
+            elif output:
+                with open(output, 'w', encoding='utf-8') as f:
+                    json.dump(result, f, indent=2)
+        if trace:
+            with open(trace, 'w', encoding='utf-8') as f:
+                json.dump({'traceEvents': _profiler.events, 'displayTimeUnit': 'ms',
+                           'otherData': {'command': result['command']}}, f)
+
+    atexit.register(report)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[Dict[str, float]]:
+    """Time a block as a named stage of the running profile
+
+    Yields a dict that receives the block's own wall, CPU and counter totals
+    when it ends (it stays empty while profiling is off).
+    """
+    totals: Dict[str, float] = {}
+    if _profiler is None:
+        yield totals
+        return
+    _profiler.begin(name)
+    try:
+        yield totals
+    finally:
+        totals.update(_profiler.end())
+
+
+def profiled(name: str):
+    """Decorator form of `stage` for methods that make up one stage"""
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if _profiler is None:
+                return function(*args, **kwargs)
+            with stage(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def add_profile_argument(parser):
+    """The shared profiling options for a script's argument parser"""
+    parser.add_argument('--profile', nargs='?', const='-', metavar='JSON',
+                        help='Report per-stage time and I/O on stderr (or write it to a JSON file)')
+    parser.add_argument('--memprofile', nargs='?', const='-', metavar='JSON',
+                        help='Report per-stage peak and retained memory and the top allocation sites '
+                             'on stderr (or write them to a JSON file)')
+    parser.add_argument('--slow-files', nargs='?', type=int, const=10, metavar='N',
+                        help='List the N files (default: 10) that took longest to read, parse and scan')
+    parser.add_argument('--trace', metavar='JSON',
+                        help='Write a Chrome Trace Event file of every stage (open in Perfetto or chrome://tracing)')
+
+
+@contextmanager
+def profile_command(command: List[str]) -> Iterator[List[str]]:
+    """Yield `command` with the active profiling options added, and merge its reports afterwards"""
+    if _profiler is None and _file_costs is None:
+        yield command
+        return
+
+    import json
+    import tempfile
+    reports = []
+    for suffix in ('.json', '.trace.json'):
+        fd, path = tempfile.mkstemp(prefix='brain-profile-', suffix=suffix)
+        os.close(fd)
+        reports.append(path)
+    report, trace = reports
+
+    # Either option writes the full report; --memprofile also traces memory
+    options = ['--memprofile' if _profiler is not None and _profiler.memory else '--profile', report]
+    if _file_costs is not None:
+        options += ['--slow-files', str(_file_costs.limit)]
+    tracing = _profiler is not None and _profiler.events is not None
+    if tracing:
+        options += ['--trace', trace]
+    try:
+        started = time.perf_counter()
+        yield command + options
+        if tracing:
+            # The parent's view of the child: process start-up shows up as the
+            # gap before the child's own first span
+            _profiler.span('subprocess', started, time.perf_counter(), {'command': ' '.join(command)}, 'subprocess')
+        try:
+            with open(report, 'r', encoding='utf-8') as f:
+                result = json.load(f)
+            if tracing:
+                with open(trace, 'r', encoding='utf-8') as f:
+                    _profiler.events.extend(json.load(f)['traceEvents'])
+        except (OSError, ValueError, KeyError):
+            return
+        if _profiler is not None:
+            _profiler.merge(result)
+        if _file_costs is not None:
+            _file_costs.merge(result.get('slow_files', []))
+    finally:
+        for path in reports:
+            os.unlink(path)
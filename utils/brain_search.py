@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+AI Brain Full-Text Search
+
+BM25 search over document bodies. Positional postings live in the catalog
+database next to the metadata. BrainCatalog.refresh_search() builds them on
+the first search and, before each later one, re-tokenizes only the files
+whose content changed, so the index is as fresh as the catalog while
+metadata-only queries never build it.
+"""
+
+import math
+import re
+import sqlite3
+from array import array
+from collections import defaultdict
+from typing import Dict, List, Any, Tuple
+
+
+TOKEN = re.compile(r"[^\W_]+(?:['’][^\W_]+)?", re.UNICODE)
+PHRASE = re.compile(r'"([^"]*)"')
+
+# Too common to be worth a posting list; they still advance the position
+STOPWORDS = frozenset("""
+a an and are as at be but by for from has have in is it its of on or that
+the this to was were will with
+""".split())
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Rank boosts on top of the BM25 score
+TITLE_BOOST = 2.0
+SHIP_FACTOR_WEIGHT = 0.05
+
+SNIPPET_WORDS = 12
+
+
+def tokenize(text: str) -> List[Tuple[int, str]]:
+    """Return (position, term) pairs, skipping stopwords but not their positions"""
+    return [
+        (position, term)
+        for position, term in enumerate(match.group(0).lower() for match in TOKEN.finditer(text))
+        if term not in STOPWORDS
+    ]
+
+
+def build_postings(body: str) -> Tuple[List[Tuple[str, int, bytes]], int]:
+    """Tokenize a body into (term, tf, packed positions) rows and its length"""
+    tokens = tokenize(body)
+    positions: Dict[str, array] = defaultdict(lambda: array('I'))
+    for position, term in tokens:
+        positions[term].append(position)
+    return [(term, len(hits), hits.tobytes()) for term, hits in positions.items()], len(tokens)
+
+
+def parse_query(query: str) -> Tuple[List[str], List[List[str]]]:
+    """Split a query into its distinct terms and its quoted phrases"""
+    phrases = [
+        [term for _, term in tokenize(phrase)]
+        for phrase in PHRASE.findall(query)
+    ]
+    terms = []
+    for _, term in tokenize(query.replace('"', ' ')):
+        if term not in terms:
+            terms.append(term)
+    return terms, [phrase for phrase in phrases if len(phrase) > 1]
+
+
+class BrainSearch:
+    """BM25 ranking over the catalog's positional postings"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def _postings(self, term: str) -> Dict[str, Tuple[int, bytes]]:
+        return {
+            row['path']: (row['tf'], row['positions'])
+            for row in self.conn.execute(
+                "SELECT path, tf, positions FROM postings WHERE term = ?", (term,)
+            )
+        }
+
+    @staticmethod
+    def _positions(blob: bytes) -> array:
+        hits = array('I')
+        hits.frombytes(blob)
+        return hits
+
+    def _has_phrase(self, phrase: List[str], postings: Dict[str, Dict[str, Tuple[int, bytes]]], path: str) -> bool:
+        """True when the phrase terms appear at consecutive positions"""
+        starts = None
+        for offset, term in enumerate(phrase):
+            hit = postings[term].get(path)
+            if hit is None:
+                return False
+            shifted = {position - offset for position in self._positions(hit[1])}
+            starts = shifted if starts is None else starts & shifted
+            if not starts:
+                return False
+        return True
+
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Rank documents for a query; quoted phrases must match exactly"""
+        terms, phrases = parse_query(query)
+        if not terms:
+            return []
+
+        total_docs, average_length = self.conn.execute(
+            "SELECT COUNT(*), AVG(length) FROM doc_lengths"
+        ).fetchone()
+        if not total_docs:
+            return []
+        average_length = average_length or 1
+
+        postings = {term: self._postings(term) for term in terms}
+        candidates = set()
+        for hits in postings.values():
+            candidates.update(hits)
+        for phrase in phrases:
+            candidates = {path for path in candidates if self._has_phrase(phrase, postings, path)}
+        if not candidates:
+            return []
+
+        lengths = self._rows(
+            "SELECT d.path, d.length, c.title, c.ship_factor, c.deprecated "
+            "FROM doc_lengths d JOIN documents c ON c.path = d.path WHERE d.path IN ({})",
+            candidates
+        )
+
+        idf = {
+            term: math.log(1 + (total_docs - len(hits) + 0.5) / (len(hits) + 0.5))
+            for term, hits in postings.items()
+        }
+
+        results = []
+        for path, row in lengths.items():
+            norm = K1 * (1 - B + B * row['length'] / average_length)
+            score = 0.0
+            for term in terms:
+                hit = postings[term].get(path)
+                if hit is not None:
+                    tf = hit[0]
+                    score += idf[term] * tf * (K1 + 1) / (tf + norm)
+
+            title_terms = {term for _, term in tokenize(row['title'] or '')}
+            score += TITLE_BOOST * sum(idf[term] for term in terms if term in title_terms)
+            score *= 1 + SHIP_FACTOR_WEIGHT * (row['ship_factor'] or 0)
+
+            first = min(
+                (self._positions(postings[term][path][1])[0] for term in terms if path in postings[term]),
+                default=0
+            )
+            results.append({
+                'path': path,
+                'title': row['title'] or 'Untitled',
+                'ship_factor': row['ship_factor'] or 0,
+                'deprecated': bool(row['deprecated']),
+                'score': round(score, 4),
+                'position': first
+            })
+
+        results.sort(key=lambda result: (-result['score'], result['path']))
+        return results[:limit]
+
+    def _rows(self, sql: str, paths) -> Dict[str, sqlite3.Row]:
+        """Fetch rows for a set of paths in chunks below SQLite's variable limit"""
+        paths = sorted(paths)
+        rows = {}
+        for start in range(0, len(paths), 500):
+            chunk = paths[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            for row in self.conn.execute(sql.format(placeholders), chunk):
+                rows[row['path']] = row
+        return rows
+
+
+def snippet(body: str, position: int, width: int = SNIPPET_WORDS) -> str:
+    """Words of the body around a token position"""
+    matches = list(TOKEN.finditer(body))
+    if not matches:
+        return ''
+    first = max(0, min(position, len(matches) - 1) - width // 3)
+    last = min(len(matches) - 1, first + width)
+    text = ' '.join(body[matches[first].start():matches[last].end()].split())
+    prefix = '… ' if first > 0 else ''
+    suffix = ' …' if last < len(matches) - 1 else ''
+    return f"{prefix}{text}{suffix}"
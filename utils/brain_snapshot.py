@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+AI Brain Corpus Snapshot
+
+In-memory view of the whole knowledge base built from a single catalog pass.
+Every file is parsed at most once (by the catalog refresh) and all read-only
+queries and reports are answered from this snapshot. Entries are compact
+`Document` records; no document bodies are held in memory.
+"""
+
+import json
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from brain_catalog import BrainCatalog, SPECIAL_FILES
+from brain_document import Document
+from brain_indexes import TagIndex, PriorityIndex, PathTrie
+
+
+class CorpusSnapshot:
+    """Parsed corpus held in memory, ordered by path"""
+
+    def __init__(self, root: Path, entries: List[Document], generation: int = 0):
+        self.root = root
+        # Catalog generation the entries reflect (see BrainCatalog.generation)
+        self.generation = generation
+        self.entries = sorted(entries, key=lambda entry: entry.path)
+        self.paths = [entry.path for entry in self.entries]
+        self.by_path = {entry.path: entry for entry in self.entries}
+
+        self.tags = TagIndex()
+        self.priority = PriorityIndex()
+        self.tree = PathTrie()
+        for entry in self.iter_documents():
+            self._index(entry)
+
+    @classmethod
+    def from_catalog(cls, catalog: BrainCatalog) -> 'CorpusSnapshot':
+        """Refresh the catalog once and stream every row from one query"""
+        catalog.refresh()
+        # Read first: a write landing while rows stream in is then seen as newer
+        generation = catalog.generation()
+        return cls(catalog.root, [cls.entry_from_row(catalog.root, row) for row in catalog.iter_entries()], generation)
+
+    @staticmethod
+    def entry_from_row(root: Path, row) -> Document:
+        """Convert a catalog row into a snapshot entry"""
+        return Document.from_row(root, row, tuple(json.loads(row['tags'])))
+
+    def _index(self, entry: Document):
+        """Add a knowledge base document to the maintained indexes"""
+        self.tags.add(entry.path, entry.tags, entry.deprecated)
+        self.priority.add(entry.path, entry.ship_factor, entry.modified, entry.deprecated)
+        self.tree.add(entry.path, entry.ship_factor, entry.deprecated)
+
+    def _unindex(self, path: str):
+        """Remove a document from the maintained indexes"""
+        self.tags.remove(path)
+        self.priority.remove(path)
+        self.tree.remove(path)
+
+    def upsert(self, entry: Document):
+        """Apply a single added or changed file without rebuilding"""
+        path = entry.path
+        if path in self.by_path:
+            self.entries[bisect_left(self.paths, path)] = entry
+        else:
+            position = bisect_left(self.paths, path)
+            self.paths.insert(position, path)
+            self.entries.insert(position, entry)
+        self.by_path[path] = entry
+
+        self._unindex(path)
+        if entry.name not in SPECIAL_FILES:
+            self._index(entry)
+
+    def discard(self, path: str):
+        """Apply a single removed file without rebuilding"""
+        if path not in self.by_path:
+            return
+        position = bisect_left(self.paths, path)
+        del self.paths[position]
+        del self.entries[position]
+        del self.by_path[path]
+        self._unindex(path)
+
+    def iter_documents(self) -> Iterator[Document]:
+        """Yield knowledge base entries (index files excluded) in path order"""
+        return (entry for entry in self.entries if entry.name not in SPECIAL_FILES)
+
+    @property
+    def documents(self) -> List[Document]:
+        """Entries that belong to the knowledge base (index files excluded)"""
+        return list(self.iter_documents())
+
+    @staticmethod
+    def by_ship_factor(entries: List[Document]) -> List[Document]:
+        """Sort entries by ship factor, highest first"""
+        return sorted(entries, key=lambda entry: entry.ship_factor or 0, reverse=True)
+
+    def resolve(self, paths) -> List[Document]:
+        """Entries for a set of paths, highest ship factor first"""
+        return self.by_ship_factor([self.by_path[path] for path in sorted(paths)])
+
+    def iter_paths(self, paths: Iterable[str]) -> Iterator[Document]:
+        """Yield the entries for paths in the order given"""
+        return (self.by_path[path] for path in paths)
+
+    def iter_by_tags(self, tags: List[str]) -> Iterator[Document]:
+        """Documents carrying any of the given tags, in path order"""
+        return self.iter_paths(sorted(self.tags.any_of(tags)))
+
+    def iter_by_tag_expression(self, expression: str) -> Iterator[Document]:
+        """Documents matching a boolean tag expression, in path order"""
+        return self.iter_paths(sorted(self.tags.query(expression)))
+
+    def iter_high_priority(self, min_ship_factor: int = 8) -> Iterator[Document]:
+        """Non-deprecated documents at or above a ship factor, in priority order"""
+        return self.iter_paths(path for _, path in self.priority.iter_at_least(min_ship_factor))
+
+    def iter_by_category(self, category: str) -> Iterator[Document]:
+        """Files below a category directory in path order, README.md excluded
+
+        Unlike the other queries, category listings keep SYSTEM.md, INDEX.md
+        and CHANGELOG.md, so they are read from the sorted path list rather
+        than the trie, which only holds knowledge base documents.
+        """
+        prefix = category.strip('/')
+        start, end = 0, len(self.paths)
+        if prefix:
+            start = bisect_left(self.paths, prefix + '/')
+            # '0' sorts right after '/', so this is the first path past the prefix
+            end = bisect_left(self.paths, prefix + '0')
+        entries = self.entries
+        return (entries[position] for position in range(start, end) if entries[position].name != 'README.md')
+
+    def find_by_tags(self, tags: List[str]) -> List[Document]:
+        """Documents carrying any of the given tags"""
+        return self.resolve(self.tags.any_of(tags))
+
+    def query_tags(self, expression: str) -> List[Document]:
+        """Documents matching a boolean tag expression"""
+        return self.resolve(self.tags.query(expression))
+
+    def high_priority(self, min_ship_factor: int = 8) -> List[Document]:
+        """Non-deprecated documents at or above a ship factor, in index order"""
+        return list(self.iter_high_priority(min_ship_factor))
+
+    def top_k(self, n: int, category: Optional[str] = None) -> List[Document]:
+        """The n highest-priority non-deprecated documents"""
+        return [self.by_path[path] for path in self.priority.top_k(n, category)]
+
+    def by_category(self, category: str) -> List[Document]:
+        """Files below a category directory (README.md excluded), highest ship factor first"""
+        return self.by_ship_factor(list(self.iter_by_category(category)))
+
+    def statistics(self, prefix: str = '') -> Dict[str, int]:
+        """Rolled-up counters for a directory plus totals for each subdirectory"""
+        stats = self.tree.counts(prefix)
+        for name, total in self.tree.child_counts(prefix).items():
+            stats.setdefault(name, total)
+        return stats
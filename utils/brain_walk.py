@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+AI Brain Directory Walker
+
+Shared `os.scandir` walker for every scanner. Excluded directories are
+pruned before they are entered instead of being traversed and filtered
+afterwards. Exclusions come from `.gitignore`, `.cursorignore` and
+`.brainignore` files (at the walk root and in any directory below it)
+plus a few directories that never hold knowledge base content.
+"""
+
+import os
+import re
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+
+IGNORE_FILES = ('.gitignore', '.cursorignore', '.brainignore')
+
+# Pruned even when no ignore file mentions them
+ALWAYS_PRUNED = frozenset({'.git', '.brain', '__pycache__', 'venv', '.venv', 'node_modules'})
+
+
+def _translate(pattern: str) -> str:
+    """Translate a gitignore glob (without anchoring) into a regex"""
+    regex = ''
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith('**/', i):
+            regex += '(?:.*/)?'
+            i += 3
+        elif pattern.startswith('/**', i) and i + 3 == len(pattern):
+            regex += '/.*'
+            i += 3
+        elif pattern.startswith('**', i):
+            regex += '.*'
+            i += 2
+        elif pattern[i] == '*':
+            regex += '[^/]*'
+            i += 1
+        elif pattern[i] == '?':
+            regex += '[^/]'
+            i += 1
+        elif pattern[i] == '[':
+            end = pattern.find(']', i + 2)
+            if end == -1:
+                regex += re.escape(pattern[i])
+                i += 1
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                regex += f'[{body}]'
+                i = end + 1
+        elif pattern[i] == '\\' and i + 1 < len(pattern):
+            regex += re.escape(pattern[i + 1])
+            i += 2
+        else:
+            regex += re.escape(pattern[i])
+            i += 1
+    return regex
+
+
+class IgnoreRule:
+    """One line of an ignore file, relative to the directory holding it"""
+
+    __slots__ = ('base', 'regex', 'negated', 'dir_only')
+
+    def __init__(self, base: str, line: str):
+        self.negated = line.startswith('!')
+        if self.negated:
+            line = line[1:]
+        self.dir_only = line.endswith('/')
+        line = line.rstrip('/')
+
+        # A slash anywhere but the end anchors the pattern to its directory
+        anchored = '/' in line
+        line = line.lstrip('/')
+        prefix = '' if anchored else '(?:.*/)?'
+        self.base = base
+        self.regex = re.compile(prefix + _translate(line) + r'\Z')
+
+    def matches(self, relative_path: str, is_dir: bool) -> bool:
+        """Match a path relative to the walk root"""
+        if self.dir_only and not is_dir:
+            return False
+        if self.base:
+            if not relative_path.startswith(self.base + '/'):
+                return False
+            relative_path = relative_path[len(self.base) + 1:]
+        return self.regex.match(relative_path) is not None
+
+
+def parse_ignore_file(path: Path, base: str) -> List[IgnoreRule]:
+    """Read gitignore-style rules from a file (missing files give no rules)"""
+    rules = []
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+    except (OSError, UnicodeDecodeError):
+        return rules
+
+    for line in lines:
+        line = line.rstrip()
+        if line.endswith('\\'):
+            line += ' '
+        if not line or line.startswith('#'):
+            continue
+        if line.startswith('\\#') or line.startswith('\\!'):
+            line = line[1:]
+        rules.append(IgnoreRule(base, line))
+    return rules
+
+
+class BrainIgnore:
+    """Ignore rules for a tree, gathered from ignore files as directories are entered"""
+
+    def __init__(self, root: Union[str, Path] = "."):
+        self.root = Path(root)
+        self.loaded = set()
+        self.rules: List[IgnoreRule] = []
+        self.load('')
+
+    def load(self, relative_dir: str):
+        """Add the rules from the ignore files in one directory"""
+        if relative_dir in self.loaded:
+            return
+        self.loaded.add(relative_dir)
+        directory = self.root / relative_dir if relative_dir else self.root
+        for name in IGNORE_FILES:
+            self.rules.extend(parse_ignore_file(directory / name, relative_dir))
+
+    def ignored(self, relative_path: str, is_dir: bool) -> bool:
+        """Whether a root-relative POSIX path is excluded (last matching rule wins)"""
+        if is_dir and relative_path.rsplit('/', 1)[-1] in ALWAYS_PRUNED:
+            return True
+
+        result = False
+        for rule in self.rules:
+            if rule.negated == result and rule.matches(relative_path, is_dir):
+                result = not rule.negated
+        return result
+
+    def is_ignored(self, path: Path) -> bool:
+        """Whether a path inside the root, or any directory above it, is excluded"""
+        parts = Path(path).resolve().relative_to(self.root.resolve()).parts
+        for depth in range(1, len(parts) + 1):
+            relative = '/'.join(parts[:depth])
+            is_dir = depth < len(parts) or Path(path).is_dir()
+            self.load('/'.join(parts[:depth - 1]))
+            if self.ignored(relative, is_dir):
+                return True
+        return False
+
+
+def _walk(
+    top: Path,
+    root: Path,
+    ignore: Optional[BrainIgnore]
+) -> Iterator[Tuple[Path, bool]]:
+    """Yield (path, is_dir) for `top` and everything below it that is not ignored
+
+    Directories are yielded as they are entered, before their contents.
+    """
+    ignore = ignore or BrainIgnore(root)
+
+    start = top.resolve().relative_to(root.resolve()).as_posix()
+    start = '' if start == '.' else start
+    if start:
+        if ignore.is_ignored(top):
+            return
+        ignore.load(start)
+
+    stack: List[Tuple[Path, str, Iterator[os.DirEntry]]] = []
+
+    def enter(directory: Path, relative: str):
+        ignore.load(relative)
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError:
+            entries = []
+        stack.append((directory, relative, iter(entries)))
+
+    yield top, True
+    enter(top, start)
+    while stack:
+        directory, relative, entries = stack[-1]
+        entry = next(entries, None)
+        if entry is None:
+            stack.pop()
+            continue
+
+        entry_relative = f"{relative}/{entry.name}" if relative else entry.name
+        try:
+            is_dir = entry.is_dir()
+        except OSError:
+            continue
+
+        if ignore.ignored(entry_relative, is_dir):
+            continue
+        if is_dir:
+            # Like rglob, never follow directory symlinks (they can loop)
+            if not entry.is_symlink():
+                yield directory / entry.name, True
+                enter(directory / entry.name, entry_relative)
+        else:
+            yield directory / entry.name, False
+
+
+def walk_files(
+    top: Union[str, Path],
+    patterns: Union[str, Iterable[str]] = '*',
+    root: Optional[Union[str, Path]] = None,
+    ignore: Optional[BrainIgnore] = None
+) -> Iterator[Path]:
+    """Yield files below `top` whose names match any pattern, pruning ignored directories
+
+    Paths come out in the same order as `sorted(top.rglob(...))`. Ignore
+    files are read from `root` (default: `top`) and every directory between
+    it and the files walked.
+    """
+    top = Path(top)
+    root = Path(root) if root is not None else top
+    patterns: Tuple[str, ...] = (patterns,) if isinstance(patterns, str) else tuple(patterns)
+
+    for path, is_dir in _walk(top, root, ignore):
+        if not is_dir and any(fnmatchcase(path.name, pattern) for pattern in patterns):
+            yield path
+
+
+def walk_directories(
+    top: Union[str, Path],
+    root: Optional[Union[str, Path]] = None,
+    ignore: Optional[BrainIgnore] = None
+) -> Iterator[Path]:
+    """Yield `top` and every directory below it that `walk_files` would descend into"""
+    top = Path(top)
+    root = Path(root) if root is not None else top
+    for path, is_dir in _walk(top, root, ignore):
+        if is_dir:
+            yield path
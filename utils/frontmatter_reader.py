@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Header-only Frontmatter Reader
+
+Reads just the YAML block between the opening and closing `---` delimiters
+instead of loading whole documents through python-frontmatter. Simple flat
+headers (scalars and lists of scalars) are handled by a lightweight key
+scanner; anything else falls back to a full YAML parse of the header only,
+through libyaml's CSafeLoader when it is available. Parsed headers are kept
+in a disk cache keyed by the header's hash (see header_cache.py), so an
+unchanged header is only ever parsed once. Results match
+`frontmatter.load(f).metadata`.
+"""
+
+import re
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Optional, Tuple
+
+from brain_profile import count, file_cost
+
+
+# Same boundary rules as python-frontmatter's YAMLHandler and JSONHandler
+BOUNDARY = re.compile(r"^-{3,}\s*$")
+JSON_BOUNDARY = re.compile(r"^(?:{|})$")
+
+KEY_LINE = re.compile(r"^([A-Za-z_][A-Za-z0-9_-]*):(?:[ \t]+(.*?))?[ \t]*$")
+LIST_ITEM = re.compile(r"^ *- +(.*?)[ \t]*$")
+PLAIN_SCALAR = re.compile(r"^[A-Za-z][A-Za-z0-9 _./()-]*$")
+INTEGER = re.compile(r"^[-+]?(?:0|[1-9][0-9]*)$")
+
+# Plain words that YAML 1.1 resolves to booleans or null
+BOOLEANS = {'true': True, 'True': True, 'TRUE': True, 'false': False, 'False': False, 'FALSE': False}
+NULLS = {'', '~', 'null', 'Null', 'NULL'}
+AMBIGUOUS_WORDS = {'yes', 'Yes', 'YES', 'no', 'No', 'NO', 'on', 'On', 'ON', 'off', 'Off', 'OFF'}
+
+
+class _Unsupported(Exception):
+    """Raised by the key scanner when a header needs the full YAML parser"""
+
+
+def _scalar(text: str) -> Any:
+    """Resolve a single scalar the way YAML's safe loader would, or give up"""
+    if text in NULLS:
+        return None
+    if text in BOOLEANS:
+        return BOOLEANS[text]
+    if len(text) >= 2 and text[0] == text[-1] == "'":
+        inner = text[1:-1]
+        if "'" in inner.replace("''", ""):
+            raise _Unsupported(text)
+        return inner.replace("''", "'")
+    if len(text) >= 2 and text[0] == text[-1] == '"':
+        inner = text[1:-1]
+        if '"' in inner or '\\' in inner:
+            raise _Unsupported(text)
+        return inner
+    if INTEGER.match(text):
+        return int(text)
+    if PLAIN_SCALAR.match(text) and text not in AMBIGUOUS_WORDS:
+        return text
+    raise _Unsupported(text)
+
+
+def _flow_list(text: str) -> list:
+    """Parse a one-line flow sequence such as `[mcp, setup]`"""
+    inner = text[1:-1].strip()
+    if not inner:
+        return []
+    if any(ch in inner for ch in '[]{}"\''):
+        raise _Unsupported(text)
+    items = [item.strip() for item in inner.split(',')]
+    if '' in items:
+        raise _Unsupported(text)
+    return [_scalar(item) for item in items]
+
+
+def scan_flat_header(header: str) -> Dict[str, Any]:
+    """Parse a flat `key: value` header without YAML
+
+    Raises _Unsupported for anything beyond scalars, flow lists of scalars
+    and block lists of scalars.
+    """
+    metadata: Dict[str, Any] = {}
+    current_list: Optional[list] = None
+
+    for line in header.splitlines():
+        stripped = line.strip()
+        if not stripped or stripped.startswith('#'):
+            continue
+
+        item = LIST_ITEM.match(line)
+        if item:
+            if current_list is None:
+                raise _Unsupported(line)
+            current_list.append(_scalar(item.group(1)))
+            continue
+
+        if line[0] in ' \t':
+            raise _Unsupported(line)
+
+        match = KEY_LINE.match(line)
+        if not match:
+            raise _Unsupported(line)
+
+        key, value = match.group(1), match.group(2) or ''
+        if key in BOOLEANS or key in NULLS or key in AMBIGUOUS_WORDS:
+            raise _Unsupported(line)
+        if value.startswith('[') and value.endswith(']'):
+            metadata[key] = _flow_list(value)
+            current_list = None
+        elif value == '':
+            # Either null or the start of a block list
+            current_list = []
+            metadata[key] = _PendingList(current_list)
+        else:
+            metadata[key] = _scalar(value)
+            current_list = None
+
+    return {
+        key: (value.items or None) if isinstance(value, _PendingList) else value
+        for key, value in metadata.items()
+    }
+
+
+class _PendingList:
+    """Placeholder for a key whose block list items follow on later lines"""
+
+    __slots__ = ('items',)
+
+    def __init__(self, items: list):
+        self.items = items
+
+
+def parse_header(header: str) -> Dict[str, Any]:
+    """Parse header text, trying the key scanner before full YAML"""
+    count('header_parses')
+    try:
+        return scan_flat_header(header)
+    except _Unsupported:
+        pass
+
+    import yaml
+    count('yaml_parses')
+    loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+    data = yaml.load(header, Loader=loader)
+    return data if isinstance(data, dict) else {}
+
+
+def parse_json_header(header: str) -> Dict[str, Any]:
+    """Parse the inside of a JSON frontmatter block"""
+    import json
+    count('header_parses')
+    data = json.loads('{' + header + '}')
+    return data if isinstance(data, dict) else {}
+
+
+def cached_parse(parse, header: str) -> Dict[str, Any]:
+    """Parse a header through the shared parse cache"""
+    from header_cache import get_cache
+    cache = get_cache()
+    with file_cost(None, 'parse'):
+        if cache is None:
+            return parse(header)
+        return cache.get_or_parse(parse.__name__, header, parse)
+
+
+def _boundary_for(first_line: str):
+    """Pick the delimiter pattern and parser for a document's first line"""
+    if BOUNDARY.match(first_line):
+        return BOUNDARY, parse_header
+    if JSON_BOUNDARY.match(first_line.rstrip('\r\n')):
+        return JSON_BOUNDARY, parse_json_header
+    return None, None
+
+
+def load_header(f: BinaryIO) -> Dict[str, Any]:
+    """Read only the frontmatter block from an open binary file
+
+    On return the file is positioned at the start of the body, or at the
+    start of the file when there is no (complete) frontmatter block.
+    """
+    line = f.readline()
+    while line and not line.strip():
+        line = f.readline()
+
+    boundary, parse = _boundary_for(line.decode('utf-8').lstrip())
+    if boundary is None:
+        f.seek(0)
+        return {}
+
+    header_lines = []
+    for line in iter(f.readline, b''):
+        text = line.decode('utf-8')
+        if boundary.match(text.rstrip('\r\n') if boundary is JSON_BOUNDARY else text):
+            return cached_parse(parse, ''.join(header_lines))
+        header_lines.append(text)
+
+    # No closing delimiter: python-frontmatter treats the file as body only
+    f.seek(0)
+    return {}
+
+
+def read_header(path: Path) -> Dict[str, Any]:
+    """Return a file's frontmatter metadata, reading only the header bytes"""
+    with file_cost(path, 'read'), open(path, 'rb') as f:
+        return load_header(f)
+
+
+def split_document(text: str) -> Tuple[Dict[str, Any], str]:
+    """Split already-loaded text into (metadata, content) like frontmatter.loads"""
+    text = text.strip()
+    lines = text.split('\n', 1)
+    boundary, parse = _boundary_for(lines[0])
+    if boundary is None or len(lines) == 1:
+        return {}, text
+
+    rest = lines[1]
+    position = 0
+    while position <= len(rest):
+        end = rest.find('\n', position)
+        line = rest[position:] if end == -1 else rest[position:end]
+        if boundary.match(line):
+            body = '' if end == -1 else rest[end + 1:]
+            return cached_parse(parse, rest[:position]), body.strip()
+        if end == -1:
+            break
+        position = end + 1
+
+    return {}, text
+
+
+def load_post(text: str):
+    """Build a frontmatter.Post like frontmatter.loads, using the parse cache"""
+    import frontmatter
+
+    metadata, content = split_document(text)
+    post = frontmatter.Post(content)
+    post.metadata.update(metadata)
+    if _boundary_for(text.strip().split('\n', 1)[0])[0] is JSON_BOUNDARY:
+        post.handler = frontmatter.JSONHandler()
+    return post
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Frontmatter Header Parse Cache
+
+Disk-backed cache of parsed frontmatter keyed by the hash of the raw header
+text, shared by every script that reads headers through frontmatter_reader.
+Unchanged headers are parsed once and then served from the cache on later
+runs. Entries are looked up by key as headers are read, so a run that only
+parses a few changed headers reads a few rows whatever the cache's size.
+New entries are written back when the process exits, and the cache is
+trimmed to a byte budget by evicting the least recently used entries.
+"""
+
+import atexit
+import hashlib
+import os
+import pickle
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+
+DEFAULT_PATH = Path(__file__).resolve().parent.parent / ".brain" / "header-cache.sqlite"
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS headers (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_headers_last_used ON headers(last_used);
+CREATE TABLE IF NOT EXISTS stats (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+class HeaderCache:
+    """LRU parse cache for frontmatter headers, persisted in SQLite"""
+
+    def __init__(self, path: Path = DEFAULT_PATH, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        # Blobs this process looked up or added; None marks a key known to be missing
+        self.entries: Dict[str, Optional[bytes]] = {}
+        self.reader: Optional[sqlite3.Connection] = None
+        self.pending: Dict[str, bytes] = {}
+        self.used = set()
+        self.hits = 0
+        self.misses = 0
+
+        # multiprocessing is only imported once a cache is actually needed
+        from multiprocessing import parent_process
+        from multiprocessing.util import Finalize, register_after_fork
+
+        atexit.register(self.flush)
+        register_after_fork(self, HeaderCache._after_fork)
+        if parent_process() is not None:
+            # Created inside a spawned worker, which exits without atexit
+            Finalize(self, self.flush, exitpriority=10)
+
+    def _after_fork(self):
+        """In pool workers, flush this process's misses when the worker exits"""
+        # SQLite connections must not cross a fork; the child opens its own
+        # and never closes the parent's
+        if self.reader:
+            _inherited.append(self.reader)
+        self.reader = None
+        self.pending = {}
+        self.used = set()
+        self.hits = 0
+        self.misses = 0
+        from multiprocessing.util import Finalize
+        Finalize(self, self.flush, exitpriority=10)
+
+    @staticmethod
+    def key(kind: str, header: str) -> str:
+        """Cache key for a header and the parser that reads it"""
+        return hashlib.md5(f"{kind}\0{header}".encode('utf-8')).hexdigest()
+
+    def _connect(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path), timeout=30)
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.executescript(SCHEMA)
+        return conn
+
+    def _lookup(self, key: str) -> Optional[bytes]:
+        """The cached blob for a key, read from disk the first time it is asked for"""
+        if key in self.entries:
+            return self.entries[key]
+
+        blob = None
+        if self.reader is None:
+            try:
+                self.reader = self._connect()
+            except (OSError, sqlite3.Error):
+                # An unusable cache only costs speed; parse everything instead
+                self.reader = False
+        if self.reader:
+            try:
+                # fetchall finishes the statement, so no read transaction stays open
+                rows = self.reader.execute("SELECT value FROM headers WHERE key = ?", (key,)).fetchall()
+                blob = rows[0][0] if rows else None
+            except sqlite3.Error:
+                pass
+        self.entries[key] = blob
+        return blob
+
+    def get_or_parse(self, kind: str, header: str, parse: Callable[[str], Any]) -> Any:
+        """Return the parsed header, parsing and caching it on a miss"""
+        key = self.key(kind, header)
+        blob = self._lookup(key)
+        if blob is not None:
+            self.hits += 1
+            self.used.add(key)
+            # Unpickle per hit so callers can mutate their copy freely
+            return pickle.loads(blob)
+
+        self.misses += 1
+        value = parse(header)
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        self.entries[key] = blob
+        self.pending[key] = blob
+        return value
+
+    def flush(self):
+        """Write new entries, recency and counters to disk, then evict to budget"""
+        if not self.pending and not self.used and not self.hits and not self.misses:
+            return
+
+        now = time.time()
+        try:
+            conn = self._connect()
+        except (OSError, sqlite3.Error):
+            return
+
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO headers (key, value, size, last_used) VALUES (?, ?, ?, ?)",
+                    [(key, blob, len(blob), now) for key, blob in self.pending.items()]
+                )
+                conn.executemany(
+                    "UPDATE headers SET last_used = ? WHERE key = ?",
+                    [(now, key) for key in self.used - set(self.pending)]
+                )
+                for name, value in (('hits', self.hits), ('misses', self.misses)):
+                    conn.execute(
+                        "INSERT INTO stats (name, value) VALUES (?, ?) "
+                        "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+                        (name, value)
+                    )
+                self._evict(conn)
+        except sqlite3.Error:
+            pass
+        finally:
+            conn.close()
+
+        self.pending = {}
+        self.used = set()
+        self.hits = 0
+        self.misses = 0
+
+    def _evict(self, conn: sqlite3.Connection):
+        """Drop least recently used entries until the cache fits its budget"""
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM headers").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        evict = []
+        for key, size in conn.execute("SELECT key, size FROM headers ORDER BY last_used, key"):
+            if total <= self.max_bytes:
+                break
+            evict.append((key,))
+            total -= size
+        conn.executemany("DELETE FROM headers WHERE key = ?", evict)
+
+    def stats(self) -> Dict[str, Any]:
+        """Lifetime and this-run hit/miss counts plus the cache's size"""
+        lifetime = {'hits': 0, 'misses': 0}
+        entries = size = 0
+        try:
+            conn = self._connect()
+            try:
+                lifetime.update(dict(conn.execute("SELECT name, value FROM stats")))
+                entries, size = conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM headers"
+                ).fetchone()
+            finally:
+                conn.close()
+        except (OSError, sqlite3.Error):
+            pass
+
+        lookups = lifetime['hits'] + lifetime['misses']
+        return {
+            'path': str(self.path),
+            'entries': entries,
+            'bytes': size,
+            'max_bytes': self.max_bytes,
+            'hits': lifetime['hits'],
+            'misses': lifetime['misses'],
+            'hit_rate': lifetime['hits'] / lookups if lookups else 0.0,
+            'run_hits': self.hits,
+            'run_misses': self.misses
+        }
+
+
+_cache: Optional[HeaderCache] = None
+
+# Readers inherited from a parent process, kept open so they are never closed here
+_inherited = []
+
+
+def get_cache() -> Optional[HeaderCache]:
+    """The process-wide cache, or None when BRAIN_HEADER_CACHE=off"""
+    global _cache
+    setting = os.environ.get('BRAIN_HEADER_CACHE', '')
+    if setting.lower() in ('off', '0', 'false', 'no'):
+        return None
+    if _cache is None:
+        max_bytes = int(os.environ.get('BRAIN_HEADER_CACHE_MAX_BYTES', DEFAULT_MAX_BYTES))
+        _cache = HeaderCache(Path(setting) if setting else DEFAULT_PATH, max_bytes)
+    return _cache